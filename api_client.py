@@ -13,8 +13,31 @@ class JobAPIClient:
         )
         return response.json()
     
-    def get_jobs(self, location=None, category=None, min_salary=None, limit=10):
-        """Get filtered job listings"""
+    def analyze_jobs(self, job_descriptions, chunk_size=100):
+        """Analyze many job descriptions in one request
+        
+        ``job_descriptions`` may be any iterable (e.g. a generator over a file);
+        it is uploaded as NDJSON and results are yielded as they stream back.
+        """
+        def ndjson_lines():
+            for description in job_descriptions:
+                yield (json.dumps(description, ensure_ascii=False) + "\n").encode('utf-8')
+        
+        response = requests.post(
+            f"{self.base_url}/analyze-jobs",
+            params={"chunk_size": chunk_size},
+            data=ndjson_lines(),
+            headers={"Content-Type": "application/x-ndjson"},
+            stream=True
+        )
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+    
+    def get_jobs(self, location=None, category=None, min_salary=None, limit=10,
+                 max_salary=None, cursor=None):
+        """Get filtered job listings; pass the previous page's next_cursor to continue"""
         params = {"limit": limit}
         if location:
             params["location"] = location
@@ -22,13 +45,22 @@ class JobAPIClient:
             params["category"] = category
         if min_salary:
             params["min_salary"] = min_salary
+        if max_salary:
+            params["max_salary"] = max_salary
+        if cursor:
+            params["cursor"] = cursor
         
         response = requests.get(f"{self.base_url}/jobs", params=params)
         return response.json()
     
-    def scrape_jobs(self):
-        """Trigger job scraping"""
-        response = requests.post(f"{self.base_url}/scrape-jobs")
+    def scrape_jobs(self, max_pages=3):
+        """Start a background scrape"""
+        response = requests.post(f"{self.base_url}/scrape-jobs", params={"max_pages": max_pages})
+        return response.json()
+    
+    def get_scrape_status(self):
+        """Get the state of the last background scrape"""
+        response = requests.get(f"{self.base_url}/scrape-jobs/status")
         return response.json()
     
     def get_categories(self):
@@ -41,16 +73,20 @@ class JobAPIClient:
         response = requests.get(f"{self.base_url}/stats")
         return response.json()
     
-    def match_jobs(self, skills, experience, preferred_location=None, min_salary=None):
-        """Match user profile to jobs"""
+    def match_jobs(self, skills, experience, preferred_location=None, min_salary=None,
+                   category=None, mode="keyword"):
+        """Match user profile to jobs (``mode`` is "keyword" or "semantic")"""
         data = {
             "skills": skills,
-            "experience": experience
+            "experience": experience,
+            "mode": mode
         }
         if preferred_location:
             data["preferred_location"] = preferred_location
         if min_salary:
             data["min_salary"] = min_salary
+        if category:
+            data["category"] = category
         
         response = requests.post(f"{self.base_url}/match-jobs", json=data)
         return response.json()
@@ -0,0 +1,111 @@
+"""Accuracy-versus-latency comparison of the transformer classifier backends.
+
+Usage:
+    python benchmark_classifier_backends.py [--model-path PATH] [--sample labeled.jsonl]
+                                            [--backends torch torch-int8 onnx onnx-int8]
+                                            [--cascade]
+
+The labeled sample is JSON lines with "text" and "label" fields. Without one, a
+small built-in sample is used. For every backend the script reports accuracy
+against the labels, agreement with the first (reference) backend, single-text
+latency percentiles and batched throughput. ``--cascade`` adds a row for the
+rules -> RandomForest -> transformer cascade on the first backend and prints
+the share of texts each tier answered.
+"""
+import argparse
+import json
+import time
+
+from enhanced_job_classifier import EnhancedJobClassifier, BACKENDS
+
+BUILTIN_SAMPLE = [
+    ("Experienced electrician needed for residential wiring projects in Mumbai.", "electrician"),
+    ("Electrical technician for circuit repair and panel installation in Pune.", "electrician"),
+    ("Wireman required for house wiring and fitting of switches and lights.", "electrician"),
+    ("Heavy vehicle driver required for goods transportation across Maharashtra.", "driver"),
+    ("Auto rickshaw drivers needed in Hyderabad, good knowledge of routes.", "driver"),
+    ("Delivery van driver with valid licence for daily city routes in Delhi.", "driver"),
+    ("Skilled plumber needed for commercial building maintenance in Delhi NCR.", "plumber"),
+    ("Plumber for pipe fitting, leak repairs and bathroom installations.", "plumber"),
+    ("Drainage and water line repair work, plumbing experience required.", "plumber"),
+    ("Sweeper required for office cleaning in Bangalore, morning shift.", "sweeper"),
+    ("Housekeeping staff for daily sweeping, mopping and sanitization.", "sweeper"),
+    ("Road sweeper needed for municipal cleaning duties in Jaipur.", "sweeper"),
+]
+
+
+def load_sample(path):
+    if not path:
+        return [text for text, _ in BUILTIN_SAMPLE], [label for _, label in BUILTIN_SAMPLE]
+    texts, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                texts.append(item['text'])
+                labels.append(item['label'])
+    return texts, labels
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model-path', default="./your-finetuned-model")
+    parser.add_argument('--sample', help="JSON lines file with text and label fields")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cascade', action='store_true', help="Also measure the confidence-gated cascade")
+    parser.add_argument('--rules-threshold', type=float, default=0.8)
+    parser.add_argument('--rf-threshold', type=float, default=0.7)
+    args = parser.parse_args()
+
+    texts, labels = load_sample(args.sample)
+    reference = None
+
+    print(f"{len(texts)} labeled texts")
+    print(f"{'backend':<11} {'accuracy':>8} {'agree':>6} {'p50 ms':>8} {'p95 ms':>8} {'batch/s':>9} {'load s':>7}")
+    runs = [(backend, False) for backend in args.backends]
+    if args.cascade:
+        runs.append((args.backends[0], True))
+    for backend, cascade in runs:
+        start = time.perf_counter()
+        # Without the cascade every text is measured on the backend itself
+        classifier = EnhancedJobClassifier(args.model_path, backend=backend, cascade=cascade,
+                                           rules_threshold=args.rules_threshold, rf_threshold=args.rf_threshold)
+        load_time = time.perf_counter() - start
+        name = 'cascade' if cascade else backend
+
+        for text in texts[:args.warmup]:
+            classifier.predict_with_confidence(text)
+
+        latencies = []
+        predictions = []
+        for text in texts:
+            start = time.perf_counter()
+            label, _ = classifier.predict_with_confidence(text)
+            latencies.append(time.perf_counter() - start)
+            predictions.append(label)
+
+        start = time.perf_counter()
+        classifier.predict_batch(texts, batch_size=args.batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        if reference is None:
+            reference = predictions
+        accuracy = sum(p == l for p, l in zip(predictions, labels)) / len(labels)
+        agreement = sum(p == r for p, r in zip(predictions, reference)) / len(reference)
+        print(f"{name:<11} {accuracy:>8.1%} {agreement:>6.1%} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f} {throughput:>9.1f} {load_time:>7.1f}")
+        if cascade:
+            tiers = classifier.cascade_stats()['tiers']
+            print("            answered by " + ", ".join(
+                f"{tier} {stats['share']:.0%} ({stats['avg_ms']:.2f} ms/text)" for tier, stats in tiers.items()))
+
+
+if __name__ == "__main__":
+    main()
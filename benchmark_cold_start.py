@@ -0,0 +1,63 @@
+"""Cold-start timing of the WhatsApp bot under each model loading mode.
+
+Usage:
+    python benchmark_cold_start.py [--model-path PATH] [--runs 3]
+                                   [--modes eager background lazy]
+
+Each run is a fresh interpreter, so nothing is cached between them except the
+operating system's file cache. For every mode the script reports how long it
+took (from process start) until the module was imported, until the app
+answered its first request and until the classifier was ready. "eager" is how
+the bot behaved before: the model loaded at import time, before it could serve.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CHILD = r"""
+import json, sys, time
+started = float(sys.argv[1])
+import whatsapp_bot
+imported = time.time()
+whatsapp_bot.prepare_model(sys.argv[2])
+client = whatsapp_bot.app.test_client()
+assert client.get('/health').status_code == 200
+serving = time.time()
+whatsapp_bot.classifier.get()
+ready = time.time()
+print(json.dumps({'import': imported - started, 'serving': serving - started, 'ready': ready - started}))
+"""
+
+
+def run_once(mode, model_path):
+    env = dict(os.environ, JOB_CLASSIFIER_MODEL=model_path, BOT_MODEL_LOADING=mode)
+    output = subprocess.run([sys.executable, '-c', CHILD, repr(time.time()), mode],
+                            env=env, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model-path', default="./your-finetuned-model")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', default=['eager', 'background', 'lazy'],
+                        choices=['eager', 'background', 'lazy'])
+    args = parser.parse_args()
+
+    print(f"{'mode':<11} {'import s':>9} {'serving s':>10} {'ready s':>8}  (median of {args.runs})")
+    for mode in args.modes:
+        runs = [run_once(mode, args.model_path) for _ in range(args.runs)]
+
+        def median(field):
+            values = sorted(run[field] for run in runs)
+            return values[len(values) // 2]
+
+        print(f"{mode:<11} {median('import'):>9.2f} {median('serving'):>10.2f} {median('ready'):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
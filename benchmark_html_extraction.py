@@ -0,0 +1,85 @@
+"""Compare the lxml/XPath listing extractor with the BeautifulSoup path.
+
+Usage: python benchmark_html_extraction.py [page.html ...] [--repeat N]
+
+Without arguments, synthetic listing pages of roughly 1, 5 and 10 MB are
+generated. Saved pages can be passed to benchmark real markup; both backends
+must extract the same jobs for the timing to be meaningful, so outputs are
+compared as well.
+"""
+import argparse
+import random
+import time
+
+from skill_india_scraper import SkillIndiaScraper
+
+SOURCE_URL = "https://www.skillindia.gov.in/content/list-jobs"
+
+
+def synthetic_page(target_bytes, rng):
+    """Listing page with navigation noise, filler markup and job cards"""
+    cities = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Pune', 'Hyderabad', 'Nagpur']
+    parts = ['<html><head><title>Jobs</title></head><body><nav>'
+             + ''.join(f'<a href="/nav/{i}">Link {i}</a>' for i in range(200)) + '</nav>']
+    size = sum(len(part) for part in parts)
+    i = 0
+    while size < target_bytes:
+        card = (
+            f'<div class="row"><div class="col"><article class="job-card card">'
+            f'<h3 class="job-title">Electrician Opening {i}</h3>'
+            f'<div class="meta"><span class="loc">{rng.choice(cities)}, India</span></div>'
+            f'<p class="job-desc">Wiring and maintenance work, salary &#8377;{rng.randint(10, 30)},000 per month. '
+            + 'Lorem ipsum dolor sit amet. ' * rng.randint(5, 30) +
+            f'</p><a href="/jobs/{i}">Apply</a></article></div></div>'
+            '<div class="ad"><span>Sponsored</span>' + '<i>x</i>' * 20 + '</div>'
+        )
+        parts.append(card)
+        size += len(card)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def run_backend(html, fast_parser):
+    scraper = SkillIndiaScraper(fast_parser=fast_parser)
+    scraper._parse_job_listings(html, SOURCE_URL)
+    return scraper.jobs
+
+
+def comparable(jobs):
+    return [(job['title'], job['description'], job['location'], job.get('detail_url')) for job in jobs]
+
+
+def time_backend(html, fast_parser, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_backend(html, fast_parser)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('pages', nargs='*', help="saved listing pages")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    else:
+        rng = random.Random(7)
+        pages = [(f"synthetic {mb} MB", synthetic_page(mb * 1024 * 1024, rng)) for mb in (1, 5, 10)]
+
+    print(f"{'page':<24} {'MB':>6} {'soup ms':>9} {'lxml ms':>9} {'speedup':>7} {'same':>5}")
+    for name, html in pages:
+        same = comparable(run_backend(html, False)) == comparable(run_backend(html, True))
+        soup_time = time_backend(html, False, args.repeat)
+        lxml_time = time_backend(html, True, args.repeat)
+        print(f"{name[:24]:<24} {len(html.encode('utf-8')) / 1048576:>6.1f} {soup_time * 1000:>9.1f} "
+              f"{lxml_time * 1000:>9.1f} {soup_time / lxml_time:>6.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
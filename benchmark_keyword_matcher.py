@@ -0,0 +1,92 @@
+"""Compare the single-pass keyword matcher with the old per-keyword substring loop.
+
+Usage: python benchmark_keyword_matcher.py [--repeat N] [--scale N]
+
+``--scale`` multiplies the category, city and scam dictionaries with synthetic
+keywords to show how both approaches behave as the dictionaries grow.
+"""
+import argparse
+import random
+import string
+import time
+
+from job_api import EnhancedJobClassifier
+from keyword_matcher import JobKeywordMatcher
+
+
+def loop_match(text, job_categories, cities, scam_indicators):
+    """The original approach: one substring scan per keyword"""
+    text_lower = text.lower()
+    category_scores = {}
+    for category, keywords in job_categories.items():
+        score = sum(1 for keyword in keywords if keyword in text_lower)
+        if score > 0:
+            category_scores[category] = score
+    location = next((city.title() for city in cities if city in text_lower), None)
+    is_suspicious = any(indicator in text_lower for indicator in scam_indicators)
+    return category_scores, location, is_suspicious
+
+
+def synthetic_word(rng, length):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def scale_dictionaries(classifier, scale, rng):
+    """Return category, city and scam lists grown ``scale`` times with random keywords"""
+    job_categories = {category: list(keywords) for category, keywords in classifier.job_categories.items()}
+    cities = list(classifier.cities)
+    scam_indicators = list(classifier.scam_indicators)
+    for _ in range(scale - 1):
+        for keywords in job_categories.values():
+            keywords.extend(synthetic_word(rng, rng.randint(5, 10)) for _ in range(6))
+        cities.extend(synthetic_word(rng, rng.randint(5, 10)) for _ in range(12))
+        scam_indicators.extend(
+            synthetic_word(rng, 5) + ' ' + synthetic_word(rng, 6) for _ in range(6))
+    return job_categories, cities, scam_indicators
+
+
+def make_posting(rng, length, vocabulary):
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(vocabulary)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def time_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    classifier = EnhancedJobClassifier()
+    vocabulary = [keyword for keywords in classifier.job_categories.values() for keyword in keywords]
+    vocabulary += classifier.cities + ['salary', 'experience', 'required', 'needed', 'the', 'and']
+    vocabulary += [synthetic_word(rng, rng.randint(3, 9)) for _ in range(500)]
+
+    print(f"{'scale':>5} {'keywords':>8} {'chars':>7} {'loop ms':>9} {'matcher ms':>10} {'speedup':>7}")
+    for scale in args.scale:
+        job_categories, cities, scam_indicators = scale_dictionaries(classifier, scale, rng)
+        keyword_count = sum(len(k) for k in job_categories.values()) + len(cities) + len(scam_indicators)
+        matcher = JobKeywordMatcher(job_categories, cities, scam_indicators)
+
+        for length in (1_000, 10_000, 100_000):
+            text = make_posting(rng, length, vocabulary)
+            loop_time = time_call(lambda: loop_match(text, job_categories, cities, scam_indicators), args.repeat)
+            matcher_time = time_call(lambda: matcher.match(text), args.repeat)
+            print(f"{scale:>5} {keyword_count:>8} {length:>7} {loop_time * 1000:>9.2f} "
+                  f"{matcher_time * 1000:>10.2f} {loop_time / matcher_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Memory, queries/second and recall@k of reduced-precision vector storage.
+
+Usage:
+    python benchmark_quantization.py [--n 100000] [--dim 384] [--queries 200] [--k 10]
+                                     [--embeddings job_embeddings.npy]
+                                     [--index exact ivf] [--n-probe 16] [--rescore 0 2 4]
+
+Each index is built with float32, float16 and int8 vectors. Recall@k is
+measured against exact float32 search. For every ``--rescore`` factor ``n`` above
+zero the index returns ``n * k`` candidates, which are re-ranked with float32
+vectors read from a memory-mapped file on disk, as JobMatcher does with its
+embedding store. "MB" is the memory held by the index itself; the float32
+rows read for rescoring stay on disk (or in the page cache). QPS is measured
+one query at a time. The synthetic corpus is the one of
+benchmark_vector_index.py.
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmark_vector_index import clustered, recall_at_k, measure
+from vector_index import ExactIndex, PRECISIONS, make_index, normalize, rescore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--n', type=int, default=100000, help="Synthetic corpus size")
+    parser.add_argument('--dim', type=int, default=384, help="Synthetic dimension (MiniLM is 384)")
+    parser.add_argument('--clusters', type=int, default=100)
+    parser.add_argument('--intrinsic-dim', type=int, default=16)
+    parser.add_argument('--spread', type=float, default=0.3)
+    parser.add_argument('--embeddings', help=".npy matrix of real embeddings to index instead")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--index', nargs='+', default=['exact', 'ivf'], choices=['exact', 'ivf'])
+    parser.add_argument('--n-probe', type=int, default=16)
+    parser.add_argument('--rescore', type=int, nargs='+', default=[0, 2, 4],
+                        help="Shortlist factors re-ranked in float32 (0 = no rescoring)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        vectors = normalize(np.load(args.embeddings))
+        picks = rng.choice(len(vectors), args.queries, replace=False)
+        queries = normalize(vectors[picks] + rng.normal(scale=0.02, size=(args.queries, vectors.shape[1])))
+    else:
+        centres = rng.normal(size=(args.clusters, args.dim))
+        basis = rng.normal(size=(args.intrinsic_dim, args.dim))
+        vectors = clustered(rng, centres, basis, args.n, args.spread)
+        queries = clustered(rng, centres, basis, args.queries, args.spread)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    truth = ExactIndex().build(vectors).search(queries, args.k)[1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The float32 matrix on disk, as the embedding store keeps it
+        path = os.path.join(tmp, 'vectors.f32')
+        on_disk = np.memmap(path, dtype=np.float32, mode='w+', shape=vectors.shape)
+        on_disk[:] = vectors
+        on_disk.flush()
+        on_disk = np.memmap(path, dtype=np.float32, mode='r', shape=vectors.shape)
+
+        def fetch(ids):
+            return np.asarray(on_disk[ids])
+
+        print(f"{'index':<8} {'precision':<10} {'rescore':>7} {'MB':>8} {'recall@k':>9} {'QPS':>8}")
+        for kind in args.index:
+            for precision in PRECISIONS:
+                params = {'precision': precision}
+                if kind == 'ivf':
+                    params.update(n_probe=args.n_probe, seed=args.seed)
+                index = make_index(kind, **params).build(vectors)
+                megabytes = index.nbytes / 2 ** 20
+                for factor in args.rescore:
+                    if factor:
+                        def search(query):
+                            shortlist = index.search(query, args.k * factor)[1]
+                            return rescore(query, shortlist, fetch, args.k)
+                    else:
+                        def search(query):
+                            return index.search(query, args.k)
+                    measure(search, queries[:10])  # warm-up
+                    ids, qps = measure(search, queries)
+                    label = f"x{factor}" if factor else "-"
+                    print(f"{kind:<8} {precision:<10} {label:>7} {megabytes:>8.1f} "
+                          f"{recall_at_k(ids, truth):>9.3f} {qps:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Recall@k and queries/second of the vector indexes against exact search.
+
+Usage:
+    python benchmark_vector_index.py [--n 20000] [--dim 384] [--queries 200] [--k 10]
+                                     [--embeddings job_embeddings.npy]
+                                     [--n-probe 1 4 16 64] [--ef-search 16 64 256]
+                                     [--filter 0.5 0.1 0.01]
+
+Without ``--embeddings`` the corpus is synthetic: unit vectors scattered around
+random cluster centres (roughly how job embeddings group by trade) along a
+low-dimensional subspace, since sentence embeddings have a far lower intrinsic
+dimension than their width. Isotropic noise in all dimensions would make every
+point in a cluster nearly equidistant, which no real corpus looks like.
+Queries are drawn the same way. Ground truth is the exact index; recall@k is
+the fraction of the true top-k each index returns. QPS is measured one query
+at a time, as JobMatcher issues them. Each ``--filter`` share repeats the
+measurement with a random mask passing that share of the corpus (as a location
+or salary filter would), against exact search over the passing rows.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from vector_index import ExactIndex, IVFIndex, HNSWIndex, normalize
+
+
+def clustered(rng, centres, basis, n, spread):
+    offsets = rng.normal(scale=spread, size=(n, len(basis))) @ basis
+    return normalize(centres[rng.integers(0, len(centres), n)] + offsets)
+
+
+def recall_at_k(ids, truth):
+    k = truth.shape[1]
+    return float(np.mean([len(set(found[found >= 0]) & set(expected)) / k
+                          for found, expected in zip(ids, truth)]))
+
+
+def measure(search, queries):
+    start = time.perf_counter()
+    ids = np.vstack([search(query)[1] for query in queries])
+    return ids, len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--n', type=int, default=20000, help="Synthetic corpus size")
+    parser.add_argument('--dim', type=int, default=384, help="Synthetic dimension (MiniLM is 384)")
+    parser.add_argument('--clusters', type=int, default=100)
+    parser.add_argument('--intrinsic-dim', type=int, default=16)
+    parser.add_argument('--spread', type=float, default=0.3)
+    parser.add_argument('--embeddings', help=".npy matrix of real embeddings to index instead")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-lists', type=int, default=None)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--m', type=int, default=16)
+    parser.add_argument('--ef-construction', type=int, default=100)
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--skip-hnsw', action='store_true', help="HNSW builds in Python and is slow on large corpora")
+    parser.add_argument('--filter', type=float, nargs='*', default=[],
+                        help="Shares of the corpus passing a random filter")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        vectors = normalize(np.load(args.embeddings))
+        picks = rng.choice(len(vectors), args.queries, replace=False)
+        # Perturbed copies of indexed rows stand in for user queries
+        queries = normalize(vectors[picks] + rng.normal(scale=0.02, size=(args.queries, vectors.shape[1])))
+    else:
+        centres = rng.normal(size=(args.clusters, args.dim))
+        basis = rng.normal(size=(args.intrinsic_dim, args.dim))
+        vectors = clustered(rng, centres, basis, args.n, args.spread)
+        queries = clustered(rng, centres, basis, args.queries, args.spread)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    start = time.perf_counter()
+    exact = ExactIndex().build(vectors)
+    exact_build = time.perf_counter() - start
+    start = time.perf_counter()
+    ivf = IVFIndex(n_lists=args.n_lists, seed=args.seed).build(vectors)
+    ivf_build = time.perf_counter() - start
+    hnsw = None
+    if not args.skip_hnsw:
+        start = time.perf_counter()
+        hnsw = HNSWIndex(m=args.m, ef_construction=args.ef_construction, seed=args.seed).build(vectors)
+        hnsw_build = time.perf_counter() - start
+
+    for share in [None] + args.filter:
+        allowed = None if share is None else rng.random(len(vectors)) < share
+        if share is not None:
+            print(f"\nfilter passing {share:.1%} ({int(allowed.sum())} vectors)")
+        truth, exact_qps = measure(lambda query: exact.search(query, args.k, allowed=allowed), queries)
+        print(f"{'index':<24} {'build s':>8} {'recall@k':>9} {'QPS':>9}")
+        print(f"{'exact':<24} {exact_build:>8.1f} {1.0:>9.3f} {exact_qps:>9.0f}")
+        for n_probe in args.n_probe:
+            ids, qps = measure(lambda query: ivf.search(query, args.k, n_probe=n_probe, allowed=allowed), queries)
+            print(f"{f'ivf lists={ivf.n_lists} probe={n_probe}':<24} {ivf_build:>8.1f} {recall_at_k(ids, truth):>9.3f} {qps:>9.0f}")
+        if hnsw is not None:
+            for ef in args.ef_search:
+                ids, qps = measure(lambda query: hnsw.search(query, args.k, ef_search=ef, allowed=allowed), queries)
+                print(f"{f'hnsw m={args.m} ef={ef}':<24} {hnsw_build:>8.1f} {recall_at_k(ids, truth):>9.3f} {qps:>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Bulk-encode every live posting of the job log into the embedding store.
+
+Usage:
+    python bulk_ingest.py [--log scraped_jobs.jsonl] [--store job_embeddings]
+                          [--model NAME] [--workers 4] [--threads-per-worker 1]
+                          [--chunk-size 4096] [--batch-size 64] [--checkpoint-seconds 30]
+
+The log is streamed twice. The first pass keeps only each posting key's latest
+content hash; the second encodes the final version of every posting, one chunk
+at a time, spreading each chunk's texts over a pool of worker processes (each
+with its own copy of the model). Vectors go straight into the store's
+memory-mapped matrix, and its metadata is saved every ``--checkpoint-seconds``
+and on exit, including Ctrl-C. Postings already stored with the same
+description are skipped, so rerunning an interrupted ingest resumes where its
+last checkpoint left off, and a rerun with nothing new encodes nothing.
+JobMatcher reads the same store, so its next ``add_jobs`` encodes nothing
+either. Progress and the final rate are reported in postings per second.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+from job_log import JobLog
+
+# Model held by each worker process
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts):
+    return np.asarray(_worker_model.encode(texts), dtype=np.float32)
+
+
+class ParallelEncoder:
+    """``encode(texts)`` callable that splits the texts over a process pool
+
+    ``workers=0`` encodes in this process instead. Workers are started with
+    ``spawn``, since forking a process that already runs torch threads can hang.
+    """
+
+    def __init__(self, model_name, workers=None, batch_size=64, threads_per_worker=1):
+        self.model_name = model_name
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self._model = None
+        self._pool = None
+        if self.workers:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker,
+                                             initargs=(model_name, threads_per_worker))
+
+    def __call__(self, texts):
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if self._pool is None:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+            return np.vstack([np.asarray(self._model.encode(batch), dtype=np.float32) for batch in batches])
+        return np.vstack(list(self._pool.map(_encode_in_worker, batches)))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def latest_hashes(job_log, chunk_size):
+    """Content hash of each live posting, from one streaming pass over the log"""
+    hashes = {}
+    for entries in job_log.iter_entries(chunk_size):
+        for entry in entries:
+            if entry['op'] == 'put':
+                hashes[entry['key']] = entry['hash']
+            elif entry['op'] == 'delete':
+                hashes.pop(entry['key'], None)
+    return hashes
+
+
+def ingest(job_log, store, encode, chunk_size=4096, checkpoint_seconds=30.0, report=print):
+    """Encode the live postings of ``job_log`` into ``store``; returns a summary dict"""
+    started = time.perf_counter()
+    live = latest_hashes(job_log, chunk_size)
+    report(f"{len(live)} live postings in {job_log.path}")
+
+    seen = encoded = 0
+    last_checkpoint = time.perf_counter()
+    try:
+        for entries in job_log.iter_entries(chunk_size):
+            # Only the final version of each posting is encoded
+            items = [(entry['key'], entry['job'].get('description') or '') for entry in entries
+                     if entry['op'] == 'put' and live.get(entry['key']) == entry['hash']]
+            if not items:
+                continue
+            encoded += store.upsert(items, encode, batch_size=len(items), save=False)
+            seen += len(items)
+            if time.perf_counter() - last_checkpoint >= checkpoint_seconds:
+                store.save()
+                last_checkpoint = time.perf_counter()
+            elapsed = time.perf_counter() - started
+            report(f"{seen}/{len(live)} postings, {encoded} encoded, {seen / elapsed:.0f} postings/s")
+
+        removed = store.delete([key for key in list(store.keys) if key not in live])
+    finally:
+        store.save()
+
+    elapsed = time.perf_counter() - started
+    return {'postings': seen, 'encoded': encoded, 'removed': removed, 'seconds': elapsed,
+            'postings_per_second': seen / elapsed if elapsed else 0.0,
+            'encoded_per_second': encoded / elapsed if elapsed else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default='scraped_jobs.jsonl')
+    parser.add_argument('--store', default='job_embeddings')
+    parser.add_argument('--model', default=None, help="Sentence-transformers model (default: JobMatcher's)")
+    parser.add_argument('--workers', type=int, default=None, help="Encoding processes (default: CPU count; 0 = none)")
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=4096, help="Postings read and encoded per step")
+    parser.add_argument('--batch-size', type=int, default=64, help="Texts per model call")
+    parser.add_argument('--checkpoint-seconds', type=float, default=30.0)
+    args = parser.parse_args()
+
+    model_name = args.model
+    if model_name is None:
+        from job_matcher import MODEL_NAME
+        model_name = MODEL_NAME
+
+    store = EmbeddingStore(args.store, model_name)
+    encoder = ParallelEncoder(model_name, args.workers, args.batch_size, args.threads_per_worker)
+    try:
+        summary = ingest(JobLog(args.log), store, encoder, args.chunk_size, args.checkpoint_seconds)
+    except KeyboardInterrupt:
+        print(f"Interrupted; {len(store)} postings are saved in {store.dir}, run again to resume")
+        return
+    finally:
+        encoder.close()
+    print(f"{summary['postings']} postings in {summary['seconds']:.1f}s: "
+          f"{summary['postings_per_second']:.0f} postings/s, {summary['encoded']} encoded "
+          f"({summary['encoded_per_second']:.0f}/s), {summary['removed']} removed from the store")
+
+
+if __name__ == "__main__":
+    main()
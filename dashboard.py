@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-from skill_india_scraper import SkillIndiaScraper
+from skill_india_scraper import SkillIndiaScraper, ConditionalRequestCache
+from job_log import JobLog
+from job_store import JobLogStore
+from entity_extractor import EntityExtractor, CITIES, SCAM_INDICATORS
+from job_categories import JOB_CATEGORIES
 import json
 import os
 
@@ -9,38 +13,21 @@ st.set_page_config(page_title="Job Classification Dashboard", layout="wide")
 # Enhanced job classifier with more categories
 class EnhancedJobClassifier:
     def __init__(self):
-        self.job_categories = {
-            'electrician': ['electric', 'wiring', 'voltage', 'circuit', 'electrical', 'power'],
-            'plumber': ['plumb', 'pipe', 'water', 'leak', 'bathroom', 'toilet', 'drainage'],
-            'driver': ['drive', 'truck', 'delivery', 'transport', 'vehicle', 'auto', 'taxi'],
-            'cleaner': ['clean', 'sweep', 'housekeep', 'janitor', 'sanitiz', 'maintenance'],
-            'carpenter': ['carpent', 'wood', 'furniture', 'cabinet', 'door', 'window'],
-            'mechanic': ['mechanic', 'repair', 'engine', 'motor', 'garage', 'service'],
-            'security_guard': ['security', 'guard', 'watchman', 'safety', 'patrol'],
-            'cook': ['cook', 'chef', 'kitchen', 'food', 'restaurant', 'catering'],
-            'tailor': ['tailor', 'sewing', 'stitch', 'garment', 'cloth', 'alteration'],
-            'construction_worker': ['construction', 'building', 'mason', 'labor', 'site'],
-            'ac_technician': ['ac', 'air condition', 'cooling', 'hvac', 'refrigerat'],
-            'beautician': ['beauty', 'salon', 'hair', 'makeup', 'facial', 'parlor'],
-            'delivery_boy': ['delivery', 'courier', 'parcel', 'logistics', 'shipping'],
-            'sales_executive': ['sales', 'marketing', 'customer', 'business', 'retail'],
-            'data_entry': ['data entry', 'typing', 'computer', 'excel', 'office'],
-            'teacher': ['teach', 'tutor', 'education', 'school', 'training', 'instructor'],
-            'nurse': ['nurse', 'medical', 'hospital', 'healthcare', 'patient'],
-            'accountant': ['account', 'finance', 'bookkeep', 'tax', 'audit'],
-            'receptionist': ['reception', 'front desk', 'customer service', 'phone'],
-            'warehouse_worker': ['warehouse', 'inventory', 'stock', 'packing', 'loading']
-        }
+        self.job_categories = JOB_CATEGORIES
+        self.cities = CITIES
+        self.scam_indicators = SCAM_INDICATORS
+        
+        # Category keywords, cities, scam phrases and salaries in a single pass,
+        # cached by text so reposted descriptions are not scanned again
+        self.extractor = EntityExtractor(self.job_categories)
     
     def analyze_job(self, text):
-        text_lower = text.lower()
+        entities = self.extractor.extract(text)
         
-        # Find best matching category
-        category_scores = {}
-        for category, keywords in self.job_categories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                category_scores[category] = score
+        # Find best matching category (category order breaks ties)
+        category_scores = {category: entities['category_counts'][category]
+                           for category in self.job_categories
+                           if category in entities['category_counts']}
         
         if category_scores:
             category = max(category_scores, key=category_scores.get)
@@ -49,62 +36,32 @@ class EnhancedJobClassifier:
             category = 'general'
             confidence = 0.3
         
-        # Extract salary with multiple patterns
-        import re
-        salary_patterns = [
-            r'₹\s*(\d+(?:,\d+)*)',
-            r'(\d+)k\s*(?:per|/)?\s*month',
-            r'salary\s*:?\s*₹?\s*(\d+(?:,\d+)*)',
-            r'(\d+(?:,\d+)*)\s*(?:rs|rupees)'
-        ]
-        
-        salary = None
-        for pattern in salary_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                sal_str = match.group(1).replace(',', '')
-                salary = int(sal_str)
-                if 'k' in pattern and 'k' in match.group(0):
-                    salary *= 1000
-                break
-        
-        # Extract location with more cities
-        cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad', 
-                 'ahmedabad', 'kolkata', 'jaipur', 'lucknow', 'kanpur', 'nagpur',
-                 'indore', 'thane', 'bhopal', 'visakhapatnam', 'pimpri', 'patna']
-        location = next((city.title() for city in cities if city in text_lower), None)
-        
-        # Enhanced scam detection
-        scam_indicators = [
-            'work from home guaranteed', 'no experience high salary', 'earn lakhs',
-            'investment required', 'registration fee', 'advance payment',
-            'part time full salary', 'easy money', 'get rich quick'
-        ]
-        
-        is_suspicious = any(indicator in text_lower for indicator in scam_indicators)
-        
         return {
             'category': category.replace('_', ' ').title(),
             'confidence': confidence,
-            'salary_range': (salary, salary) if salary else None,
-            'location': location,
-            'is_suspicious': is_suspicious,
+            'salary_range': entities['salary_range'],
+            'pay_period': entities['salary']['period'] if entities['salary'] else None,
+            'location': entities['location'],
+            'is_suspicious': entities['is_suspicious'],
             'raw_category': category
         }
 
 
 
-@st.cache_data
-def load_jobs():
-    """Load jobs from file or scrape new ones"""
-    if os.path.exists('scraped_jobs.json'):
-        with open('scraped_jobs.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
+@st.cache_resource
+def load_job_store():
+    """Job store that reads the job log incrementally from its last offset"""
+    log = JobLog('scraped_jobs.jsonl')
+    log.import_json('scraped_jobs.json')
+    if not os.path.exists(log.path):
         scraper = SkillIndiaScraper()
-        jobs = scraper.scrape_jobs()
-        scraper.save_jobs()
-        return jobs
+        scraper.scrape_jobs()
+        scraper.save_jobs_to_log(log)
+    return JobLogStore(log)
+
+def load_jobs():
+    """Current jobs; only entries appended since the last run are read"""
+    return list(load_job_store().snapshot().jobs)
 
 @st.cache_resource
 def load_classifier():
@@ -123,9 +80,10 @@ def main():
     # Scraping controls
     st.sidebar.header("Data Management")
     if st.sidebar.button("🔄 Refresh Jobs"):
-        if os.path.exists('scraped_jobs.json'):
-            os.remove('scraped_jobs.json')
-        st.cache_data.clear()
+        # Revalidate pages and append only new or changed postings to the log
+        scraper = SkillIndiaScraper(http_cache=ConditionalRequestCache())
+        scraper.scrape_jobs()
+        scraper.save_jobs_to_log(load_job_store().log)
         st.rerun()
     
     st.sidebar.metric("Total Jobs", len(jobs_data))
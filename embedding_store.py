@@ -0,0 +1,256 @@
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from file_lock import FileLock
+from job_enrichment import description_hash
+from vector_index import normalize
+
+# Rows encoded per call to the model while filling the store
+ENCODE_BATCH_SIZE = 256
+
+
+def model_slug(model_name):
+    """Directory-safe form of a model name"""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', model_name).strip('_') or 'model'
+
+
+class EmbeddingStore:
+    """Disk-backed embeddings for one model, keyed by content hash
+
+    Vectors live in a memory-mapped float32 matrix (``vectors.f32``); ``meta.json``
+    maps each posting key to the hash of its text and each hash to a matrix row,
+    so identical texts share a row and only new or changed texts are encoded.
+    Rows no longer referenced are reused by later appends, but only once the
+    saved metadata no longer points at them. The matrix is written and flushed
+    before ``meta.json`` is atomically replaced, so a crash at any point leaves
+    the previous state readable and correct.
+
+    Writers in different processes (the API's JobMatcher, bulk_ingest.py) are
+    serialised with a file lock in the store directory. A writer picks up other
+    processes' saves when it takes the lock, and keeps it while it has unsaved
+    changes, i.e. from an ``upsert(save=False)`` until the next ``save()``.
+    """
+
+    def __init__(self, path='job_embeddings', model_name='default'):
+        self.model_name = model_name
+        self.dir = os.path.join(path, model_slug(model_name))
+        self.vectors_path = os.path.join(self.dir, 'vectors.f32')
+        self.meta_path = os.path.join(self.dir, 'meta.json')
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(self.dir, 'lock'))
+        self._dirty = False
+        self._matrix = None
+        self._load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _meta_signature(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        self.dim = None
+        self.keys = {}
+        self.rows = {}
+        self.free = []
+        # Rows released since the last save; still referenced by the saved metadata
+        self.pending_free = []
+        self.count = 0
+        self._refs = {}
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        self._signature = self._meta_signature()
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return
+        if meta.get('model') != self.model_name:
+            raise ValueError(f"{self.dir} holds embeddings for {meta.get('model')!r}, not {self.model_name!r}")
+        self.dim = meta['dim']
+        self.keys = meta['keys']
+        self.rows = meta['rows']
+        self.free = meta['free']
+        self.count = meta['count']
+        for content_hash in self.keys.values():
+            self._refs[content_hash] = self._refs.get(content_hash, 0) + 1
+        if self.dim:
+            self._map(self.count)
+
+    def _map(self, rows_needed):
+        """Memory-map the matrix with room for at least ``rows_needed`` rows"""
+        capacity = len(self._matrix) if self._matrix is not None else 0
+        if self._matrix is not None and rows_needed <= capacity:
+            return
+        capacity = max(rows_needed, 2 * capacity, 1024)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.vectors_path, 'ab') as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        size = os.path.getsize(self.vectors_path) // (self.dim * 4)
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(size, self.dim))
+
+    @contextmanager
+    def _writing(self):
+        """Hold the store's file lock, reloading first if another process saved"""
+        with self._lock, self._file_lock:
+            if not self._dirty and self._meta_signature() != self._signature:
+                self._load()
+            yield
+
+    def _mark_dirty(self):
+        # Unsaved changes keep an extra hold on the file lock until save()
+        if not self._dirty:
+            self._dirty = True
+            self._file_lock.acquire()
+
+    def _refresh(self):
+        """Pick up another process's save before reading"""
+        with self._lock:
+            if not self._dirty and self._meta_signature() != self._signature:
+                with self._writing():
+                    pass
+
+    def save(self):
+        """Flush the matrix, then atomically replace the metadata"""
+        with self._writing():
+            if self._matrix is not None:
+                self._matrix.flush()
+            os.makedirs(self.dir, exist_ok=True)
+            # The metadata written here no longer references the pending rows
+            free = self.free + self.pending_free
+            meta = {'model': self.model_name, 'dim': self.dim, 'count': self.count,
+                    'keys': self.keys, 'rows': self.rows, 'free': free}
+            tmp_path = f"{self.meta_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.meta_path)
+            self.free = free
+            self.pending_free = []
+            self._signature = self._meta_signature()
+            if self._dirty:
+                self._dirty = False
+                self._file_lock.release()
+
+    def _release(self, content_hash):
+        self._refs[content_hash] -= 1
+        if not self._refs[content_hash]:
+            del self._refs[content_hash]
+            # Not reusable before a save: until then the saved metadata still maps
+            # this hash to the row, and a crash would leave it pointing at another vector
+            self.pending_free.append(self.rows.pop(content_hash))
+
+    def _claim(self, content_hash):
+        self._refs[content_hash] = self._refs.get(content_hash, 0) + 1
+
+    def _write(self, vectors):
+        """Store vectors in free rows first, then at the end; returns their rows"""
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional embeddings, got {vectors.shape[1]}")
+        reused = [self.free.pop() for _ in range(min(len(self.free), len(vectors)))]
+        appended = list(range(self.count, self.count + len(vectors) - len(reused)))
+        self.count += len(appended)
+        self._map(self.count)
+        rows = reused + appended
+        self._matrix[rows] = vectors
+        return rows
+
+    def upsert(self, items, encode, batch_size=ENCODE_BATCH_SIZE, save=True):
+        """Store embeddings for ``(key, text)`` pairs, encoding only unseen texts
+
+        ``encode(texts)`` must return one embedding per text. Returns the number
+        of texts encoded. ``save=False`` leaves writing the metadata to a later
+        ``save()``, for callers that upsert many chunks; the store stays locked
+        against other processes until then.
+        """
+        with self._writing():
+            pending = {}
+            changes = []
+            for key, text in items:
+                content_hash = description_hash(text)
+                if self.keys.get(key) == content_hash:
+                    continue
+                changes.append((key, content_hash))
+                if content_hash not in self.rows:
+                    pending.setdefault(content_hash, text)
+
+            # Encode everything before touching the store, so a failing encode
+            # leaves it (and the file lock) exactly as it was
+            hashes = list(pending)
+            batches = [hashes[start:start + batch_size] for start in range(0, len(hashes), batch_size)]
+            encoded = [normalize(encode([pending[content_hash] for content_hash in batch])) for batch in batches]
+            dim = self.dim
+            for vectors in encoded:
+                if dim is not None and vectors.shape[1] != dim:
+                    raise ValueError(f"Expected {dim}-dimensional embeddings, got {vectors.shape[1]}")
+                dim = vectors.shape[1]
+
+            if changes:
+                self._mark_dirty()
+            for batch, vectors in zip(batches, encoded):
+                for content_hash, row in zip(batch, self._write(vectors)):
+                    self.rows[content_hash] = row
+
+            # Claim every new hash before releasing old ones, so a text moving
+            # between keys in the same call keeps its row
+            replaced = []
+            for key, content_hash in changes:
+                self._claim(content_hash)
+                if key in self.keys:
+                    replaced.append(self.keys[key])
+                self.keys[key] = content_hash
+            for content_hash in replaced:
+                self._release(content_hash)
+
+            if self._dirty and save:
+                self.save()
+            return len(hashes)
+
+    def delete(self, keys):
+        """Forget the given posting keys; rows nobody references become free"""
+        with self._writing():
+            removed = 0
+            for key in keys:
+                content_hash = self.keys.pop(key, None)
+                if content_hash is not None:
+                    self._mark_dirty()
+                    self._release(content_hash)
+                    removed += 1
+            if self._dirty:
+                self.save()
+            return removed
+
+    def sync(self, items, encode, batch_size=ENCODE_BATCH_SIZE):
+        """Make the store hold exactly the ``(key, text)`` pairs given; returns texts encoded"""
+        items = list(items)
+        with self._writing():
+            encoded = self.upsert(items, encode, batch_size)
+            wanted = {key for key, _ in items}
+            self.delete([key for key in self.keys if key not in wanted])
+            return encoded
+
+    def vectors(self, keys):
+        """Embeddings of ``keys`` as a ``(len(keys), dim)`` float32 array"""
+        with self._lock:
+            self._refresh()
+            if not keys:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            rows = [self.rows[self.keys[key]] for key in keys]
+            return np.asarray(self._matrix[rows])
@@ -1,21 +1,153 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics.pairwise import cosine_similarity
-import re
+# torch and transformers are imported where they are used, so importing this
+# module (e.g. from whatsapp_bot) is cheap until a model is actually loaded
+import inspect
+import json
+import os
 import pickle
+import threading
+import time
+from entity_extractor import EntityExtractor
+from inference_scheduler import BatchScheduler
+from job_categories import JOB_CATEGORIES
+
+# Inference backends: full-precision PyTorch, dynamically int8-quantized PyTorch,
+# and ONNX Runtime on the exported model (optionally int8-quantized)
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+
+# Cascade tiers, cheapest first; a tier answers only when it is confident enough
+TIERS = ('rules', 'rf', 'transformer')
+
+# Rule keywords for labels that are named differently in JOB_CATEGORIES
+LABEL_CATEGORIES = {'sweeper': 'cleaner'}
+
+# This classifier flags a posting only when its scam score is above 2 (the API
+# and dashboard flag any indicator)
+SCAM_SCORE_THRESHOLD = 3
+
+def export_onnx(model, tokenizer, onnx_path):
+    """Export a sequence-classification model to ONNX with dynamic batch/sequence axes"""
+    import torch
+    
+    class LogitsOnly(torch.nn.Module):
+        """Positional-input wrapper so the export binds tokenizer outputs by name"""
+        
+        def __init__(self, model, input_names):
+            super().__init__()
+            self.model = model
+            self.input_names = input_names
+        
+        def forward(self, *inputs):
+            return self.model(**dict(zip(self.input_names, inputs))).logits
+    
+    sample = tokenizer(["sample job description"], return_tensors="pt", padding=True)
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter, which rejects dynamic_axes
+        export_kwargs['dynamo'] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(model, input_names), tuple(sample[name] for name in input_names), onnx_path,
+            input_names=input_names, output_names=['logits'],
+            dynamic_axes=dynamic_axes, opset_version=14, **export_kwargs
+        )
+    return onnx_path
+
+def quantize_onnx(onnx_path, quantized_path):
+    """Dynamic int8 quantization of an exported ONNX model (weights int8, activations float)"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+def weights_signature(model_path):
+    """Name, size and modification time of every file in the model directory
+    
+    Cheap to compute and changes whenever the weights, config or tokenizer are
+    replaced; exported ONNX files (and their signatures) are left out.
+    """
+    entries = []
+    for name in sorted(os.listdir(model_path)):
+        path = os.path.join(model_path, name)
+        if name.endswith(('.onnx', '.onnx.json')) or '.tmp' in name or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        entries.append([name, stat.st_size, stat.st_mtime_ns])
+    return entries
+
+def build_once(path, signature, build):
+    """Reuse ``path`` if it was built from ``signature``, else ``build(tmp_path)`` and swap it in
+    
+    The file is written under a temporary name and renamed into place, so a
+    crash or a concurrent reader never sees a partial model, and the signature
+    is stored beside it (``<path>.json``) only afterwards.
+    """
+    signature_path = f"{path}.json"
+    try:
+        with open(signature_path, 'r', encoding='utf-8') as f:
+            if os.path.exists(path) and json.load(f) == signature:
+                return path
+    except (FileNotFoundError, ValueError):
+        pass
+    
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        build(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(f"{signature_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(signature, f)
+    os.replace(f"{signature_path}.tmp", signature_path)
+    return path
 
 class EnhancedJobClassifier:
-    def __init__(self, model_path="./your-finetuned-model"):
+    def __init__(self, model_path="./your-finetuned-model", batching=False,
+                 max_batch_size=16, max_wait_ms=5.0, backend="torch",
+                 cascade=False, rules_threshold=0.8, rf_threshold=0.7):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; choose from {BACKENDS}")
+        self.backend = backend
+        
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
         # Load transformer model
         self.tokenizer = AutoTokenizer.from_pretrained(model_path)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.model.eval()
+        self.onnx_session = None
+        
+        if backend == 'torch-int8':
+            # Linear layers run with int8 weights; nothing to export
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif backend.startswith('onnx'):
+            self.onnx_session = self._load_onnx_session(model_path, quantized=backend == 'onnx-int8')
+        
+        # Optionally serve concurrent predictions from shared padded batches
+        self.scheduler = BatchScheduler(self._predict_sorted_batch, max_batch_size, max_wait_ms) if batching else None
         
         # Job categories
         self.labels = ["plumber", "driver", "sweeper", "electrician"]
         
+        # Salary, location and scam signals, shared with the API and dashboard;
+        # the keyword counts per label drive the rules tier of the cascade
+        self.rule_keywords = {label: JOB_CATEGORIES[LABEL_CATEGORIES.get(label, label)] for label in self.labels}
+        self.extractor = EntityExtractor(self.rule_keywords, scam_threshold=SCAM_SCORE_THRESHOLD)
+        
+        # Confidence-gated cascade: rules, then TF-IDF + RandomForest, then the
+        # transformer. Off by default, since confident cheaper tiers can answer
+        # differently from the transformer; opt in once their accuracy is checked
+        self.cascade = cascade
+        self.rules_threshold = rules_threshold
+        self.rf_threshold = rf_threshold
+        self._tier_lock = threading.Lock()
+        self._tier_evaluated = dict.fromkeys(TIERS, 0)
+        self._tier_answered = dict.fromkeys(TIERS, 0)
+        self._tier_seconds = dict.fromkeys(TIERS, 0.0)
+        
         # Load RandomForest if available
         try:
             with open('rf_model.pkl', 'rb') as f:
@@ -28,88 +160,171 @@ class EnhancedJobClassifier:
     
     def predict_with_confidence(self, text):
         """Get prediction with confidence score"""
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+        label, confidence, _ = self.predict_with_tier(text)
+        return label, confidence
+    
+    def predict_with_tier(self, text):
+        """Prediction, confidence and the cascade tier that answered"""
+        return self._predict_cascade([text])[0]
+    
+    def _rules_predict(self, text):
+        """Label with the most matching keywords; confidence grows with its lead"""
+        counts = self.extractor.extract(text)['category_counts']
+        if not counts:
+            return None, 0.0
+        ranked = sorted(counts.values(), reverse=True)
+        lead = ranked[0] - (ranked[1] if len(ranked) > 1 else 0)
+        label = max(self.labels, key=lambda label: counts.get(label, 0))
+        return label, min(0.95, 0.6 + 0.1 * lead)
+    
+    def _rf_predict(self, texts):
+        """(label, probability) from the sparse TF-IDF + RandomForest model"""
+        probs = self.rf_model.predict_proba(self.vectorizer.transform(texts))
+        classes = self.rf_model.classes_
+        return [(str(classes[row.argmax()]), float(row.max())) for row in probs]
+    
+    def _transformer_predict(self, texts, batch_size=32):
+        """Transformer predictions, through the batch scheduler for single texts if enabled"""
+        if self.scheduler and len(texts) == 1:
+            return [self.scheduler.predict(texts[0])]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            for i, result in zip(chunk, self._predict_sorted_batch([texts[i] for i in chunk])):
+                results[i] = result
+        return results
+    
+    def _run_tier(self, tier, texts, pending, results, predict, threshold):
+        """Answer the pending texts the tier is confident about; return the rest"""
+        started = time.perf_counter()
+        remaining = []
+        for i, (label, confidence) in zip(pending, predict([texts[i] for i in pending])):
+            if label is not None and confidence >= threshold:
+                results[i] = (label, confidence, tier)
+            else:
+                remaining.append(i)
+        with self._tier_lock:
+            self._tier_evaluated[tier] += len(pending)
+            self._tier_answered[tier] += len(pending) - len(remaining)
+            self._tier_seconds[tier] += time.perf_counter() - started
+        return remaining
+    
+    def _predict_cascade(self, texts, batch_size=32):
+        """(label, confidence, tier) per text; each tier only sees what the cheaper ones left"""
+        results = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.cascade and pending:
+            pending = self._run_tier('rules', texts, pending, results,
+                                     lambda batch: [self._rules_predict(text) for text in batch],
+                                     self.rules_threshold)
+        if self.cascade and pending and self.rf_model is not None and self.vectorizer is not None:
+            pending = self._run_tier('rf', texts, pending, results, self._rf_predict, self.rf_threshold)
+        if pending:
+            # The transformer always answers
+            self._run_tier('transformer', texts, pending, results,
+                           lambda batch: self._transformer_predict(batch, batch_size), 0.0)
+        return results
+    
+    def cascade_stats(self):
+        """How much traffic each tier evaluated and answered, and its time per text"""
+        with self._tier_lock:
+            requests = self._tier_evaluated[TIERS[0]] if self.cascade else self._tier_evaluated['transformer']
+            return {
+                'requests': requests,
+                'thresholds': {'rules': self.rules_threshold, 'rf': self.rf_threshold},
+                'tiers': {
+                    tier: {
+                        'evaluated': self._tier_evaluated[tier],
+                        'answered': self._tier_answered[tier],
+                        'share': self._tier_answered[tier] / requests if requests else 0.0,
+                        'avg_ms': (self._tier_seconds[tier] / self._tier_evaluated[tier] * 1000
+                                   if self._tier_evaluated[tier] else 0.0)
+                    }
+                    for tier in TIERS
+                }
+            }
+    
+    def _load_onnx_session(self, model_path, quantized=False):
+        """Export (and quantize) the model next to its weights, then open it
+        
+        The exports are reused until the files in ``model_path`` change.
+        """
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("The ONNX backends need onnxruntime: pip install onnx onnxruntime")
+        
+        signature = weights_signature(model_path)
+        exported = build_once(os.path.join(model_path, 'model.onnx'), signature,
+                              lambda path: export_onnx(self.model, self.tokenizer, path))
+        onnx_path = exported
+        if quantized:
+            onnx_path = build_once(os.path.join(model_path, 'model.int8.onnx'), signature,
+                                   lambda path: quantize_onnx(exported, path))
+        
+        session = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        self.onnx_input_names = [model_input.name for model_input in session.get_inputs()]
+        return session
+    
+    def _logits(self, inputs):
+        """Forward pass on the selected backend"""
+        import torch
+        if self.onnx_session is not None:
+            feeds = {name: inputs[name].numpy() for name in self.onnx_input_names}
+            return torch.from_numpy(self.onnx_session.run(['logits'], feeds)[0])
         with torch.no_grad():
-            outputs = self.model(**inputs)
+            return self.model(**inputs).logits
+    
+    def _predict_sorted_batch(self, texts):
+        """One padded forward pass over ``texts``; returns (label, confidence) per text"""
+        inputs = self.tokenizer(texts, return_tensors="pt", truncation=True, padding=True)
+        logits = self._logits(inputs)
         
-        probs = torch.softmax(outputs.logits, dim=1)
-        confidence = torch.max(probs).item()
-        pred_class = torch.argmax(outputs.logits, dim=1).item()
+        import torch
+        probs = torch.softmax(logits, dim=1)
+        confidences, pred_classes = torch.max(probs, dim=1)
+        return [(self.labels[pred_class], confidence)
+                for pred_class, confidence in zip(pred_classes.tolist(), confidences.tolist())]
+    
+    def predict_batch(self, texts, batch_size=32):
+        """Predict many texts offline, batching similar lengths together
         
-        return self.labels[pred_class], confidence
+        Returns (label, confidence) pairs in the order of ``texts``. Only the texts
+        the cheaper cascade tiers are unsure about reach the transformer.
+        """
+        return [(label, confidence) for label, confidence, _ in self._predict_cascade(texts, batch_size)]
+    
+    def batching_stats(self):
+        """Throughput and queue latency of the batch scheduler, if enabled"""
+        return self.scheduler.stats() if self.scheduler else None
     
     def extract_salary_info(self, text):
         """Extract salary information from job description"""
-        salary_patterns = [
-            r'₹\s*(\d+(?:,\d+)*)\s*(?:-|to)\s*₹?\s*(\d+(?:,\d+)*)',
-            r'(\d+(?:,\d+)*)\s*(?:-|to)\s*(\d+(?:,\d+)*)\s*(?:rs|rupees|₹)',
-            r'salary\s*:?\s*₹?\s*(\d+(?:,\d+)*)',
-            r'(\d+)k\s*(?:-|to)\s*(\d+)k'
-        ]
-        
-        for pattern in salary_patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                if len(match.groups()) == 2:
-                    min_sal = int(match.group(1).replace(',', ''))
-                    max_sal = int(match.group(2).replace(',', ''))
-                    if 'k' in pattern:
-                        min_sal *= 1000
-                        max_sal *= 1000
-                    return min_sal, max_sal
-                else:
-                    sal = int(match.group(1).replace(',', ''))
-                    return sal, sal
-        return None, None
+        salary = self.extractor.extract(text)['salary']
+        return (salary['min'], salary['max']) if salary else (None, None)
     
     def extract_location(self, text):
         """Extract location from job description"""
-        indian_cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'hyderabad', 
-                        'pune', 'ahmedabad', 'surat', 'jaipur', 'lucknow', 'kanpur']
-        
-        text_lower = text.lower()
-        for city in indian_cities:
-            if city in text_lower:
-                return city.title()
-        return None
+        return self.extractor.extract(text)['location']
     
     def detect_scam_indicators(self, text):
         """Detect potential scam job postings"""
-        scam_keywords = ['work from home guaranteed', 'no experience needed high salary', 
-                        'earn lakhs', 'part time full salary', 'investment required']
-        
-        suspicious_patterns = [
-            r'earn\s+₹?\d+\s+lakhs?\s+monthly',
-            r'no\s+work\s+high\s+salary',
-            r'investment\s+of\s+₹?\d+'
-        ]
-        
-        text_lower = text.lower()
-        scam_score = 0
-        
-        for keyword in scam_keywords:
-            if keyword in text_lower:
-                scam_score += 1
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, text_lower):
-                scam_score += 2
-        
-        return scam_score > 2
+        return self.extractor.extract(text)['is_suspicious']
     
     def analyze_job(self, job_text):
         """Comprehensive job analysis"""
-        category, confidence = self.predict_with_confidence(job_text)
-        min_salary, max_salary = self.extract_salary_info(job_text)
-        location = self.extract_location(job_text)
-        is_suspicious = self.detect_scam_indicators(job_text)
+        category, confidence, tier = self.predict_with_tier(job_text)
+        entities = self.extractor.extract(job_text)
         
         return {
             'category': category,
             'confidence': confidence,
-            'salary_range': (min_salary, max_salary) if min_salary else None,
-            'location': location,
-            'is_suspicious': is_suspicious,
+            'salary_range': entities['salary_range'],
+            'pay_period': entities['salary']['period'] if entities['salary'] else None,
+            'location': entities['location'],
+            'is_suspicious': entities['is_suspicious'],
+            'tier': tier,
             'text': job_text
         }
 
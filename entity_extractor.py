@@ -0,0 +1,229 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from keyword_matcher import JobKeywordMatcher
+
+# Cities recognised in postings; the location is the first one mentioned
+CITIES = ['mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad',
+          'ahmedabad', 'kolkata', 'jaipur', 'lucknow', 'kanpur', 'nagpur',
+          'indore', 'thane', 'bhopal', 'visakhapatnam', 'pimpri', 'patna', 'surat']
+
+# Phrases that mark a posting as suspicious (one point each)
+SCAM_INDICATORS = [
+    'work from home guaranteed', 'no experience high salary', 'no experience needed high salary',
+    'earn lakhs', 'investment required', 'registration fee', 'advance payment',
+    'part time full salary', 'easy money', 'get rich quick'
+]
+
+# Suspicious patterns are worth two points each
+SCAM_PATTERN_WEIGHT = 2
+
+# A posting with at least this score is flagged (the API and dashboard rule:
+# any indicator); classifiers can pass their own threshold
+SCAM_SCORE_THRESHOLD = 1
+
+# Bump when the extraction logic changes in a way the lists and patterns below
+# do not show (see EntityExtractor.rules_version)
+RULES_VERSION = 1
+
+# Multipliers for amounts written as "15k" or "2 lakh"
+AMOUNT_UNITS = {'k': 1000, 'lakh': 100000, 'lakhs': 100000, 'lac': 100000, 'lacs': 100000}
+
+# Pay period spellings, normalised
+PERIODS = {
+    'day': 'daily', 'daily': 'daily',
+    'month': 'monthly', 'monthly': 'monthly', 'mo': 'monthly', 'pm': 'monthly',
+    'year': 'yearly', 'yr': 'yearly', 'annum': 'yearly', 'pa': 'yearly'
+}
+
+_NUMBER = r'\d+(?:,\d+)*(?:\.\d+)?'
+_UNIT = r'(?:k|lakhs?|lacs?)\b'
+_CURRENCY = r'(?:₹|(?<![a-z])rs\.?|(?<![a-z])inr\b)'
+
+# Salary amount or range with its currency, "k"/"lakh" unit and pay period. The
+# leading lookahead lets the regex engine skip positions that cannot start one.
+SALARY_PATTERN = re.compile(
+    r'(?=[s₹ri0-9])'
+    r'(?P<label>salary\s*:?\s*)?'
+    rf'(?P<currency>{_CURRENCY}\s*)?'
+    rf'(?P<low>{_NUMBER})(?:\s*(?P<low_unit>{_UNIT}))?'
+    rf'(?:\s*(?:-|–|to)\s*{_CURRENCY}?\s*(?P<high>{_NUMBER})(?:\s*(?P<high_unit>{_UNIT}))?)?'
+    r'(?P<suffix>\s*(?:₹|(?<![a-z])rs\b\.?|rupees|inr\b))?'
+    r'(?:\s*(?:/|per|a|an|-)?\s*(?P<period>day|daily|monthly|month|mo|pm|annum|year|yr|pa)\b)?'
+)
+
+# Suspicious patterns, worth SCAM_PATTERN_WEIGHT points each
+SCAM_PATTERN = re.compile(
+    r'earn\s+₹?\d+\s+lakhs?\s+monthly'
+    r'|no\s+work\s+high\s+salary'
+    r'|investment\s+of\s+₹?\d+'
+)
+
+
+def text_key(text):
+    """Cache key for a posting's text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def rules_version(job_categories, cities, scam_indicators, scam_threshold):
+    """Short hash identifying the extraction rules, for keying stored results"""
+    rules = [RULES_VERSION, sorted((category, list(keywords)) for category, keywords in job_categories.items()),
+             cities, scam_indicators, scam_threshold, SCAM_PATTERN_WEIGHT, SCAM_PATTERN.pattern,
+             SALARY_PATTERN.pattern, sorted(AMOUNT_UNITS.items()), sorted(PERIODS.items())]
+    return hashlib.sha1(repr(rules).encode('utf-8')).hexdigest()[:12]
+
+
+def _amount(number, unit):
+    value = float(number.replace(',', ''))
+    if unit:
+        value *= AMOUNT_UNITS[unit]
+    return int(value)
+
+
+class EntityExtractor:
+    """Salary, pay period, location and scam signals of a posting, with a result cache
+
+    Salaries (amount or range, unit and pay period) come from one precompiled regex
+    pass. Cities, scam phrases and category keywords (if given) are found
+    together in one Aho-Corasick scan, so the cost does not grow with the size
+    of those lists. A posting is suspicious when its scam score reaches
+    ``scam_threshold``. Results are kept in a bounded LRU cache keyed by a hash
+    of the text, so reposted descriptions are not scanned again; treat returned
+    dicts as read-only.
+
+    ``rules_version`` is a hash of RULES_VERSION, the keyword lists, the
+    patterns and the threshold; results stored elsewhere are keyed by it so
+    they are recomputed when any of those change.
+    """
+
+    def __init__(self, job_categories=None, cities=CITIES, scam_indicators=SCAM_INDICATORS,
+                 cache_size=4096, scam_threshold=SCAM_SCORE_THRESHOLD):
+        self.cities = list(cities)
+        self.scam_indicators = list(scam_indicators)
+        self.scam_threshold = scam_threshold
+        self.matcher = JobKeywordMatcher(job_categories or {}, self.cities, self.scam_indicators)
+        self.rules_version = rules_version(job_categories or {}, self.cities, self.scam_indicators,
+                                           scam_threshold)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def extract(self, text):
+        """Entities of ``text``, from the cache when the same text was seen before
+
+        Returns a dict with:
+          - ``salary``: ``{'min', 'max', 'unit', 'period'}`` of the best salary span, or None
+          - ``salary_range``: ``(min, max)`` of that span, or None
+          - ``location``: first city mentioned, title-cased, or None
+          - ``scam_flags``, ``scam_score`` and ``is_suspicious``
+          - ``category_counts``: category -> distinct keywords found
+          - ``spans``: typed spans (``salary_amount``, ``salary_range``, ``location``,
+            ``scam``) in text order, each with ``start``, ``end`` and ``text``
+        """
+        key = text_key(text)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = self._extract(text)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _extract(self, text):
+        text_lower = text.lower()
+        # Span offsets index the lowercased text; fall back to it in the rare case
+        # where lowercasing changed the length
+        source = text if len(text_lower) == len(text) else text_lower
+
+        # Cities, scam phrases and category keywords in one pass
+        keywords = self.matcher.match(text_lower, lowered=True)
+        spans = []
+        for start, end, keyword, group in keywords['spans']:
+            if group == JobKeywordMatcher.LOCATION:
+                spans.append({'type': 'location', 'start': start, 'end': end,
+                              'text': source[start:end], 'value': keyword.title()})
+            elif group == JobKeywordMatcher.SCAM:
+                spans.append({'type': 'scam', 'start': start, 'end': end, 'text': source[start:end]})
+        location = keywords['location']
+        scam_flags = list(keywords['scam_flags'])
+        scam_score = len(scam_flags)
+        for match in SCAM_PATTERN.finditer(text_lower):
+            start, end = match.span()
+            spans.append({'type': 'scam', 'start': start, 'end': end, 'text': source[start:end]})
+            if match.group() not in scam_flags:
+                scam_flags.append(match.group())
+                scam_score += SCAM_PATTERN_WEIGHT
+
+        salary_spans = []
+        for match in SALARY_PATTERN.finditer(text_lower):
+            low_unit, high_unit = match.group('low_unit'), match.group('high_unit')
+            # A bare number is only a salary with a currency, label or amount unit
+            if not (match.group('label') or match.group('currency') or match.group('suffix')
+                    or low_unit or high_unit):
+                continue
+
+            start, end = match.span()
+            while end > start and text_lower[end - 1].isspace():
+                end -= 1
+            unit = low_unit or high_unit
+            period = PERIODS.get(match.group('period'))
+            if match.group('high'):
+                # "15-20k" applies the unit to both ends
+                low = _amount(match.group('low'), low_unit or high_unit)
+                high = _amount(match.group('high'), high_unit or low_unit)
+                span = {'type': 'salary_range', 'start': start, 'end': end, 'text': source[start:end],
+                        'min': min(low, high), 'max': max(low, high), 'unit': unit, 'period': period}
+            else:
+                amount = _amount(match.group('low'), low_unit)
+                span = {'type': 'salary_amount', 'start': start, 'end': end, 'text': source[start:end],
+                        'min': amount, 'max': amount, 'unit': unit, 'period': period}
+            salary_spans.append(span)
+            spans.append(span)
+
+        spans.sort(key=lambda span: (span['start'], span['end']))
+
+        # An explicit range is the most informative; otherwise the first amount
+        best = next((span for span in salary_spans if span['type'] == 'salary_range'),
+                    salary_spans[0] if salary_spans else None)
+        salary = None
+        if best and best['min'] > 0:
+            salary = {field: best[field] for field in ('min', 'max', 'unit', 'period')}
+
+        return {
+            'salary': salary,
+            'salary_range': (salary['min'], salary['max']) if salary else None,
+            'location': location,
+            'scam_flags': scam_flags,
+            'scam_score': scam_score,
+            'is_suspicious': scam_score >= self.scam_threshold,
+            'category_counts': keywords['category_counts'],
+            'spans': spans
+        }
+
+    def cache_info(self):
+        """Hit/miss counters and current size of the result cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._cache),
+                'max_size': self.cache_size
+            }
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
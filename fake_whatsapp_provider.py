@@ -0,0 +1,113 @@
+"""Local stand-in for the WhatsApp provider: posts webhooks to the bot and checks its queue.
+
+Usage:
+    python fake_whatsapp_provider.py [--url http://localhost:5000] [--messages 200]
+                                     [--concurrency 8] [--phones 20]
+                                     [--text "find electrician job" ...] [--duplicates 0.2]
+                                     [--in-process]
+
+Each webhook carries one text message with a unique id from one of ``--phones``
+senders, cycling through the ``--text`` bodies. Like a real provider, a refused
+delivery (503) is retried after its Retry-After delay, up to ``--retries`` times,
+and a ``--duplicates`` share of the webhooks is delivered a second time with the
+same message id, which the bot should acknowledge without answering again.
+The script reports how long the bot took to acknowledge (what the provider's
+timeout sees), then polls ``/metrics`` until the queue has drained and prints
+the queue's own counters. ``--in-process`` imports whatsapp_bot and uses
+Flask's test client instead of HTTP, so no server needs to be running.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def http_client(url):
+    import requests
+    session = requests.Session()
+
+    def post(payload):
+        response = session.post(f"{url}/webhook", json=payload, timeout=30)
+        return response.status_code, response.headers.get('Retry-After')
+
+    def metrics():
+        return session.get(f"{url}/metrics", timeout=30).json()
+
+    return post, metrics
+
+
+def in_process_client():
+    import whatsapp_bot
+    client = whatsapp_bot.app.test_client()
+
+    def post(payload):
+        response = client.post('/webhook', json=payload)
+        return response.status_code, response.headers.get('Retry-After')
+
+    def metrics():
+        return client.get('/metrics').get_json()
+
+    return post, metrics
+
+
+def webhook(message_id, phone, body):
+    return {'messages': [{'id': message_id, 'from': phone, 'type': 'text', 'text': {'body': body}}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--in-process', action='store_true', help="Drive whatsapp_bot.app without a server")
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--phones', type=int, default=20)
+    parser.add_argument('--text', nargs='+', default=['find electrician job', 'search driver job in Mumbai'])
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--duplicates', type=float, default=0.0, help="Share of webhooks redelivered once")
+    parser.add_argument('--drain-timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    post, metrics = in_process_client() if args.in_process else http_client(args.url)
+
+    # Redeliveries reuse the id (and content) of an earlier message
+    redelivered = int(args.messages * args.duplicates)
+
+    def deliver(i):
+        if i >= args.messages:
+            i = (i - args.messages) * args.messages // max(redelivered, 1)
+        payload = webhook(f"wamid.fake.{i}", f"9190000{i % args.phones:05d}", args.text[i % len(args.text)])
+        for attempt in range(args.retries + 1):
+            started = time.perf_counter()
+            status, retry_after = post(payload)
+            ack = time.perf_counter() - started
+            if status != 503 or attempt == args.retries:
+                return status, ack, attempt
+            time.sleep(float(retry_after or 1))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(deliver, range(args.messages + redelivered)))
+    elapsed = time.perf_counter() - started
+
+    acks = sorted(ack for _, ack, _ in results)
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    retried = sum(1 for _, _, attempts in results if attempts)
+    print(f"{len(results)} webhooks ({redelivered} redelivered) in {elapsed:.2f}s; "
+          f"statuses {statuses}, {retried} retried after 503")
+    print(f"ack latency p50 {acks[len(acks) // 2] * 1000:.1f} ms, "
+          f"p95 {acks[min(len(acks) - 1, int(0.95 * len(acks)))] * 1000:.1f} ms, max {acks[-1] * 1000:.1f} ms")
+
+    deadline = time.monotonic() + args.drain_timeout
+    while True:
+        queue = metrics()['queue']
+        if (queue['queued'] == 0 and queue['in_flight'] == 0) or time.monotonic() > deadline:
+            break
+        time.sleep(0.2)
+    print(f"drained after {time.perf_counter() - started:.2f}s")
+    print(json.dumps(metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import fcntl
+import os
+
+
+class FileLock:
+    """Exclusive advisory lock (``flock``) on ``path``, shared by every process using it
+
+    Nested ``acquire`` calls only count, so a holder can call other methods that
+    take the same lock. The lock file is reopened after a fork: flock locks
+    belong to the open file, which a forked child would otherwise share with
+    its parent. Callers guard the object itself with their own thread lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+        self._depth = 0
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            # Inherited across a fork: the parent's hold is not ours. Closing our
+            # copy of the descriptor leaves the parent's lock alone
+            if self._fd is not None:
+                os.close(self._fd)
+            self._fd = None
+            self._depth = 0
+        if self._depth == 0:
+            if self._fd is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._pid = os.getpid()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,121 @@
+from urllib.parse import urlparse
+
+UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LOWER = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def class_contains(*keywords):
+    """XPath predicate: the element's class attribute contains any keyword (any case)"""
+    return ' or '.join(f"contains(translate(@class, '{UPPER}', '{LOWER}'), '{keyword}')"
+                       for keyword in keywords)
+
+
+def text_contains(*keywords):
+    """XPath predicate: the text node contains any keyword (any case)"""
+    return ' or '.join(f"contains(translate(., '{UPPER}', '{LOWER}'), '{keyword}')"
+                       for keyword in keywords)
+
+
+# Selectors mirror the BeautifulSoup heuristics in SkillIndiaScraper._parse_job_listings.
+# Each title/description/location/link entry is a list of XPath expressions
+# relative to a container; the first one that matches wins.
+DEFAULT_SELECTORS = {
+    'container': f"//*[self::div or self::article][{class_contains('job', 'vacancy', 'opening', 'position')}]",
+    'title': [
+        f".//*[self::h1 or self::h2 or self::h3 or self::h4][{class_contains('title')}]",
+        ".//*[self::h1 or self::h2 or self::h3 or self::h4]"
+    ],
+    'description': [f".//*[self::p or self::div][{class_contains('desc', 'detail', 'content')}]"],
+    'location': [f".//text()[{text_contains('mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad')}]"],
+    'link': [".//a[@href]/@href"]
+}
+
+# Per-source configuration, keyed by host. 'parser' picks the backend for that
+# source ('lxml' or 'soup'); 'selectors' overrides entries of DEFAULT_SELECTORS.
+SOURCE_CONFIG = {
+    'www.skillindia.gov.in': {'parser': 'lxml', 'selectors': {}},
+}
+
+DEFAULT_SOURCE_CONFIG = {'parser': 'lxml', 'selectors': {}}
+
+
+def source_config(url):
+    """Parser configuration for the host of ``url``"""
+    return SOURCE_CONFIG.get(urlparse(url).netloc, DEFAULT_SOURCE_CONFIG)
+
+
+class LxmlJobExtractor:
+    """Extract job listings with lxml and XPath expressions compiled once
+
+    Produces the same fields as the BeautifulSoup path: title, description,
+    location text and the first link of each container.
+    """
+
+    def __init__(self, selectors=None):
+        from lxml import etree
+
+        merged = dict(DEFAULT_SELECTORS)
+        merged.update(selectors or {})
+        self._container = etree.XPath(merged['container'])
+        self._fields = {field: [etree.XPath(expression) for expression in merged[field]]
+                        for field in ('title', 'description', 'location', 'link')}
+
+    @staticmethod
+    def _text(element):
+        """Same as BeautifulSoup's get_text(strip=True)"""
+        return ''.join(text.strip() for text in element.itertext())
+
+    def _first(self, container, field):
+        for xpath in self._fields[field]:
+            found = xpath(container)
+            if found:
+                return found[0]
+        return None
+
+    def extract(self, html_content, limit=20):
+        """Return up to ``limit`` dicts with title, description, location and link"""
+        import lxml.html
+
+        if isinstance(html_content, str):
+            html_content = html_content.encode('utf-8')
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+        try:
+            root = lxml.html.document_fromstring(html_content, parser=parser)
+        except Exception:
+            # lxml rejects empty documents
+            return []
+
+        records = []
+        for container in self._container(root)[:limit]:
+            title_elem = self._first(container, 'title')
+            title = self._text(title_elem) if title_elem is not None else "Job Opening"
+            desc_elem = self._first(container, 'description')
+            location_text = self._first(container, 'location')
+            records.append({
+                'title': title,
+                'description': self._text(desc_elem) if desc_elem is not None else title,
+                'location': location_text.strip() if location_text is not None else "India",
+                'link': self._first(container, 'link')
+            })
+        return records
+
+
+_extractors = {}
+
+
+def get_extractor(url):
+    """Return the compiled lxml extractor for ``url``'s source, or None to use soup
+
+    Extractors are built once per source; None is also returned when lxml is not
+    installed so callers can fall back to BeautifulSoup.
+    """
+    config = source_config(url)
+    if config.get('parser') != 'lxml':
+        return None
+    host = urlparse(url).netloc
+    if host not in _extractors:
+        try:
+            _extractors[host] = LxmlJobExtractor(config.get('selectors'))
+        except ImportError:
+            _extractors[host] = None
+    return _extractors[host]
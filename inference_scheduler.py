@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """Gather concurrent single-text predictions into padded batches
+
+    Callers block in ``predict`` (or hold the Future from ``submit``) while a worker
+    thread collects requests until ``max_batch_size`` is reached or the oldest one
+    has waited ``max_wait_ms``. Each batch is sorted by length, to keep padding
+    small, and passed to ``predict_batch(texts) -> results``, which must return one
+    result per text in the same order.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=16, max_wait_ms=5.0, latency_window=1000):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._started_at = time.monotonic()
+        self._requests = 0
+        self._batches = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """Queue a text; the returned Future resolves to its prediction"""
+        if self._closed:
+            raise RuntimeError("BatchScheduler is closed")
+        future = Future()
+        self._queue.put((text, future, time.monotonic()))
+        return future
+
+    def predict(self, text, timeout=None):
+        """Blocking single prediction served from a batch"""
+        return self.submit(text).result(timeout)
+
+    def _collect(self):
+        """Block for the first request, then gather more until full or the deadline"""
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = item[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown requested; finish this batch first
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            started = time.monotonic()
+            batch.sort(key=lambda item: len(item[0]))
+            try:
+                results = self.predict_batch([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                results = list(results)
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+                # A short result list must not leave callers waiting forever
+                if len(results) != len(batch):
+                    error = RuntimeError(f"predict_batch returned {len(results)} results for {len(batch)} texts")
+                    for _, future, _ in batch[len(results):]:
+                        future.set_exception(error)
+
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._latencies.extend(started - enqueued for _, _, enqueued in batch)
+
+    def stats(self):
+        """Throughput and queue-latency figures since the scheduler started"""
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at
+            latencies = sorted(self._latencies)
+            requests, batches = self._requests, self._batches
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            'requests': requests,
+            'batches': batches,
+            'avg_batch_size': requests / batches if batches else 0.0,
+            'throughput_per_s': requests / elapsed if elapsed else 0.0,
+            'queue_latency_ms': {
+                'avg': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': latencies[-1] * 1000 if latencies else 0.0
+            }
+        }
+
+    def close(self):
+        """Stop the worker after the queued requests are served"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
@@ -1,47 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional
 import json
-import os
-from skill_india_scraper import SkillIndiaScraper
-import re
+import tempfile
+import threading
+from skill_india_scraper import AsyncSkillIndiaScraper, ConditionalRequestCache
+from datetime import datetime
+from entity_extractor import EntityExtractor, CITIES, SCAM_INDICATORS
+from job_categories import JOB_CATEGORIES
+from job_store import JobLogStore
+from job_log import JobLog
+from job_enrichment import JobEnricher
+from job_index import JobIndex, encode_cursor, decode_cursor, positions_by_id, resume_position
+from text_index import InvertedIndex
+from job_stats import JobAggregates
 
 app = FastAPI(title="Job Classification API", version="1.0.0")
 
 # Enhanced job classifier
 class EnhancedJobClassifier:
     def __init__(self):
-        self.job_categories = {
-            'electrician': ['electric', 'wiring', 'voltage', 'circuit', 'electrical', 'power'],
-            'plumber': ['plumb', 'pipe', 'water', 'leak', 'bathroom', 'toilet', 'drainage'],
-            'driver': ['drive', 'truck', 'delivery', 'transport', 'vehicle', 'auto', 'taxi'],
-            'cleaner': ['clean', 'sweep', 'housekeep', 'janitor', 'sanitiz', 'maintenance'],
-            'carpenter': ['carpent', 'wood', 'furniture', 'cabinet', 'door', 'window'],
-            'mechanic': ['mechanic', 'repair', 'engine', 'motor', 'garage', 'service'],
-            'security_guard': ['security', 'guard', 'watchman', 'safety', 'patrol'],
-            'cook': ['cook', 'chef', 'kitchen', 'food', 'restaurant', 'catering'],
-            'tailor': ['tailor', 'sewing', 'stitch', 'garment', 'cloth', 'alteration'],
-            'construction_worker': ['construction', 'building', 'mason', 'labor', 'site'],
-            'ac_technician': ['ac', 'air condition', 'cooling', 'hvac', 'refrigerat'],
-            'beautician': ['beauty', 'salon', 'hair', 'makeup', 'facial', 'parlor'],
-            'delivery_boy': ['delivery', 'courier', 'parcel', 'logistics', 'shipping'],
-            'sales_executive': ['sales', 'marketing', 'customer', 'business', 'retail'],
-            'data_entry': ['data entry', 'typing', 'computer', 'excel', 'office'],
-            'teacher': ['teach', 'tutor', 'education', 'school', 'training', 'instructor'],
-            'nurse': ['nurse', 'medical', 'hospital', 'healthcare', 'patient'],
-            'accountant': ['account', 'finance', 'bookkeep', 'tax', 'audit'],
-            'receptionist': ['reception', 'front desk', 'customer service', 'phone'],
-            'warehouse_worker': ['warehouse', 'inventory', 'stock', 'packing', 'loading']
-        }
+        self.job_categories = JOB_CATEGORIES
+        self.cities = CITIES
+        self.scam_indicators = SCAM_INDICATORS
+        
+        # Category keywords, cities, scam phrases and salaries in a single pass,
+        # cached by text so reposted descriptions are not scanned again
+        self.extractor = EntityExtractor(self.job_categories)
+        # Stored analyses are recomputed when this changes; bump the number when
+        # analyze_job itself changes (e.g. the confidence formula)
+        self.rules_version = f"api-1-{self.extractor.rules_version}"
     
     def analyze_job(self, text):
-        text_lower = text.lower()
+        entities = self.extractor.extract(text)
         
-        category_scores = {}
-        for category, keywords in self.job_categories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                category_scores[category] = score
+        # Keep category order for ties, as the old per-keyword loop did
+        category_scores = {category: entities['category_counts'][category]
+                           for category in self.job_categories
+                           if category in entities['category_counts']}
         
         if category_scores:
             category = max(category_scores, key=category_scores.get)
@@ -50,56 +48,74 @@ class EnhancedJobClassifier:
             category = 'general'
             confidence = 0.3
         
-        # Extract salary
-        salary_patterns = [
-            r'₹\s*(\d+(?:,\d+)*)',
-            r'(\d+)k\s*(?:per|/)?\s*month',
-            r'salary\s*:?\s*₹?\s*(\d+(?:,\d+)*)',
-            r'(\d+(?:,\d+)*)\s*(?:rs|rupees)'
-        ]
-        
-        salary = None
-        for pattern in salary_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                sal_str = match.group(1).replace(',', '')
-                salary = int(sal_str)
-                if 'k' in pattern and 'k' in match.group(0):
-                    salary *= 1000
-                break
-        
-        # Extract location
-        cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad', 
-                 'ahmedabad', 'kolkata', 'jaipur', 'lucknow', 'kanpur', 'nagpur']
-        location = next((city.title() for city in cities if city in text_lower), None)
-        
-        # Scam detection
-        scam_indicators = [
-            'work from home guaranteed', 'no experience high salary', 'earn lakhs',
-            'investment required', 'registration fee', 'advance payment'
-        ]
-        is_suspicious = any(indicator in text_lower for indicator in scam_indicators)
-        
         return {
             'category': category.replace('_', ' ').title(),
             'confidence': confidence,
-            'salary_range': (salary, salary) if salary else None,
-            'location': location,
-            'is_suspicious': is_suspicious,
+            'salary_range': entities['salary_range'],
+            'pay_period': entities['salary']['period'] if entities['salary'] else None,
+            'location': entities['location'],
+            'is_suspicious': entities['is_suspicious'],
             'raw_category': category
         }
 
 # Initialize classifier
 classifier = EnhancedJobClassifier()
 
+# Classifier output is computed once per description at ingest
+job_enricher = JobEnricher(classifier)
+
+# Append-only job log, seeded once from scraped_jobs.json
+job_log = JobLog('scraped_jobs.jsonl')
+job_log.import_json('scraped_jobs.json')
+
+# Shared job store; each refresh reads only the log entries after its stored
+# offset, and the filter and full-text indexes are rebuilt with each new snapshot
+job_store = JobLogStore(job_log, enrich=job_enricher,
+                        derive={'index': JobIndex, 'text_index': InvertedIndex})
+
+# Running statistics, updated with the added/removed jobs of each reload
+job_aggregates = JobAggregates()
+job_store.subscribe(lambda added, removed: job_aggregates.apply_changes(added, removed))
+
+# Load before serving, so no request waits for the first snapshot; later
+# reloads run in the background (see JobStore.snapshot)
+job_store.reload()
+
+# Semantic matcher for /match-jobs, created on first use (sentence-transformers
+# is optional) and re-synced with the store when the snapshot changes
+job_matcher = None
+job_matcher_version = None
+job_matcher_lock = threading.Lock()
+
+def _semantic_match(snapshot, profile, filters, top_k):
+    """Return ``(position, similarity)`` pairs of the best jobs passing ``filters``"""
+    global job_matcher, job_matcher_version
+    with job_matcher_lock:
+        if job_matcher is None:
+            from job_matcher import JobMatcher
+            job_matcher = JobMatcher()
+        if job_matcher_version != snapshot.version:
+            job_matcher.add_jobs(list(snapshot.jobs))
+            job_matcher_version = snapshot.version
+        # Only positions are needed; the jobs come from the snapshot
+        matches = job_matcher.match_profile_to_jobs(profile, filters, top_k=top_k, fields=())
+    return [(match['position'], match['similarity']) for match in matches]
+
+# Uploads to /analyze-jobs larger than this are spooled to disk
+BATCH_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
 # Pydantic models
 class JobAnalysisRequest(BaseModel):
     job_description: str
 
+class BatchJobAnalysisRequest(BaseModel):
+    job_descriptions: List[str]
+
 class JobAnalysisResponse(BaseModel):
     category: str
     confidence: float
     salary_range: Optional[tuple] = None
+    pay_period: Optional[str] = None
     location: Optional[str] = None
     is_suspicious: bool
     raw_category: str
@@ -116,6 +132,9 @@ class JobMatchRequest(BaseModel):
     experience: str
     preferred_location: Optional[str] = None
     min_salary: Optional[int] = None
+    category: Optional[str] = None
+    mode: str = "keyword"
+    limit: int = 10
 
 # API endpoints
 @app.get("/")
@@ -131,60 +150,182 @@ async def analyze_job(request: JobAnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _analyze_chunk(chunk):
+    """Analyze a chunk of (index, description) pairs into NDJSON lines"""
+    lines = []
+    for i, description in chunk:
+        try:
+            result = classifier.analyze_job(description)
+            result['index'] = i
+        except Exception as e:
+            result = {'index': i, 'error': str(e)}
+        lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+    return "".join(lines)
+
+async def _spool_request_body(request):
+    """Copy the upload to a spooled temp file so large bodies don't sit in memory
+    
+    The body has to be consumed before the streaming response starts, because
+    StreamingResponse listens on the same receive channel for disconnects.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_MEMORY)
+    async for data in request.stream():
+        spool.write(data)
+    spool.seek(0)
+    return spool
+
+def _iter_ndjson_descriptions(spool):
+    """Yield descriptions line by line from a spooled NDJSON upload"""
+    with spool:
+        for line in spool:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+
+def _parse_ndjson_line(line):
+    """A line is either a JSON string or an object with a job_description field
+    
+    Anything else raises ValueError, which ends the stream with an error record.
+    """
+    item = json.loads(line)
+    if isinstance(item, dict):
+        item = item.get('job_description', '')
+    if not isinstance(item, str):
+        raise ValueError("expected a string or an object with a string job_description")
+    return item
+
+@app.post("/analyze-jobs")
+async def analyze_jobs(request: Request, chunk_size: int = 100):
+    """Analyze many job descriptions, streaming one NDJSON result per line
+    
+    Accepts a JSON body ({"job_descriptions": [...]} or a bare list) or an NDJSON
+    upload (Content-Type: application/x-ndjson). Results carry the input index.
+    """
+    chunk_size = max(1, chunk_size)
+    content_type = request.headers.get('content-type', '')
+    
+    if 'ndjson' in content_type:
+        spool = await _spool_request_body(request)
+        descriptions = _iter_ndjson_descriptions(spool)
+    else:
+        try:
+            body = await request.json()
+            if isinstance(body, list):
+                body = {'job_descriptions': body}
+            batch = BatchJobAnalysisRequest(**body)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        descriptions = iter(batch.job_descriptions)
+    
+    async def stream_results():
+        # Classify in chunks off the event loop; only one chunk is held at a time
+        chunk = []
+        i = 0
+        try:
+            for description in descriptions:
+                chunk.append((i, description))
+                i += 1
+                if len(chunk) >= chunk_size:
+                    yield await run_in_threadpool(_analyze_chunk, chunk)
+                    chunk = []
+        except ValueError as e:
+            # Malformed NDJSON line: report it and stop
+            if chunk:
+                yield await run_in_threadpool(_analyze_chunk, chunk)
+            yield json.dumps({'index': i, 'error': f"Invalid NDJSON line: {e}"}) + "\n"
+            return
+        if chunk:
+            yield await run_in_threadpool(_analyze_chunk, chunk)
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.get("/jobs")
 async def get_jobs(
     location: Optional[str] = None,
     category: Optional[str] = None,
     min_salary: Optional[int] = None,
-    limit: int = 10
+    max_salary: Optional[int] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
-    """Get filtered job listings"""
+    """Get filtered job listings, paged with an opaque cursor
+    
+    A cursor names the last job of its page, so it keeps working across store
+    reloads; once that job is gone it is rejected with 400.
+    """
+    snapshot = job_store.snapshot()
     try:
-        # Load jobs from file
-        if os.path.exists('scraped_jobs.json'):
-            with open('scraped_jobs.json', 'r', encoding='utf-8') as f:
-                jobs = json.load(f)
-        else:
-            jobs = []
-        
-        # Apply filters
-        filtered_jobs = jobs
-        
-        if location:
-            filtered_jobs = [job for job in filtered_jobs 
-                           if location.lower() in job.get('location', '').lower()]
-        
-        if category:
-            filtered_jobs = [job for job in filtered_jobs 
-                           if category.lower() in job.get('title', '').lower()]
+        after = None
+        if cursor:
+            position, job_id = decode_cursor(cursor)
+            after = resume_position(snapshot.jobs, position, job_id,
+                                    snapshot.derived('by_id', positions_by_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Filters are answered from indexes built once per store snapshot
+        index = snapshot.derived('index', JobIndex)
+        filters = {
+            'location': location,
+            'category': category,
+            'min_salary': min_salary,
+            'max_salary': max_salary
+        }
         
-        if min_salary:
-            # Analyze each job to extract salary and filter
-            salary_filtered = []
-            for job in filtered_jobs:
-                analysis = classifier.analyze_job(job.get('description', ''))
-                if analysis['salary_range'] and analysis['salary_range'][0]:
-                    if analysis['salary_range'][0] >= min_salary:
-                        salary_filtered.append(job)
-                else:
-                    salary_filtered.append(job)  # Include jobs without salary info
-            filtered_jobs = salary_filtered
+        positions, next_after = index.search(limit=limit, after=after, **filters)
         
-        return {"jobs": filtered_jobs[:limit], "total": len(filtered_jobs)}
+        return {
+            "jobs": [snapshot.jobs[position] for position in positions],
+            "total": index.count(**filters),
+            "next_cursor": (encode_cursor(next_after, snapshot.jobs[next_after].get('id'))
+                            if next_after is not None else None)
+        }
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/scrape-jobs")
-async def scrape_new_jobs():
-    """Scrape new jobs from Skill India"""
+# State of the background scrape, reported by /scrape-jobs/status
+scrape_status = {
+    "state": "idle",
+    "started_at": None,
+    "finished_at": None,
+    "jobs_count": 0,
+    "jobs_written": 0,
+    "unchanged_pages": 0,
+    "error": None
+}
+
+async def _run_scrape(max_pages):
+    """Scrape concurrently on the event loop, then save and reload off it"""
     try:
-        scraper = SkillIndiaScraper()
-        jobs = scraper.scrape_jobs()
-        scraper.save_jobs()
-        return {"message": f"Scraped {len(jobs)} jobs successfully", "jobs_count": len(jobs)}
+        # Revalidate pages with ETag/If-Modified-Since and log only the delta
+        scraper = AsyncSkillIndiaScraper(http_cache=ConditionalRequestCache())
+        jobs = await scraper.scrape_jobs_async(max_pages=max_pages)
+        written = await run_in_threadpool(scraper.save_jobs_to_log, job_log, job_enricher)
+        await run_in_threadpool(job_store.reload, force=True)
+        scrape_status.update(state="done", jobs_count=len(jobs), jobs_written=written,
+                             unchanged_pages=scraper.unchanged_pages)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        scrape_status.update(state="failed", error=str(e))
+    finally:
+        scrape_status["finished_at"] = datetime.now().isoformat()
+
+@app.post("/scrape-jobs", status_code=202)
+async def scrape_new_jobs(background_tasks: BackgroundTasks, max_pages: int = 3):
+    """Start scraping new jobs from Skill India in the background"""
+    if scrape_status["state"] == "running":
+        raise HTTPException(status_code=409, detail="A scrape is already running")
+    
+    scrape_status.update(state="running", started_at=datetime.now().isoformat(),
+                         finished_at=None, jobs_count=0, jobs_written=0, unchanged_pages=0,
+                         error=None)
+    background_tasks.add_task(_run_scrape, max_pages)
+    return {"message": "Scrape started", "status": dict(scrape_status)}
+
+@app.get("/scrape-jobs/status")
+async def get_scrape_status():
+    """Get the state of the last background scrape"""
+    return dict(scrape_status)
 
 @app.get("/categories")
 async def get_job_categories():
@@ -196,88 +337,67 @@ async def get_job_categories():
 async def get_job_stats():
     """Get job statistics"""
     try:
-        if os.path.exists('scraped_jobs.json'):
-            with open('scraped_jobs.json', 'r', encoding='utf-8') as f:
-                jobs = json.load(f)
-        else:
-            jobs = []
-        
-        # Analyze all jobs
-        category_counts = {}
-        location_counts = {}
-        salary_data = []
-        
-        for job in jobs:
-            analysis = classifier.analyze_job(job.get('description', ''))
-            
-            # Count categories
-            category = analysis['raw_category']
-            category_counts[category] = category_counts.get(category, 0) + 1
-            
-            # Count locations
-            location = job.get('location', 'Unknown')
-            location_counts[location] = location_counts.get(location, 0) + 1
-            
-            # Collect salary data
-            if analysis['salary_range'] and analysis['salary_range'][0]:
-                salary_data.append(analysis['salary_range'][0])
-        
-        avg_salary = sum(salary_data) / len(salary_data) if salary_data else 0
-        
-        return {
-            "total_jobs": len(jobs),
-            "categories": category_counts,
-            "locations": location_counts,
-            "average_salary": avg_salary,
-            "salary_jobs_count": len(salary_data)
-        }
+        # Start a background refresh if needed; aggregates are maintained incrementally
+        job_store.snapshot()
+        stats = job_aggregates.stats()
+        if job_matcher is not None:
+            stats = dict(stats, query_cache=job_matcher.query_cache_info())
+        return stats
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/match-jobs")
 async def match_jobs(request: JobMatchRequest):
-    """Match user profile to available jobs"""
+    """Match user profile to available jobs
+    
+    ``mode`` is ``keyword`` (BM25 over the descriptions) or ``semantic``
+    (embedding similarity; needs sentence-transformers). Either way the
+    location, category and salary filters are applied before ranking.
+    """
+    if request.mode not in ("keyword", "semantic"):
+        raise HTTPException(status_code=400, detail="mode must be 'keyword' or 'semantic'")
+    
     try:
-        if os.path.exists('scraped_jobs.json'):
-            with open('scraped_jobs.json', 'r', encoding='utf-8') as f:
-                jobs = json.load(f)
-        else:
-            jobs = []
-        
-        # Simple matching based on keywords
-        profile_keywords = (request.skills + " " + request.experience).lower().split()
+        snapshot = job_store.snapshot()
+        profile_text = request.skills + " " + request.experience
         
-        matched_jobs = []
-        for job in jobs:
-            job_text = (job.get('title', '') + " " + job.get('description', '')).lower()
+        if request.mode == "semantic":
+            filters = {
+                'location': request.preferred_location,
+                'category': request.category,
+                'min_salary': request.min_salary
+            }
+            profile = {'skills': request.skills, 'experience': request.experience}
+            top = await run_in_threadpool(_semantic_match, snapshot, profile, filters, request.limit)
+            total = snapshot.derived('index', JobIndex).count(partial_location=True, **filters)
+        else:
+            index = snapshot.derived('index', JobIndex)
+            text_index = snapshot.derived('text_index', InvertedIndex)
             
-            # Calculate match score
-            match_score = sum(1 for keyword in profile_keywords if keyword in job_text)
+            # Location and salary filters are checked before a job is scored; any
+            # location containing the preferred one matches, as it always has
+            accept = index.predicate(location=request.preferred_location,
+                                     category=request.category,
+                                     min_salary=request.min_salary,
+                                     partial_location=True)
             
-            if match_score > 0:
-                # Apply filters
-                if request.preferred_location:
-                    if request.preferred_location.lower() not in job.get('location', '').lower():
-                        continue
-                
-                if request.min_salary:
-                    analysis = classifier.analyze_job(job.get('description', ''))
-                    if analysis['salary_range'] and analysis['salary_range'][0]:
-                        if analysis['salary_range'][0] < request.min_salary:
-                            continue
-                
-                matched_jobs.append({
-                    "job": job,
-                    "match_score": match_score,
-                    "analysis": classifier.analyze_job(job.get('description', ''))
-                })
+            # BM25 over the posting lists of the profile's terms
+            top, total = text_index.search(profile_text, top_k=request.limit, accept=accept)
         
-        # Sort by match score
-        matched_jobs.sort(key=lambda x: x['match_score'], reverse=True)
+        matched_jobs = []
+        for position, score in top:
+            job = snapshot.jobs[position]
+            matched_jobs.append({
+                "job": job,
+                "match_score": score,
+                "analysis": job['analysis']
+            })
         
-        return {"matched_jobs": matched_jobs[:10], "total_matches": len(matched_jobs)}
+        return {"matched_jobs": matched_jobs, "total_matches": total, "mode": request.mode}
     
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Semantic matching needs sentence-transformers installed")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
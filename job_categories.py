@@ -0,0 +1,23 @@
+# Keyword stems for each job category, shared by the rule-based classifiers
+JOB_CATEGORIES = {
+    'electrician': ['electric', 'wiring', 'voltage', 'circuit', 'electrical', 'power'],
+    'plumber': ['plumb', 'pipe', 'water', 'leak', 'bathroom', 'toilet', 'drainage'],
+    'driver': ['drive', 'truck', 'delivery', 'transport', 'vehicle', 'auto', 'taxi'],
+    'cleaner': ['clean', 'sweep', 'housekeep', 'janitor', 'sanitiz', 'maintenance'],
+    'carpenter': ['carpent', 'wood', 'furniture', 'cabinet', 'door', 'window'],
+    'mechanic': ['mechanic', 'repair', 'engine', 'motor', 'garage', 'service'],
+    'security_guard': ['security', 'guard', 'watchman', 'safety', 'patrol'],
+    'cook': ['cook', 'chef', 'kitchen', 'food', 'restaurant', 'catering'],
+    'tailor': ['tailor', 'sewing', 'stitch', 'garment', 'cloth', 'alteration'],
+    'construction_worker': ['construction', 'building', 'mason', 'labor', 'site'],
+    'ac_technician': ['ac', 'air condition', 'cooling', 'hvac', 'refrigerat'],
+    'beautician': ['beauty', 'salon', 'hair', 'makeup', 'facial', 'parlor'],
+    'delivery_boy': ['delivery', 'courier', 'parcel', 'logistics', 'shipping'],
+    'sales_executive': ['sales', 'marketing', 'customer', 'business', 'retail'],
+    'data_entry': ['data entry', 'typing', 'computer', 'excel', 'office'],
+    'teacher': ['teach', 'tutor', 'education', 'school', 'training', 'instructor'],
+    'nurse': ['nurse', 'medical', 'hospital', 'healthcare', 'patient'],
+    'accountant': ['account', 'finance', 'bookkeep', 'tax', 'audit'],
+    'receptionist': ['reception', 'front desk', 'customer service', 'phone'],
+    'warehouse_worker': ['warehouse', 'inventory', 'stock', 'packing', 'loading']
+}
@@ -0,0 +1,93 @@
+import numpy as np
+
+from job_index import job_salary, normalize_category, normalize_location
+
+
+def _object_column(values, size):
+    """1-d object array of ``values``; np.array would turn equal-length lists into a 2-d array"""
+    column = np.empty(size, dtype=object)
+    for i, value in enumerate(values):
+        column[i] = value
+    return column
+
+
+def _codes(values):
+    """Integer code per value, and the distinct values in code order"""
+    vocabulary = {}
+    codes = np.fromiter((vocabulary.setdefault(value, len(vocabulary)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(vocabulary)
+
+
+class JobColumns:
+    """Job metadata stored column by column, row ``i`` being job ``i``
+
+    Every top-level field is one object array (None where a job lacks it), so a
+    result only touches the rows and fields it returns. The filter attributes
+    are kept as vectorizable columns: ``salary`` (float, NaN when unknown) and
+    integer codes of the normalized location and category, so a filter is a
+    few array comparisons over all rows.
+    """
+
+    def __init__(self, jobs):
+        self.size = len(jobs)
+        fields = dict.fromkeys(field for job in jobs for field in job)
+        self.columns = {field: _object_column((job.get(field) for job in jobs), self.size)
+                        for field in fields}
+
+        salaries = [job_salary(job) for job in jobs]
+        self.salary = np.array([np.nan if salary is None else salary for salary in salaries],
+                               dtype=np.float64)
+        self.location_codes, self.locations = _codes(
+            [normalize_location(job.get('location')) for job in jobs])
+        self.category_codes, self.categories = _codes(
+            [normalize_category((job.get('analysis') or {}).get('raw_category') or job.get('category'))
+             for job in jobs])
+        self._category_code = {category: code for code, category in enumerate(self.categories)}
+
+    def __len__(self):
+        return self.size
+
+    def field(self, name):
+        """The column of field ``name`` (an object array), or None if no job has it"""
+        return self.columns.get(name)
+
+    def row(self, position, fields=None):
+        """Job at ``position`` as a dict of ``fields`` (default: all), leaving out missing ones"""
+        names = self.columns if fields is None else fields
+        row = {}
+        for name in names:
+            column = self.columns.get(name)
+            if column is not None and column[position] is not None:
+                row[name] = column[position]
+        return row
+
+    def rows(self, positions, fields=None):
+        return [self.row(position, fields) for position in positions]
+
+    def _location_mask(self, location):
+        # Any location containing the filter matches ("mumbai" matches "Mumbai
+        # Suburbs"), as the matcher always did; JobIndex's partial_location rule
+        matches = np.array([location in value for value in self.locations], dtype=bool)
+        return matches[self.location_codes]
+
+    def mask(self, location=None, category=None, min_salary=None, max_salary=None):
+        """Bool array over rows of the jobs matching the filters, or None without filters
+
+        Jobs without salary information are never filtered out by salary.
+        """
+        masks = []
+        if location:
+            masks.append(self._location_mask(normalize_location(location)))
+        if category:
+            code = self._category_code.get(normalize_category(category))
+            masks.append(self.category_codes == code if code is not None
+                         else np.zeros(self.size, dtype=bool))
+        # NaN compares False, so unknown salaries pass both bounds
+        if min_salary:
+            masks.append(~(self.salary < min_salary))
+        if max_salary:
+            masks.append(~(self.salary > max_salary))
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
@@ -0,0 +1,68 @@
+import hashlib
+
+from ttl_cache import TTLCache
+
+# Analyses remembered in memory, least recently used dropped first
+ANALYSIS_CACHE_SIZE = 10000
+
+# Classifier output persisted on each job record
+ANALYSIS_FIELDS = ('category', 'raw_category', 'confidence', 'salary_range', 'pay_period', 'location',
+                   'is_suspicious')
+
+
+def description_hash(description):
+    """Stable hash of a job description, used to detect unchanged postings"""
+    return hashlib.sha1((description or '').encode('utf-8')).hexdigest()
+
+
+def analysis_key(description, rules_version=''):
+    """Hash of a description and the classifier rules that analyzed it"""
+    if not rules_version:
+        return description_hash(description)
+    return hashlib.sha1(f"{rules_version}\0{description or ''}".encode('utf-8')).hexdigest()
+
+
+class JobEnricher:
+    """Attach classifier output to job records at ingest time
+
+    Each enriched record carries an ``analysis`` dict and the ``analysis_hash`` of
+    the description it was computed from and the classifier's ``rules_version``
+    (if it has one), so records are analyzed again only when the description or
+    the classifier's rules change. The latest ``cache_size`` analyses are also
+    remembered in memory by hash, which covers reposted descriptions and files
+    written before enrichment existed.
+    """
+
+    def __init__(self, classifier, cache_size=ANALYSIS_CACHE_SIZE):
+        self.classifier = classifier
+        self.rules_version = getattr(classifier, 'rules_version', '')
+        self._cache = TTLCache(cache_size)
+
+    def analyze(self, description):
+        """Return the stored analysis for a description, running the classifier if needed"""
+        key = analysis_key(description, self.rules_version)
+        analysis = self._cache.get(key)
+        if analysis is None:
+            result = self.classifier.analyze_job(description or '')
+            analysis = {field: result.get(field) for field in ANALYSIS_FIELDS}
+            if analysis['salary_range'] is not None:
+                analysis['salary_range'] = list(analysis['salary_range'])
+            self._cache.put(key, analysis)
+        return key, analysis
+
+    def enrich_job(self, job):
+        """Return the job with up-to-date ``analysis`` fields"""
+        key = analysis_key(job.get('description', ''), self.rules_version)
+        if job.get('analysis_hash') == key and 'analysis' in job:
+            if key not in self._cache:
+                self._cache.put(key, job['analysis'])
+            return job
+
+        key, analysis = self.analyze(job.get('description', ''))
+        enriched = dict(job)
+        enriched['analysis'] = analysis
+        enriched['analysis_hash'] = key
+        return enriched
+
+    def __call__(self, jobs):
+        return [self.enrich_job(job) for job in jobs]
@@ -0,0 +1,236 @@
+import base64
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Above this share of the corpus a salary range is cheaper to scan than to sort
+SALARY_SCAN_RATIO = 0.1
+
+# Filter combinations whose totals are remembered per snapshot
+MAX_CACHED_TOTALS = 1024
+
+
+def normalize_location(location):
+    """Lowercase and collapse whitespace so 'New  Delhi ' and 'new delhi' match"""
+    return ' '.join((location or '').lower().split())
+
+
+def normalize_category(category):
+    """Map 'AC Technician', 'ac technician' and 'ac_technician' to the same key"""
+    return '_'.join((category or '').lower().replace('_', ' ').split())
+
+
+def job_salary(job):
+    """Minimum salary extracted at ingest (or given as ``min_salary``), or None"""
+    salary_range = (job.get('analysis') or {}).get('salary_range')
+    if salary_range and salary_range[0]:
+        return salary_range[0]
+    return job.get('min_salary') or None
+
+
+def positions_by_id(jobs):
+    """Job id -> snapshot position (first occurrence), built once per snapshot"""
+    positions = {}
+    for position, job in enumerate(jobs):
+        if job.get('id') is not None:
+            positions.setdefault(job['id'], position)
+    return positions
+
+
+def encode_cursor(position, job_id=None):
+    """Opaque cursor pointing just after a snapshot position and the job id there"""
+    raw = json.dumps({'p': position, 'id': job_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor, ``(position, job_id)``; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        position, job_id = data['p'], data.get('id')
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, int) or position < 0:
+        raise ValueError("Invalid cursor")
+    return position, job_id
+
+
+def resume_position(jobs, position, job_id, by_id=None):
+    """Snapshot position a cursor continues after, in the snapshot it is used with
+
+    The cursor's job id is normally still at its position. If a reload moved it
+    (postings before it were deleted), paging continues from wherever it is
+    now: the job log keeps postings in id order, so the page boundary holds.
+    Raises ValueError for a stale cursor, whose job is no longer listed.
+    ``by_id`` is ``positions_by_id(jobs)``, built only when needed if omitted.
+    """
+    if position < len(jobs) and jobs[position].get('id') == job_id:
+        return position
+    if job_id is not None:
+        position = (by_id if by_id is not None else positions_by_id(jobs)).get(job_id)
+        if position is not None:
+            return position
+    raise ValueError("Stale cursor: the job list changed, start again without a cursor")
+
+
+class JobIndex:
+    """Secondary indexes over one job snapshot
+
+    Location and category map to posting lists of snapshot positions (sorted, as
+    they are built in order). Salaries are kept sorted for range queries, with a
+    per-position column for cheap probing while intersecting. Results are always
+    returned in snapshot order, which is what makes position cursors stable
+    (see ``resume_position`` for cursors that outlive their snapshot).
+
+    A location filter matches the full normalized location or one of its
+    comma-separated parts; with ``partial_location`` it matches any location
+    containing it ("mumbai" matches "Mumbai Suburbs"), as /match-jobs always has.
+    """
+
+    def __init__(self, jobs):
+        self.size = len(jobs)
+        self.by_location = {}
+        self.by_category = {}
+        self.location_keys = []
+        self.categories = []
+        self.salaries = []
+        self.no_salary = array('i')
+        self.pair_counts = {}
+
+        salary_pairs = []
+        for position, job in enumerate(jobs):
+            location = normalize_location(job.get('location'))
+            # Index the full location and each comma-separated part ("Thane, Mumbai")
+            keys = {location} | {part.strip() for part in location.split(',') if part.strip()}
+            self.location_keys.append(keys)
+            for key in keys:
+                self.by_location.setdefault(key, array('i')).append(position)
+
+            category = normalize_category((job.get('analysis') or {}).get('raw_category')
+                                          or job.get('category'))
+            self.categories.append(category)
+            self.by_category.setdefault(category, array('i')).append(position)
+            for key in keys:
+                self.pair_counts[(key, category)] = self.pair_counts.get((key, category), 0) + 1
+
+            salary = job_salary(job)
+            self.salaries.append(salary)
+            if salary is None:
+                self.no_salary.append(position)
+            else:
+                salary_pairs.append((salary, position))
+
+        salary_pairs.sort()
+        self.salary_values = [salary for salary, _ in salary_pairs]
+        self.salary_positions = array('i', (position for _, position in salary_pairs))
+        self._totals = {}
+
+    def _salary_range(self, min_salary, max_salary):
+        lo = bisect_left(self.salary_values, min_salary) if min_salary else 0
+        hi = bisect_right(self.salary_values, max_salary) if max_salary else len(self.salary_values)
+        return lo, max(lo, hi)
+
+    def _salary_ok(self, position, min_salary, max_salary):
+        salary = self.salaries[position]
+        # Jobs without salary information are never filtered out
+        if salary is None:
+            return True
+        if min_salary and salary < min_salary:
+            return False
+        if max_salary and salary > max_salary:
+            return False
+        return True
+
+    def _location_keys(self, location, partial_location):
+        """Set of index keys a location filter accepts, or None for no filter"""
+        if not location:
+            return None
+        location = normalize_location(location)
+        if not partial_location:
+            return {location}
+        # Every full location is a key, so this covers each job whose location contains it
+        return {key for key in self.by_location if location in key}
+
+    def _candidates(self, location, category, min_salary, max_salary):
+        """Pick the cheapest sorted position list to drive the intersection"""
+        lists = []
+        if location is not None:
+            if len(location) == 1:
+                lists.append(self.by_location.get(next(iter(location)), ()))
+            else:
+                lists.append(sorted({position for key in location for position in self.by_location[key]}))
+        if category is not None:
+            lists.append(self.by_category.get(category, ()))
+        if lists:
+            return min(lists, key=len)
+
+        if min_salary or max_salary:
+            lo, hi = self._salary_range(min_salary, max_salary)
+            if hi - lo + len(self.no_salary) < self.size * SALARY_SCAN_RATIO:
+                return sorted(list(self.salary_positions[lo:hi]) + list(self.no_salary))
+        return range(self.size)
+
+    def _matches(self, position, location, category, min_salary, max_salary):
+        if location is not None and location.isdisjoint(self.location_keys[position]):
+            return False
+        if category is not None and self.categories[position] != category:
+            return False
+        if (min_salary or max_salary) and not self._salary_ok(position, min_salary, max_salary):
+            return False
+        return True
+
+    def predicate(self, location=None, category=None, min_salary=None, max_salary=None,
+                  partial_location=False):
+        """Return ``position -> bool`` for the given filters, for use by other indexes"""
+        location = self._location_keys(location, partial_location)
+        category = normalize_category(category) if category else None
+        return lambda position: self._matches(position, location, category, min_salary, max_salary)
+
+    def count(self, location=None, category=None, min_salary=None, max_salary=None,
+              partial_location=False):
+        """Number of jobs matching the filters (memoized per filter combination)"""
+        category = normalize_category(category) if category else None
+        key = (normalize_location(location) if location else None, bool(partial_location),
+               category, min_salary, max_salary)
+        if key not in self._totals:
+            location = self._location_keys(location, partial_location)
+            if len(self._totals) >= MAX_CACHED_TOTALS:
+                self._totals.clear()
+            salary_filter = bool(min_salary or max_salary)
+            if location is not None and len(location) == 1 and category is not None and not salary_filter:
+                total = self.pair_counts.get((next(iter(location)), category), 0)
+            elif location is None and category is None:
+                if salary_filter:
+                    lo, hi = self._salary_range(min_salary, max_salary)
+                    total = hi - lo + len(self.no_salary)
+                else:
+                    total = self.size
+            else:
+                candidates = self._candidates(location, category, min_salary, max_salary)
+                total = sum(1 for position in candidates
+                            if self._matches(position, location, category, min_salary, max_salary))
+            self._totals[key] = total
+        return self._totals[key]
+
+    def search(self, location=None, category=None, min_salary=None, max_salary=None,
+               limit=10, after=None, partial_location=False):
+        """Return up to ``limit`` matching positions after cursor position ``after``
+
+        Returns ``(positions, next_after)`` where ``next_after`` is None on the last page.
+        """
+        if limit <= 0:
+            return [], None
+        location = self._location_keys(location, partial_location)
+        category = normalize_category(category) if category else None
+        candidates = self._candidates(location, category, min_salary, max_salary)
+
+        start = 0 if after is None else bisect_right(candidates, after)
+        positions = []
+        for i in range(start, len(candidates)):
+            position = candidates[i]
+            if self._matches(position, location, category, min_salary, max_salary):
+                if len(positions) == limit:
+                    return positions, positions[-1]
+                positions.append(position)
+        return positions, None
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from file_lock import FileLock
+
+# Compact once the log holds this many lines per live job (and at least MIN_COMPACT_LINES)
+COMPACT_RATIO = 3
+MIN_COMPACT_LINES = 1000
+
+# Fields that define a posting's content; id and scrape time are bookkeeping
+CONTENT_FIELDS = ('title', 'description', 'location', 'source')
+
+
+def content_hash(job):
+    """Hash of the posting's content, used for deduplication and change detection"""
+    content = json.dumps([job.get(field) for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def posting_key(job):
+    """Identity of a posting: its detail page if known, otherwise its content"""
+    return job.get('detail_url') or content_hash(job)
+
+
+class JobLog:
+    """Append-only JSON-lines log of job postings
+
+    The first line is a header carrying a ``generation`` number; every other line
+    is ``{"op": "put", "key", "hash", "job"}`` or ``{"op": "delete", "key"}``.
+    Writers only append the postings that changed. ``compact`` rewrites the log
+    with one ``put`` per live posting under a new generation, which tells readers
+    holding an offset to start over.
+
+    ``write_jobs`` keeps the live ``key -> (hash, id)`` state in memory and only
+    reads the entries written since its last call (by this or any other
+    process), like ``JobLogStore`` does. Appends and compaction hold a file lock
+    (``<path>.lock``), so the API and the dashboard can write the same log.
+    """
+
+    def __init__(self, path='scraped_jobs.jsonl'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{path}.lock")
+        self._live = {}
+        self._max_id = 0
+        self._line_count = 0
+        self._offset = 0
+        self._generation = None
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive against other threads and other processes writing the log"""
+        with self._lock, self._file_lock:
+            yield
+
+    def _header(self, generation):
+        return {'op': 'header', 'generation': generation, 'created_at': datetime.now().isoformat()}
+
+    def generation(self):
+        """Generation of the current file, or None if it does not exist"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.loads(f.readline())['generation']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def read_from(self, offset=0):
+        """Read complete entries after byte ``offset``
+
+        Returns ``(entries, next_offset, generation)``. A trailing line that is still
+        being written is left for the next call.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], 0, None
+        with f:
+            header_line = f.readline()
+            try:
+                generation = json.loads(header_line)['generation']
+            except (ValueError, KeyError):
+                return [], 0, None
+
+            f.seek(max(offset, len(header_line)))
+            entries = []
+            next_offset = f.tell()
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                next_offset += len(line)
+                if line.strip():
+                    entries.append(json.loads(line))
+        return entries, next_offset, generation
+
+    def iter_entries(self, chunk_size=4096):
+        """Yield the log's complete entries in lists of up to ``chunk_size``
+
+        Unlike ``read_from`` the file is streamed, so the log is never held in
+        memory at once.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.readline()
+            chunk = []
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                if line.strip():
+                    chunk.append(json.loads(line))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+            if chunk:
+                yield chunk
+
+    def replay(self):
+        """Live postings as ``{key: (hash, job)}`` in first-insertion order"""
+        entries, _, _ = self.read_from(0)
+        return self.apply(entries, {}), len(entries)
+
+    @staticmethod
+    def apply(entries, state):
+        """Fold log entries into ``state`` (``{key: (hash, job)}``) in place"""
+        for entry in entries:
+            if entry['op'] == 'put':
+                state[entry['key']] = (entry['hash'], entry['job'])
+            elif entry['op'] == 'delete':
+                state.pop(entry['key'], None)
+        return state
+
+    def _catch_up(self):
+        """Fold the entries written since the last call into the live state"""
+        entries, offset, generation = self.read_from(self._offset)
+        if generation != self._generation:
+            # Compacted or recreated: start again from the first entry
+            entries, offset, generation = self.read_from(0)
+            self._live = {}
+            self._line_count = 0
+        for entry in entries:
+            if entry['op'] == 'put':
+                job_id = entry['job'].get('id')
+                self._live[entry['key']] = (entry['hash'], job_id)
+                if isinstance(job_id, int):
+                    self._max_id = max(self._max_id, job_id)
+            elif entry['op'] == 'delete':
+                self._live.pop(entry['key'], None)
+        self._line_count += len(entries)
+        self._offset, self._generation = offset, generation
+
+    def append(self, entries):
+        """Append entries, creating the log (with its header) if needed"""
+        if not entries:
+            return
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+        with self._locked():
+            new_file = not os.path.exists(self.path)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if new_file:
+                    f.write(json.dumps(self._header(1)) + '\n')
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def write_jobs(self, jobs, enricher=None):
+        """Append only the new or changed postings among ``jobs``
+
+        Postings whose content hash is already live (under any key) are skipped,
+        as are repeats within ``jobs``. New postings get the next unused id; changed
+        ones keep theirs. Returns the number of entries written.
+        """
+        with self._locked():
+            self._catch_up()
+            live_hashes = {job_hash for job_hash, _ in self._live.values()}
+            next_id = self._max_id + 1
+
+            entries = []
+            for job in jobs:
+                job_hash = content_hash(job)
+                if job_hash in live_hashes:
+                    continue
+                live_hashes.add(job_hash)
+
+                key = posting_key(job)
+                job = dict(job)
+                if key in self._live:
+                    job['id'] = self._live[key][1]
+                else:
+                    job['id'] = next_id
+                    next_id += 1
+                entries.append({'op': 'put', 'key': key, 'hash': job_hash, 'job': job})
+
+            if enricher and entries:
+                for entry, job in zip(entries, enricher([entry['job'] for entry in entries])):
+                    entry['job'] = job
+            self.append(entries)
+            # Reads back only what was just appended
+            self._catch_up()
+
+            if self._line_count >= max(MIN_COMPACT_LINES, COMPACT_RATIO * len(self._live)):
+                self.compact()
+            return len(entries)
+
+    def delete(self, keys):
+        """Append delete entries for the given posting keys"""
+        self.append([{'op': 'delete', 'key': key} for key in keys])
+
+    def compact(self):
+        """Rewrite the log with one put per live posting under a new generation"""
+        with self._locked():
+            state, _ = self.replay()
+            generation = (self.generation() or 0) + 1
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self._header(generation)) + '\n')
+                for key, (job_hash, job) in state.items():
+                    f.write(json.dumps({'op': 'put', 'key': key, 'hash': job_hash, 'job': job},
+                                       ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            # Every later writer (this one included) starts over from the new file
+            self._catch_up()
+
+    def import_json(self, json_path):
+        """Seed an empty log from a scraped_jobs.json file, keeping the stored ids"""
+        with self._locked():
+            if os.path.exists(self.path) or not os.path.exists(json_path):
+                return 0
+            with open(json_path, 'r', encoding='utf-8') as f:
+                jobs = json.load(f)
+            entries = [{'op': 'put', 'key': posting_key(job), 'hash': content_hash(job), 'job': job}
+                       for job in jobs]
+            self.append(entries)
+            return len(entries)
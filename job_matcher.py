@@ -1,67 +1,182 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-import pandas as pd
+from embedding_store import EmbeddingStore
+from job_columns import JobColumns
+from job_log import posting_key
+from model_holder import LazyModel
+from ttl_cache import TTLCache
+from vector_index import allowed_mask, make_index, normalize, rescore
+
+# Multilingual model for Indian languages
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+# Query embeddings kept for repeated profile strings
+QUERY_CACHE_SIZE = 4096
+QUERY_CACHE_TTL = 3600
+
+
+def normalize_query(text):
+    """Cache key of a query: lowercased, whitespace collapsed"""
+    return ' '.join((text or '').lower().split())
+
+
+def load_model(model_name):
+    # Imported here, so importing this module does not load sentence-transformers (and torch)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
 
 class JobMatcher:
-    def __init__(self):
-        # Use multilingual model for Indian languages
-        self.model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+    def __init__(self, index='exact', store_path='job_embeddings', model_name=MODEL_NAME,
+                 query_cache_size=QUERY_CACHE_SIZE, query_cache_ttl=QUERY_CACHE_TTL, rescore=None,
+                 **index_params):
+        """``index`` is ``exact``, ``ivf`` or ``hnsw``; ``index_params`` tune it (see vector_index)
+        
+        ``precision='float16'`` or ``'int8'`` (exact and ivf) stores the job
+        matrix at reduced precision. With ``rescore=n`` each search takes a
+        shortlist of ``n * top_k`` from the index and re-ranks it with the
+        float32 vectors read from the embedding store on disk.
+        
+        Embeddings are kept in an EmbeddingStore under ``store_path`` (None keeps
+        them in memory only), so restarts map the stored vectors instead of
+        re-encoding, and the model itself is only loaded once something needs encoding.
+        Query embeddings are cached by normalized text (LRU of ``query_cache_size``
+        entries, each kept ``query_cache_ttl`` seconds).
+        """
+        self.model_name = model_name
+        self._model = LazyModel(lambda: load_model(model_name))
+        self.store = EmbeddingStore(store_path, model_name) if store_path else None
+        if rescore and self.store is None:
+            raise ValueError("rescore reads float32 vectors from the embedding store; set store_path")
+        self.rescore = rescore
+        self._keys = []
         self.job_embeddings = None
-        self.jobs_df = None
+        self.columns = None
+        self.index_kind = index
+        self.index_params = index_params
+        self.index = None
+        self.query_cache = TTLCache(query_cache_size, query_cache_ttl)
+    
+    @property
+    def model(self):
+        return self._model.get()
+    
+    def _encode(self, texts):
+        return self.model.encode(texts)
+    
+    def encode_queries(self, query_texts):
+        """Unit-length embeddings of ``query_texts``, one row each
+        
+        Cached texts are not encoded again; the rest (deduplicated) go through
+        the model in a single call.
+        """
+        keys = [normalize_query(text) for text in query_texts]
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = [self.query_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, vector in zip(keys, vectors) if vector is None))
+        if missing:
+            encoded = dict(zip(missing, normalize(self._encode(missing))))
+            for key, vector in encoded.items():
+                self.query_cache.put(key, vector)
+            vectors = [encoded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return np.vstack(vectors)
+    
+    def query_cache_info(self):
+        """Hit rate and size of the query-embedding cache"""
+        return self.query_cache.cache_info()
     
     def add_jobs(self, jobs_data):
-        """Add job listings to the matcher"""
-        self.jobs_df = pd.DataFrame(jobs_data)
-        job_texts = self.jobs_df['description'].tolist()
-        self.job_embeddings = self.model.encode(job_texts)
+        """Add job listings to the matcher
+        
+        Only descriptions that are new or changed since the store last saw them
+        are encoded; postings missing from ``jobs_data`` are dropped from the store.
+        """
+        # Metadata and filter columns, row-aligned with the embeddings
+        self.columns = JobColumns(jobs_data)
+        job_texts = [job.get('description') or '' for job in jobs_data]
+        if self.store is None:
+            embeddings = self._encode(job_texts)
+        else:
+            keys = [posting_key(job) for job in jobs_data]
+            self.store.sync(zip(keys, job_texts), self._encode)
+            embeddings = self.store.vectors(keys)
+            self._keys = keys
+        # Unit-length embeddings, so the index's dot product is cosine similarity
+        embeddings = normalize(embeddings)
+        self.index = make_index(self.index_kind, **self.index_params).build(embeddings)
+        # A reduced-precision index exists to avoid holding the float32 matrix
+        if self.index_params.get('precision', 'float32') == 'float32':
+            self.job_embeddings = embeddings
+        else:
+            self.job_embeddings = None
     
-    def find_similar_jobs(self, query_text, top_k=5):
-        """Find similar jobs based on text similarity"""
-        if self.job_embeddings is None:
-            return []
+    def _stored_vectors(self, positions):
+        """Float32 embeddings of the given rows, read from the store"""
+        return self.store.vectors([self._keys[position] for position in positions])
+    
+    def find_similar_jobs(self, query_text, top_k=5, allowed=None, fields=None):
+        """Find similar jobs based on text similarity
+        
+        ``allowed`` (a boolean mask over the jobs, see JobColumns.mask, or an
+        array of job positions) limits the search to those jobs, so filters
+        never cost results. Each match's ``job`` holds only ``fields`` (default:
+        all fields).
+        """
+        return self.find_similar_jobs_batch([query_text], top_k, allowed, fields)[0]
+    
+    def find_similar_jobs_batch(self, query_texts, top_k=5, allowed=None, fields=None):
+        """``find_similar_jobs`` for many queries: one list of matches per query
         
-        query_embedding = self.model.encode([query_text])
-        similarities = cosine_similarity(query_embedding, self.job_embeddings)[0]
+        The queries are encoded in one model call and scored together, which
+        for the exact index is a single matrix product against the job matrix.
+        Job dicts are only built for the final top ``top_k`` of each query.
+        """
+        if self.index is None or not len(self.index) or not len(query_texts):
+            return [[] for _ in query_texts]
+        if allowed is not None:
+            allowed = allowed_mask(allowed, len(self.index))
+            if not allowed.any():
+                return [[] for _ in query_texts]
         
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        query_embeddings = self.encode_queries(query_texts)
+        if self.rescore:
+            _, shortlist = self.index.search(query_embeddings, top_k * self.rescore, allowed=allowed)
+            similarities, indices = rescore(query_embeddings, shortlist, self._stored_vectors, top_k)
+        else:
+            similarities, indices = self.index.search(query_embeddings, top_k, allowed=allowed)
         
-        results = []
-        for idx in top_indices:
-            results.append({
-                'job': self.jobs_df.iloc[idx].to_dict(),
-                'similarity': similarities[idx]
-            })
+        all_results = []
+        for row_indices, row_similarities in zip(indices, similarities):
+            results = []
+            for idx, similarity in zip(row_indices, row_similarities):
+                if idx < 0:
+                    break
+                results.append({
+                    'job': self.columns.row(idx, fields),
+                    'similarity': float(similarity),
+                    'position': int(idx)
+                })
+            all_results.append(results)
         
-        return results
+        return all_results
     
-    def match_profile_to_jobs(self, profile, filters=None):
-        """Match user profile to available jobs"""
-        profile_text = f"{profile.get('skills', '')} {profile.get('experience', '')} {profile.get('preferences', '')}"
+    def match_profile_to_jobs(self, profile, filters=None, top_k=5, fields=None):
+        """Match user profile to available jobs
         
-        similar_jobs = self.find_similar_jobs(profile_text)
+        ``filters`` may hold ``location``, ``category``, ``min_salary`` and
+        ``max_salary``. They are applied before ranking, so the result is the
+        ``top_k`` most similar jobs among those that pass.
+        """
+        profile_text = f"{profile.get('skills', '')} {profile.get('experience', '')} {profile.get('preferences', '')}"
         
-        # Apply filters
-        if filters:
-            filtered_jobs = []
-            for job_match in similar_jobs:
-                job = job_match['job']
-                
-                # Location filter
-                if filters.get('location') and job.get('location'):
-                    if filters['location'].lower() not in job['location'].lower():
-                        continue
-                
-                # Salary filter
-                if filters.get('min_salary') and job.get('min_salary'):
-                    if job['min_salary'] < filters['min_salary']:
-                        continue
-                
-                filtered_jobs.append(job_match)
-            
-            return filtered_jobs
+        allowed = None
+        if filters and self.columns is not None:
+            allowed = self.columns.mask(location=filters.get('location'),
+                                        category=filters.get('category'),
+                                        min_salary=filters.get('min_salary'),
+                                        max_salary=filters.get('max_salary'))
         
-        return similar_jobs
+        return self.find_similar_jobs(profile_text, top_k, allowed=allowed, fields=fields)
 
 # Usage example
 if __name__ == "__main__":
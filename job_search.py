@@ -0,0 +1,198 @@
+import re
+import threading
+
+from job_index import JobIndex, job_salary, positions_by_id
+from text_index import InvertedIndex
+from ttl_cache import TTLCache
+
+# Results shown per reply, and kept per session (bounds a session's memory)
+PAGE_SIZE = 3
+MAX_RESULTS = 50
+
+# "next" / "more", and "details 2" / "job 2" / a bare "2"
+NEXT_PATTERN = re.compile(r'^\s*(?:next|more)\s*[.!]*\s*$', re.IGNORECASE)
+DETAILS_PATTERN = re.compile(r'^\s*(?:(?:details?|job|no\.?)\s*)?#?(\d{1,3})\s*[.!]*\s*$', re.IGNORECASE)
+
+
+def parse_command(message):
+    """``('next', None)``, ``('details', number)`` or None for anything else"""
+    if NEXT_PATTERN.match(message):
+        return 'next', None
+    match = DETAILS_PATTERN.match(message)
+    if match:
+        return 'details', int(match.group(1))
+    return None
+
+
+def _salary_text(job):
+    salary_range = (job.get('analysis') or {}).get('salary_range')
+    if salary_range and salary_range[0]:
+        if len(salary_range) > 1 and salary_range[1] and salary_range[1] != salary_range[0]:
+            return f"₹{salary_range[0]:,}-{salary_range[1]:,}"
+        return f"₹{salary_range[0]:,}"
+    salary = job_salary(job)
+    return f"₹{salary:,}" if salary else None
+
+
+class JobSearch:
+    """Job search for chat conversations, served from the shared job store
+
+    A search is parsed with the keyword ``classifier`` (category over its full
+    category list, plus city), filtered with the snapshot's ``JobIndex`` and
+    ranked by BM25 over the snapshot's ``InvertedIndex``; jobs that pass the
+    filters without sharing a word with the message follow in snapshot order.
+    The ranked job ids are kept per conversation for ``session_ttl`` seconds,
+    ``max_sessions`` at most (least recently used go first), so "next" and
+    "details 2" page through the same ranking without searching again, even if
+    the store reloads in between.
+    """
+
+    def __init__(self, store, classifier, max_sessions=10000, session_ttl=1800,
+                 page_size=PAGE_SIZE, max_results=MAX_RESULTS):
+        self.store = store
+        self.classifier = classifier
+        self.page_size = page_size
+        self.max_results = max_results
+        self.sessions = TTLCache(max_sessions, session_ttl)
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.pages = 0
+        self.details_shown = 0
+
+    def category_names(self):
+        return [category.replace('_', ' ') for category in self.classifier.job_categories]
+
+    def rank(self, snapshot, message):
+        """Return ``(job ids, filters)`` for a search message, best match first"""
+        analysis = self.classifier.analyze_job(message)
+        filters = {
+            # 'general' means no category keyword was found
+            'category': analysis['raw_category'] if analysis['raw_category'] in self.classifier.job_categories else None,
+            'location': analysis['location']
+        }
+        if not any(filters.values()):
+            return [], filters
+
+        index = snapshot.derived('index', JobIndex)
+        text_index = snapshot.derived('text_index', InvertedIndex)
+        scores = text_index.score(message, accept=index.predicate(**filters))
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        if len(ranked) < self.max_results:
+            scored = set(ranked)
+            positions, _ = index.search(limit=self.max_results + len(scored), **filters)
+            ranked.extend(position for position in positions if position not in scored)
+
+        ids = []
+        for position in ranked:
+            job_id = snapshot.jobs[position].get('id')
+            if job_id is not None:
+                ids.append(job_id)
+                if len(ids) == self.max_results:
+                    break
+        return ids, filters
+
+    def search(self, conversation, message):
+        """Run a search, start a new session for ``conversation`` and return the first page"""
+        snapshot = self.store.snapshot()
+        ids, filters = self.rank(snapshot, message)
+        with self._lock:
+            self.searches += 1
+        if not any(filters.values()):
+            self.sessions.pop(conversation)
+            return "Please specify a job type or city, e.g. " + ", ".join(self.category_names())
+
+        label = (filters['category'] or '').replace('_', ' ')
+        label = f"{label} jobs" if label else "jobs"
+        if filters['location']:
+            label += f" in {filters['location']}"
+        if not ids:
+            self.sessions.pop(conversation)
+            return f"No {label} found right now. Try another job type or city."
+
+        return self._page(conversation, {'ids': tuple(ids), 'shown': 0, 'label': label}, snapshot)
+
+    def next_page(self, conversation):
+        """The next page of the conversation's last search"""
+        session = self.sessions.get(conversation)
+        if session is None:
+            return "No active search. Send e.g. \"find electrician job in Mumbai\"."
+        if session['shown'] >= len(session['ids']):
+            return f"No more {session['label']}. Reply \"details <number>\" or start a new search."
+        with self._lock:
+            self.pages += 1
+        return self._page(conversation, session, self.store.snapshot())
+
+    def _page(self, conversation, session, snapshot):
+        ids, shown = session['ids'], session['shown']
+        by_id = snapshot.derived('by_id', positions_by_id)
+        end = min(shown + self.page_size, len(ids))
+        lines = []
+        for number in range(shown + 1, end + 1):
+            position = by_id.get(ids[number - 1])
+            if position is None:
+                lines.append(f"{number}. (no longer listed)")
+                continue
+            job = snapshot.jobs[position]
+            line = f"{number}. {job.get('title') or 'Untitled job'}"
+            if job.get('location'):
+                line += f" - {job['location']}"
+            salary = _salary_text(job)
+            if salary:
+                line += f" - {salary}"
+            lines.append(line)
+        self.sessions.put(conversation, dict(session, shown=end))
+
+        label = session['label'][:1].upper() + session['label'][1:]
+        if shown == 0:
+            header = f"🔍 {label}: {len(ids)} found"
+        else:
+            header = f"🔍 {label}: {shown + 1}-{end} of {len(ids)}"
+        footer = "Reply \"details <number>\" for a job"
+        footer += ", or \"next\" for more." if end < len(ids) else "."
+        return header + "\n\n" + "\n".join(lines) + "\n\n" + footer
+
+    def details(self, conversation, number):
+        """Full posting of result ``number`` (1-based) of the conversation's last search"""
+        session = self.sessions.get(conversation)
+        if session is None:
+            return "No active search. Send e.g. \"find electrician job in Mumbai\"."
+        ids = session['ids']
+        if not 1 <= number <= len(ids):
+            return f"Reply with a number between 1 and {len(ids)}."
+        with self._lock:
+            self.details_shown += 1
+        # Keep the session alive while the user reads through it
+        self.sessions.put(conversation, session)
+
+        snapshot = self.store.snapshot()
+        position = snapshot.derived('by_id', positions_by_id).get(ids[number - 1])
+        if position is None:
+            return f"Job {number} is no longer listed."
+        job = snapshot.jobs[position]
+        analysis = job.get('analysis') or {}
+        response = f"📋 {job.get('title') or 'Untitled job'}\n"
+        if job.get('location'):
+            response += f"Location: {job['location']}\n"
+        salary = _salary_text(job)
+        if salary:
+            response += f"Salary: {salary}\n"
+        if analysis.get('category'):
+            response += f"Category: {analysis['category']}\n"
+        response += f"\n{job.get('description', '')}\n"
+        if job.get('source'):
+            response += f"\nSource: {job['source']}"
+        if analysis.get('is_suspicious'):
+            response += "\n⚠️ Warning: Suspicious job posting!"
+        return response.rstrip()
+
+    def handle_command(self, conversation, command):
+        """Answer a ``parse_command`` result"""
+        action, number = command
+        if action == 'next':
+            return self.next_page(conversation)
+        return self.details(conversation, number)
+
+    def stats(self):
+        with self._lock:
+            counters = {'searches': self.searches, 'pages': self.pages, 'details': self.details_shown}
+        return dict(counters, sessions=self.sessions.cache_info())
@@ -0,0 +1,144 @@
+import math
+import threading
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch (DDSketch-style log buckets) that supports removal
+
+    Every value lands in a bucket ``ceil(log_gamma(value))``; a quantile is read by
+    walking the buckets in order, so its cost depends on the range of values (a few
+    hundred buckets for salaries), never on how many values were added. Estimates
+    are within ``relative_accuracy`` of a true value.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self._sorted_keys = None
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value, weight=1):
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + weight
+            if self.buckets[key] == 0:
+                del self.buckets[key]
+            self._sorted_keys = None
+        self.count += weight
+
+    def remove(self, value):
+        self.add(value, -1)
+
+    def quantile(self, q):
+        """Estimated value at quantile ``q`` (0..1), or None when empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.buckets)
+        seen = self.zero_count
+        for key in self._sorted_keys:
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** self._sorted_keys[-1] / (self.gamma + 1)
+
+
+class JobAggregates:
+    """Running job statistics, updated as jobs are added, replaced or removed
+
+    Reading the statistics never touches the job list, so ``/stats`` costs the same
+    whatever the corpus size.
+    """
+
+    def __init__(self):
+        self.total_jobs = 0
+        self.category_counts = {}
+        self.location_counts = {}
+        self.salary_sum = 0
+        self.salary_count = 0
+        self.salary_values = {}
+        self.salary_sketch = QuantileSketch()
+        self.min_salary = None
+        self.max_salary = None
+        self._lock = threading.Lock()
+        self._cached = None
+
+    @staticmethod
+    def _fields(job):
+        analysis = job.get('analysis') or {}
+        salary_range = analysis.get('salary_range')
+        salary = salary_range[0] if salary_range and salary_range[0] else None
+        return analysis.get('raw_category', 'general'), job.get('location', 'Unknown'), salary
+
+    @staticmethod
+    def _bump(counts, key, delta):
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] == 0:
+            del counts[key]
+
+    def _apply(self, job, delta):
+        category, location, salary = self._fields(job)
+        self.total_jobs += delta
+        self._bump(self.category_counts, category, delta)
+        self._bump(self.location_counts, location, delta)
+        if salary is None:
+            return
+
+        self.salary_sum += delta * salary
+        self.salary_count += delta
+        self._bump(self.salary_values, salary, delta)
+        self.salary_sketch.add(salary, delta)
+        if delta > 0:
+            self.min_salary = salary if self.min_salary is None else min(self.min_salary, salary)
+            self.max_salary = salary if self.max_salary is None else max(self.max_salary, salary)
+        elif salary not in self.salary_values:
+            # The last copy of an extreme value went away; find the new extreme
+            if salary == self.min_salary:
+                self.min_salary = min(self.salary_values) if self.salary_values else None
+            if salary == self.max_salary:
+                self.max_salary = max(self.salary_values) if self.salary_values else None
+
+    def apply_changes(self, added=(), removed=()):
+        """Fold a batch of changes in; a replaced job appears in both lists"""
+        with self._lock:
+            for job in removed:
+                self._apply(job, -1)
+            for job in added:
+                self._apply(job, 1)
+            self._cached = None
+
+    def add(self, job):
+        self.apply_changes(added=[job])
+
+    def remove(self, job):
+        self.apply_changes(removed=[job])
+
+    def replace(self, old_job, new_job):
+        self.apply_changes(added=[new_job], removed=[old_job])
+
+    def stats(self):
+        """Current statistics in the /stats response shape"""
+        with self._lock:
+            if self._cached is None:
+                self._cached = {
+                    "total_jobs": self.total_jobs,
+                    "categories": dict(self.category_counts),
+                    "locations": dict(self.location_counts),
+                    "average_salary": self.salary_sum / self.salary_count if self.salary_count else 0,
+                    "median_salary": self.salary_sketch.quantile(0.5),
+                    "p90_salary": self.salary_sketch.quantile(0.9),
+                    "min_salary": self.min_salary,
+                    "max_salary": self.max_salary,
+                    "salary_jobs_count": self.salary_count
+                }
+            return self._cached
@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+
+
+class JobSnapshot:
+    """Immutable view of the job list as loaded at one point in time
+
+    The store never mutates a snapshot after publishing it; a reload builds a new
+    one and swaps the reference, so a request holding a snapshot always sees a
+    complete, consistent list.
+    """
+
+    def __init__(self, jobs, version=0, signature=None):
+        self.jobs = tuple(jobs)
+        self.version = version
+        self.signature = signature
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __iter__(self):
+        return iter(self.jobs)
+
+    def derived(self, name, build):
+        """Return ``build(jobs)``, computed once per snapshot (e.g. indexes)"""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.jobs)
+            return self._derived[name]
+
+
+def diff_jobs(old_jobs, new_jobs):
+    """Return ``(added, removed)`` between two job lists, matching records by id
+
+    A changed record shows up as removed (old version) and added (new version).
+    Records without an id, or with repeated ids, are matched by occurrence.
+    """
+    def keyed(jobs):
+        keys = {}
+        seen = {}
+        for job in jobs:
+            job_id = job.get('id')
+            occurrence = seen.get(job_id, 0)
+            seen[job_id] = occurrence + 1
+            keys[(job_id, occurrence)] = job
+        return keys
+
+    old_by_key = keyed(old_jobs)
+    new_by_key = keyed(new_jobs)
+    added = []
+    removed = []
+    for key, job in new_by_key.items():
+        old_job = old_by_key.get(key)
+        if old_job is None:
+            added.append(job)
+        elif old_job is not job and old_job != job:
+            removed.append(old_job)
+            added.append(job)
+    for key, job in old_by_key.items():
+        if key not in new_by_key:
+            removed.append(job)
+    return added, removed
+
+
+class JobStore:
+    """Process-wide job cache backed by a JSON file
+
+    The file is parsed once and only re-read when its mtime or size changes, or
+    when ``reload(force=True)`` is called after new data has been written.
+    ``enrich``, if given, is applied to the job list on every load (see
+    ``job_enrichment.JobEnricher``), and each ``derive`` builder (name ->
+    ``build(jobs)``, e.g. an index class) is run on the new snapshot before it is
+    published. Listeners registered with ``subscribe`` are told which jobs were
+    added and removed by each reload.
+
+    ``snapshot()`` never waits for a reload (which rebuilds the indexes and can
+    take seconds on a large corpus): when the file has changed it starts one on
+    a background thread and keeps returning the current snapshot until the new
+    one is published. Only the first load, before anything has been published,
+    runs in the caller.
+    """
+
+    def __init__(self, path='scraped_jobs.json', enrich=None, derive=None):
+        self.path = path
+        self.enrich = enrich
+        self.derive = derive or {}
+        self._listeners = []
+        self._snapshot = JobSnapshot([])
+        self._lock = threading.Lock()
+        self._reload_thread = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_jobs(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def subscribe(self, listener):
+        """Call ``listener(added, removed)`` with the changes of every reload"""
+        with self._lock:
+            listener(list(self._snapshot.jobs), [])
+            self._listeners.append(listener)
+
+    def snapshot(self):
+        """Return the current snapshot, starting a background reload if the file changed"""
+        if self._file_signature() != self._snapshot.signature:
+            if self._snapshot.version == 0:
+                self.reload()
+            else:
+                self.reload_in_background()
+        return self._snapshot
+
+    def reload_in_background(self):
+        """Start a reload on a thread unless one is already running"""
+        # Two callers racing here at worst start a second reload, which finds nothing to do
+        thread = self._reload_thread
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=self._reload_quietly, name="job-store-reload", daemon=True)
+            self._reload_thread = thread
+            thread.start()
+        return thread
+
+    def _reload_quietly(self):
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"Job store reload failed: {e}")
+
+    def reload(self, force=False):
+        """Re-read the backing file and publish a new snapshot"""
+        with self._lock:
+            signature = self._file_signature()
+            # Another request may have reloaded while we waited for the lock
+            if not force and signature == self._snapshot.signature:
+                return self._snapshot
+
+            try:
+                jobs, changes = self._load(signature)
+            except ValueError:
+                # File caught mid-write; keep serving the previous snapshot
+                return self._snapshot
+            return self._publish(jobs, signature, changes)
+
+    def _load(self, signature):
+        """Return ``(jobs, changes)``; ``changes`` is ``(added, removed)`` or None to diff"""
+        jobs = self._read_jobs() if signature is not None else []
+        if self.enrich:
+            jobs = self.enrich(jobs)
+        return jobs, None
+
+    def _publish(self, jobs, signature, changes=None):
+        snapshot = JobSnapshot(jobs, self._snapshot.version + 1, signature)
+        for name, build in self.derive.items():
+            snapshot.derived(name, build)
+        if self._listeners:
+            added, removed = changes if changes is not None else diff_jobs(self._snapshot.jobs, snapshot.jobs)
+            for listener in self._listeners:
+                listener(added, removed)
+        self._snapshot = snapshot
+        return self._snapshot
+
+
+class JobLogStore(JobStore):
+    """Job store fed from an append-only ``JobLog``
+
+    Only the entries written since the last stored offset are read and enriched on
+    each refresh, and listeners receive exactly those changes. After the log is
+    compacted (new generation) the store re-reads it from the start.
+
+    The ``derive`` builders (JobIndex, InvertedIndex) are not incremental: each
+    new snapshot rebuilds them over the whole corpus, which costs about 3.5 s at
+    500k jobs. That happens on the background reload thread, so requests keep
+    using the previous snapshot meanwhile, but a log written more often than
+    that is reloaded back to back.
+    """
+
+    def __init__(self, log, enrich=None, derive=None):
+        super().__init__(log.path, enrich, derive)
+        self.log = log
+        self.offset = 0
+        self.generation = None
+        self._jobs_by_key = {}
+
+    def _load(self, signature):
+        entries, offset, generation = self.log.read_from(self.offset)
+        if generation != self.generation:
+            # Compacted or recreated: start again from the first entry
+            entries, offset, generation = self.log.read_from(0)
+            state = {}
+            changes = None
+        else:
+            state = dict(self._jobs_by_key)
+            changes = ([], [])
+
+        for entry in entries:
+            old_job = state.get(entry['key'])
+            if entry['op'] == 'put':
+                job = self.enrich([entry['job']])[0] if self.enrich else entry['job']
+                state[entry['key']] = job
+            else:
+                job = None
+                state.pop(entry['key'], None)
+            if changes is not None:
+                if old_job is not None:
+                    changes[1].append(old_job)
+                if job is not None:
+                    changes[0].append(job)
+
+        self._jobs_by_key = state
+        self.offset = offset
+        self.generation = generation
+        return list(state.values()), changes
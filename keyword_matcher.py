@@ -0,0 +1,161 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds many keywords in a single pass over a text.
+
+    Patterns are registered under a group (e.g. a job category, ``'location'`` or
+    ``'scam'``) and the automaton is compiled once, so the cost of a scan depends on
+    the text length and the number of hits, not on the size of the dictionary.
+    """
+
+    def __init__(self):
+        # Trie stored as parallel lists indexed by state number
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._patterns = []
+        self._compiled = False
+
+    def add(self, keyword, group, value=None):
+        """Register a keyword under a group; ``value`` defaults to the keyword itself"""
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        pattern_id = len(self._patterns)
+        self._patterns.append((keyword, group, value if value is not None else keyword))
+        self._output[state].append(pattern_id)
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links (breadth-first) and merge outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fallback = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fallback if fallback != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._compiled = True
+        return self
+
+    def iter_matches(self, text, lowered=False):
+        """Yield ``(start, end, keyword, group, value)`` for every hit in ``text``
+
+        Pass ``lowered=True`` if ``text`` is already lowercase, to skip doing it again.
+        """
+        if not self._compiled:
+            self.compile()
+        if not lowered:
+            text = text.lower()
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                keyword, group, value = patterns[pattern_id]
+                yield pos - len(keyword) + 1, pos + 1, keyword, group, value
+
+    def scan(self, text, lowered=False):
+        """Scan ``text`` once and summarise the hits (``lowered`` as for ``iter_matches``)
+
+        Returns a dict with:
+          - ``counts``: group -> number of distinct keywords of that group found
+          - ``spans``: list of ``(start, end, keyword, group)`` in text order
+          - ``first``: group -> value of the earliest hit of that group
+        """
+        if not self._compiled:
+            self.compile()
+        if not lowered:
+            text = text.lower()
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        counts = {}
+        seen = set()
+        spans = []
+        first = {}
+        state = 0
+        # Same walk as iter_matches, inlined because this is the hot path
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            for pattern_id in output[state]:
+                keyword, group, value = patterns[pattern_id]
+                start = pos - len(keyword) + 1
+                spans.append((start, pos + 1, keyword, group))
+                if group not in first or start < first[group][0]:
+                    first[group] = (start, value)
+                if pattern_id not in seen:
+                    seen.add(pattern_id)
+                    if (group, keyword) not in seen:
+                        seen.add((group, keyword))
+                        counts[group] = counts.get(group, 0) + 1
+        spans.sort(key=lambda span: (span[0], span[1]))
+        return {
+            'counts': counts,
+            'spans': spans,
+            'first': {group: value for group, (_, value) in first.items()}
+        }
+
+
+class JobKeywordMatcher:
+    """Single-pass matcher over job category keywords, city names and scam phrases"""
+
+    LOCATION = 'location'
+    SCAM = 'scam'
+
+    def __init__(self, job_categories, cities, scam_indicators):
+        self.categories = list(job_categories)
+        self.matcher = KeywordMatcher()
+        for category, keywords in job_categories.items():
+            for keyword in keywords:
+                self.matcher.add(keyword, ('category', category))
+        for city in cities:
+            self.matcher.add(city, self.LOCATION, city.title())
+        for indicator in scam_indicators:
+            self.matcher.add(indicator, self.SCAM)
+        self.matcher.compile()
+
+    def match(self, text, lowered=False):
+        """Scan ``text`` once and return category counts, spans, location and scam flags"""
+        result = self.matcher.scan(text, lowered)
+        category_counts = {}
+        for group, count in result['counts'].items():
+            if isinstance(group, tuple):
+                category_counts[group[1]] = count
+
+        scam_flags = []
+        for _, _, keyword, group in result['spans']:
+            if group == self.SCAM and keyword not in scam_flags:
+                scam_flags.append(keyword)
+
+        return {
+            'category_counts': category_counts,
+            'spans': [(start, end, keyword, group[1] if isinstance(group, tuple) else group)
+                      for start, end, keyword, group in result['spans']],
+            'location': result['first'].get(self.LOCATION),
+            'scam_flags': scam_flags
+        }
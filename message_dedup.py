@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+# Expired ids are deleted from the database after this many new ones
+PURGE_EVERY = 1000
+
+
+class MessageDeduplicator:
+    """Remembers inbound message ids for ``ttl`` seconds so redeliveries are dropped
+
+    Ids are kept in an in-memory TTL/LRU cache. With ``db_path`` they are also
+    recorded in SQLite, which survives restarts and is shared by every process
+    (e.g. forked workers) pointing at the same file, so a redelivery landing on
+    another worker is still caught. ``mark_new`` is an atomic check-and-set;
+    ``forget`` undoes it when the message could not be accepted after all.
+    """
+
+    def __init__(self, ttl=24 * 3600, max_size=100000, db_path=None):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory = TTLCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self._inserted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self):
+        # A connection must not cross a fork, so each process opens its own
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS seen_messages ("
+                             "id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            self._db.commit()
+            self._db_pid = os.getpid()
+        return self._db
+
+    def mark_new(self, message_id):
+        """Record ``message_id``; returns False if it was already seen within the TTL"""
+        if not message_id:
+            return True
+        if not self._memory.add(message_id):
+            with self._lock:
+                self.hits += 1
+            return False
+        if self.db_path is None:
+            with self._lock:
+                self.misses += 1
+            return True
+
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            # Inserts a new id, or takes over one whose entry has expired
+            changed = db.execute(
+                "INSERT INTO seen_messages (id, seen_at) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET seen_at = excluded.seen_at WHERE seen_at < ?",
+                (message_id, now, now - self.ttl)).rowcount
+            self._inserted += 1
+            if self._inserted % PURGE_EVERY == 0:
+                db.execute("DELETE FROM seen_messages WHERE seen_at < ?", (now - self.ttl,))
+            db.commit()
+            if changed:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return bool(changed)
+
+    def forget(self, message_id):
+        """Drop ``message_id`` so a later redelivery is processed"""
+        if not message_id:
+            return
+        self._memory.pop(message_id)
+        if self.db_path is not None:
+            with self._lock:
+                db = self._connection()
+                db.execute("DELETE FROM seen_messages WHERE id = ?", (message_id,))
+                db.commit()
+
+    def stats(self):
+        """Duplicate (hit) and new (miss) counts"""
+        with self._lock:
+            checked = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / checked if checked else 0.0,
+                'size': len(self._memory),
+                'ttl': self.ttl,
+                'persistent': self.db_path is not None
+            }
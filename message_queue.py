@@ -0,0 +1,171 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+class MessageQueue:
+    """Bounded in-process queue of inbound messages, drained by worker threads
+
+    ``put`` never blocks: when the queue is full the message is refused (and
+    counted), so a webhook can acknowledge or push back at once instead of
+    holding the provider's request open. ``handler(message)`` runs on one of
+    ``workers`` threads; exceptions are counted and logged, not retried.
+
+    With ``db_path`` every accepted message is also written to SQLite and
+    deleted once handled, so messages still queued when the process died are
+    queued again on the next ``start``. ``stop(drain=True)`` refuses new
+    messages and waits for the queued ones; ``drain=False`` only finishes the
+    messages in progress, leaving the rest for the next start when persisted.
+    Workers are started on the first ``put`` (or by ``start``), so a queue
+    created before a fork gets its threads in the process that uses it; after
+    ``stop`` only an explicit ``start`` accepts messages again.
+    """
+
+    def __init__(self, handler, max_size=1000, workers=2, db_path=None, latency_window=1000):
+        self.handler = handler
+        self.max_size = max_size
+        self.workers = workers
+        self.db_path = db_path
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._db = None
+        self._started = False
+        self._stopping = False
+        self._waits = deque(maxlen=latency_window)
+        self._handle_times = deque(maxlen=latency_window)
+        self.accepted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.recovered = 0
+        self.in_flight = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def start(self):
+        """Open the database, re-queue persisted messages and start the workers"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._stopping = False
+            if self.db_path:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                # Survives a process crash; only an OS crash can lose the last commits
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS messages ("
+                                 "id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, "
+                                 "enqueued_at REAL NOT NULL)")
+                self._db.commit()
+                # Already accepted once, so they are queued even past max_size
+                for row_id, payload in self._db.execute("SELECT id, payload FROM messages ORDER BY id"):
+                    self._queue.put((row_id, json.loads(payload), time.monotonic()))
+                    self.recovered += 1
+            self._threads = [threading.Thread(target=self._run, name=f"message-worker-{i}", daemon=True)
+                             for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+
+    def put(self, message):
+        """Queue ``message``; returns False if the queue is full or shutting down"""
+        if not self._started and not self._stopping:
+            self.start()
+        with self._lock:
+            if self._stopping or self._queue.qsize() >= self.max_size:
+                self.rejected += 1
+                return False
+            row_id = None
+            if self._db is not None:
+                row_id = self._db.execute("INSERT INTO messages (payload, enqueued_at) VALUES (?, ?)",
+                                          (json.dumps(message), time.time())).lastrowid
+                self._db.commit()
+            self._queue.put((row_id, message, time.monotonic()))
+            self.accepted += 1
+            self.high_water = max(self.high_water, self._queue.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            row_id, message, enqueued = item
+            started = time.monotonic()
+            with self._lock:
+                self.in_flight += 1
+                self._waits.append(started - enqueued)
+            try:
+                self.handler(message)
+                failed = False
+            except Exception as e:
+                print(f"Message handler failed: {e}")
+                failed = True
+            with self._lock:
+                self.in_flight -= 1
+                self._handle_times.append(time.monotonic() - started)
+                if failed:
+                    self.failed += 1
+                else:
+                    self.processed += 1
+                if row_id is not None and self._db is not None:
+                    self._db.execute("DELETE FROM messages WHERE id = ?", (row_id,))
+                    self._db.commit()
+
+    def stop(self, drain=True, timeout=None):
+        """Refuse new messages, then stop the workers after draining (or not)"""
+        with self._lock:
+            if not self._started:
+                return
+            self._stopping = True
+            if not drain:
+                # Drop what is still queued; persisted copies stay in the database
+                while True:
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._started = False
+
+    def stats(self):
+        """Backpressure metrics: depth, refusals, throughput and queueing delay"""
+        with self._lock:
+            waits = sorted(self._waits)
+            handle_times = self._handle_times
+
+            def percentile(values, q):
+                return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+            return {
+                'queued': self._queue.qsize(),
+                'max_size': self.max_size,
+                'utilization': self._queue.qsize() / self.max_size if self.max_size else 0.0,
+                'high_water': self.high_water,
+                'in_flight': self.in_flight,
+                'workers': self.workers,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'processed': self.processed,
+                'failed': self.failed,
+                'recovered': self.recovered,
+                'wait_p50_ms': percentile(waits, 0.5) * 1000,
+                'wait_p95_ms': percentile(waits, 0.95) * 1000,
+                'handle_avg_ms': sum(handle_times) / len(handle_times) * 1000 if handle_times else 0.0,
+                'persistent': self.db_path is not None,
+                'stopping': self._stopping
+            }
@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class LazyModel:
+    """Holds a model that is built on first use or warmed up in the background
+
+    ``factory`` is only called once, however many threads ask for the model at
+    the same time. ``ready()`` backs a readiness probe so a server can bind and
+    answer health checks while the weights are still loading.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._model = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._warmup_thread = None
+        self.load_seconds = None
+
+    def get(self):
+        """Return the model, loading it now if nobody has yet"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    started = time.perf_counter()
+                    try:
+                        self._model = self.factory()
+                    except Exception as e:
+                        self._error = e
+                        raise
+                    self._error = None
+                    self.load_seconds = time.perf_counter() - started
+                    self._loaded.set()
+        return self._model
+
+    def start_warmup(self):
+        """Load the model on a background thread; returns immediately"""
+        if self._warmup_thread is None and self._model is None:
+            def warmup():
+                try:
+                    self.get()
+                except Exception as e:
+                    print(f"Model warmup failed: {e}")
+            self._warmup_thread = threading.Thread(target=warmup, name="model-warmup", daemon=True)
+            self._warmup_thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until the model is loaded; returns whether it is"""
+        return self._loaded.wait(timeout)
+
+    def ready(self):
+        return self._model is not None
+
+    def status(self):
+        """Readiness details for a probe endpoint"""
+        return {
+            'ready': self.ready(),
+            'loading': self._warmup_thread is not None and self._warmup_thread.is_alive(),
+            'load_seconds': self.load_seconds,
+            'error': str(self._error) if self._error else None
+        }
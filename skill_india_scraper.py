@@ -1,40 +1,142 @@
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
+import asyncio
 import time
 import json
+import os
 from datetime import datetime
+from urllib.parse import urljoin
+from html_extract import get_extractor
+from job_log import JobLog
+
+# Returned for a page the server reports as unchanged (HTTP 304)
+NOT_MODIFIED = object()
+
+class ConditionalRequestCache:
+    """Remembers ETag / Last-Modified per URL so unchanged pages are not re-downloaded
+    
+    Validators seen during a scrape are only ``pending`` until ``commit()``, which
+    the scraper calls once the postings of those pages are safely in the job
+    log. Otherwise a failed write would turn into 304s for pages whose postings
+    were never stored.
+    """
+    
+    def __init__(self, path='http_cache.json'):
+        self.path = path
+        self.pending = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+    
+    def headers(self, url):
+        """Revalidation headers for a URL fetched before"""
+        entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def update(self, url, response_headers):
+        """Record the validators of a 200 response, pending until ``commit``"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag or last_modified:
+            self.pending[url] = {'etag': etag, 'last_modified': last_modified}
+    
+    def commit(self):
+        """Keep the pending validators and save the cache"""
+        self.entries.update(self.pending)
+        self.pending = {}
+        self.save()
+    
+    def discard(self):
+        """Forget the pending validators, so those pages are downloaded again next time"""
+        self.pending = {}
+    
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
 
 class SkillIndiaScraper:
-    def __init__(self):
-        self.base_url = "https://www.skillindia.gov.in"
+    def __init__(self, base_url="https://www.skillindia.gov.in", fast_parser=True, http_cache=None):
+        self.base_url = base_url
+        # Use the compiled lxml extractor where the source config allows it
+        self.fast_parser = fast_parser
+        # Optional ConditionalRequestCache for ETag/If-Modified-Since revalidation
+        self.http_cache = http_cache
+        self.unchanged_pages = 0
+        # Set when the scrape fell back to sample data
+        self.used_sample_jobs = False
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.jobs = []
     
+    def _listing_urls(self):
+        """Candidate job search endpoints, in order of preference"""
+        return [
+            f"{self.base_url}/content/list-jobs",
+            f"{self.base_url}/jobs",
+            f"{self.base_url}/employment"
+        ]
+    
+    def _page_url(self, url, page):
+        """URL of a listing page (page 1 is the endpoint itself)"""
+        return url if page == 1 else f"{url}?page={page}"
+    
+    def _get_page(self, url):
+        """GET a listing page, revalidating against the HTTP cache
+        
+        Returns the page text, NOT_MODIFIED, or None for any other status.
+        """
+        headers = self.http_cache.headers(url) if self.http_cache else {}
+        response = self.session.get(url, timeout=10, headers=headers)
+        if response.status_code == 304:
+            self.unchanged_pages += 1
+            return NOT_MODIFIED
+        if response.status_code != 200:
+            return None
+        if self.http_cache:
+            self.http_cache.update(url, response.headers)
+        return response.text
+    
     def scrape_jobs(self, max_pages=3):
-        """Scrape jobs from Skill India Digital"""
+        """Scrape jobs from Skill India Digital
+        
+        With an HTTP cache, pages the server reports unchanged are skipped, so only
+        postings on changed pages are returned. The new validators are committed
+        by ``save_jobs`` / ``save_jobs_to_log``, after the postings are stored.
+        """
         try:
             # Try different job search endpoints
-            job_urls = [
-                f"{self.base_url}/content/list-jobs",
-                f"{self.base_url}/jobs",
-                f"{self.base_url}/employment"
-            ]
-            
-            for url in job_urls:
+            for url in self._listing_urls():
                 try:
-                    response = self.session.get(url, timeout=10)
-                    if response.status_code == 200:
-                        self._parse_job_listings(response.text, url)
+                    html = self._get_page(url)
+                    if html is not None:
+                        if html is not NOT_MODIFIED:
+                            self._parse_job_listings(html, url)
+                        
+                        # Follow pagination on the endpoint that answered
+                        for page in range(2, max_pages + 1):
+                            page_url = self._page_url(url, page)
+                            html = self._get_page(page_url)
+                            if html is NOT_MODIFIED:
+                                continue
+                            if html is None or not self._parse_job_listings(html, page_url):
+                                break
                         break
                 except:
                     continue
             
             # If direct scraping fails, use sample data
-            if not self.jobs:
+            if not self.jobs and not self.unchanged_pages:
                 self._generate_sample_jobs()
                 
         except Exception as e:
@@ -44,7 +146,23 @@ class SkillIndiaScraper:
         return self.jobs
     
     def _parse_job_listings(self, html_content, source_url):
-        """Parse job listings from HTML"""
+        """Parse job listings from HTML; returns the number of jobs added"""
+        extractor = get_extractor(source_url) if self.fast_parser else None
+        if extractor is not None:
+            try:
+                records = extractor.extract(html_content, limit=20)
+            except Exception:
+                records = None
+            if records is not None:
+                for record in records:
+                    self.jobs.append(self._make_job(record['title'], record['description'],
+                                                    record['location'], source_url, record['link']))
+                return len(records)
+        
+        return self._parse_job_listings_soup(html_content, source_url)
+    
+    def _parse_job_listings_soup(self, html_content, source_url):
+        """Parse job listings with BeautifulSoup (fallback path)"""
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # Look for common job listing patterns
@@ -52,10 +170,36 @@ class SkillIndiaScraper:
             keyword in x.lower() for keyword in ['job', 'vacancy', 'opening', 'position']
         ))
         
+        added = 0
         for container in job_containers[:20]:  # Limit to 20 jobs
             job_data = self._extract_job_data(container, source_url)
             if job_data:
                 self.jobs.append(job_data)
+                added += 1
+        return added
+    
+    def _parse_job_detail(self, html_content):
+        """Extract the full description from a job detail page, if present"""
+        soup = BeautifulSoup(html_content, 'html.parser')
+        desc_elem = soup.find(['p', 'div'], class_=lambda x: x and any(
+            keyword in x.lower() for keyword in ['desc', 'detail', 'content']
+        ))
+        return desc_elem.get_text(strip=True) if desc_elem else None
+    
+    def _make_job(self, title, description, location, source_url, link=None):
+        """Build a job record; ``link`` is the job's own page, fetched by the async scraper"""
+        job_data = {
+            'id': len(self.jobs) + 1,
+            'title': title,
+            'description': description,
+            'location': location,
+            'source': 'Skill India Digital',
+            'scraped_at': datetime.now().isoformat(),
+            'url': source_url
+        }
+        if link:
+            job_data['detail_url'] = urljoin(source_url, link)
+        return job_data
     
     def _extract_job_data(self, container, source_url):
         """Extract job data from container"""
@@ -79,15 +223,9 @@ class SkillIndiaScraper:
             ))
             location = location_elem.strip() if location_elem else "India"
             
-            return {
-                'id': len(self.jobs) + 1,
-                'title': title,
-                'description': description,
-                'location': location,
-                'source': 'Skill India Digital',
-                'scraped_at': datetime.now().isoformat(),
-                'url': source_url
-            }
+            link_elem = container.find('a', href=True)
+            return self._make_job(title, description, location, source_url,
+                                  link_elem['href'] if link_elem else None)
         except:
             return None
     
@@ -177,22 +315,178 @@ class SkillIndiaScraper:
         ]
         
         self.jobs.extend(sample_jobs)
+        self.used_sample_jobs = True
+        # The real pages were not stored, so they must not revalidate as unchanged
+        if self.http_cache:
+            self.http_cache.discard()
+    
+    def _commit_http_cache(self):
+        if self.http_cache and not self.used_sample_jobs:
+            self.http_cache.commit()
     
-    def save_jobs(self, filename='scraped_jobs.json'):
-        """Save scraped jobs to file"""
-        with open(filename, 'w', encoding='utf-8') as f:
+    def save_jobs(self, filename='scraped_jobs.json', enricher=None):
+        """Save scraped jobs to file, attaching classifier output if an enricher is given"""
+        if enricher:
+            self.jobs = enricher(self.jobs)
+        
+        # Write to a temp file and swap it in so readers never see a partial file
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
             json.dump(self.jobs, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_filename, filename)
+        self._commit_http_cache()
         print(f"Saved {len(self.jobs)} jobs to {filename}")
     
+    def save_jobs_to_log(self, log=None, enricher=None):
+        """Append new or changed jobs to the append-only job log; returns entries written"""
+        log = log or JobLog()
+        written = log.write_jobs(self.jobs, enricher=enricher)
+        self._commit_http_cache()
+        print(f"Logged {written} new or changed jobs of {len(self.jobs)} to {log.path}")
+        return written
+    
     def get_jobs_dataframe(self):
         """Return jobs as pandas DataFrame"""
+        # pandas is only needed here; keep it off the API/bot import path
+        import pandas as pd
         return pd.DataFrame(self.jobs)
 
+class TokenBucket:
+    """Async token bucket allowing ``rate`` requests per second, bursting to ``capacity``"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncSkillIndiaScraper(SkillIndiaScraper):
+    """Concurrent scraper using a pooled aiohttp session
+    
+    Listing pages and job detail pages are fetched in parallel, bounded by a
+    connection pool (``max_connections``), a per-host limit (``max_per_host``) and
+    a token-bucket rate limit (``requests_per_second``). Point ``base_url`` at a
+    local server to test against stand-in pages.
+    """
+    
+    def __init__(self, base_url="https://www.skillindia.gov.in", max_connections=20,
+                 max_per_host=5, requests_per_second=5.0, timeout=10, fast_parser=True,
+                 http_cache=None):
+        super().__init__(base_url, fast_parser, http_cache)
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+    
+    async def _fetch(self, http, url, conditional=False):
+        """GET a page through the rate limiter
+        
+        Returns the body, NOT_MODIFIED (only when ``conditional``), or None.
+        """
+        import aiohttp
+        await self.rate_limiter.acquire()
+        headers = self.http_cache.headers(url) if conditional and self.http_cache else {}
+        try:
+            async with http.get(url, headers=headers) as response:
+                if response.status == 304 and conditional:
+                    self.unchanged_pages += 1
+                    return NOT_MODIFIED
+                if response.status != 200:
+                    return None
+                if conditional and self.http_cache:
+                    self.http_cache.update(url, response.headers)
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+    
+    def _parse_listing_pages(self, pages):
+        """Parse ``(url, html)`` listing pages in order, so job ids stay deterministic
+        
+        Unchanged listing pages are skipped, along with their detail pages.
+        """
+        for page_url, page_html in pages:
+            if page_html is not None and page_html is not NOT_MODIFIED:
+                self._parse_job_listings(page_html, page_url)
+    
+    def _parse_job_details(self, detail_pages):
+        """Descriptions of the given detail pages (None where missing)"""
+        return [self._parse_job_detail(html) if html else None for html in detail_pages]
+    
+    async def scrape_jobs_async(self, max_pages=3):
+        """Scrape listing pages and detail pages concurrently
+        
+        As with ``scrape_jobs``, new HTTP validators are committed only when the
+        jobs are saved.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("aiohttp is required for async scraping: pip install aiohttp")
+        
+        self.rate_limiter = TokenBucket(self.requests_per_second)
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_per_host)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers=dict(self.session.headers)) as http:
+                # Probe all endpoints at once; keep the first one (in order) that answers
+                urls = self._listing_urls()
+                first_pages = await asyncio.gather(*(self._fetch(http, url, conditional=True) for url in urls))
+                url, html = next(((u, h) for u, h in zip(urls, first_pages) if h is not None), (None, None))
+                
+                if url:
+                    page_urls = [self._page_url(url, page) for page in range(2, max_pages + 1)]
+                    other_pages = await asyncio.gather(*(self._fetch(http, page_url, conditional=True)
+                                                         for page_url in page_urls))
+                    
+                    # Parsing is CPU-bound, so it runs on the default executor and
+                    # the event loop (e.g. the API's) keeps serving meanwhile
+                    loop = asyncio.get_running_loop()
+                    pages = [(url, html)] + list(zip(page_urls, other_pages))
+                    await loop.run_in_executor(None, self._parse_listing_pages, pages)
+                    
+                    # Fetch every job's detail page in parallel for the full description
+                    with_details = [job for job in self.jobs if job.get('detail_url')]
+                    detail_pages = await asyncio.gather(*(self._fetch(http, job['detail_url'])
+                                                          for job in with_details))
+                    descriptions = await loop.run_in_executor(None, self._parse_job_details, detail_pages)
+                    for job, description in zip(with_details, descriptions):
+                        if description:
+                            job['description'] = description
+            
+            if not self.jobs and not self.unchanged_pages:
+                self._generate_sample_jobs()
+        
+        except Exception as e:
+            print(f"Scraping failed: {e}")
+            self._generate_sample_jobs()
+        
+        return self.jobs
+    
+    def scrape_jobs(self, max_pages=3):
+        """Blocking wrapper around scrape_jobs_async"""
+        return asyncio.run(self.scrape_jobs_async(max_pages))
+
 if __name__ == "__main__":
-    scraper = SkillIndiaScraper()
+    scraper = SkillIndiaScraper(http_cache=ConditionalRequestCache())
     jobs = scraper.scrape_jobs()
-    scraper.save_jobs()
+    scraper.save_jobs_to_log()
     
     df = scraper.get_jobs_dataframe()
     print(f"Scraped {len(jobs)} jobs")
-    print(df[['title', 'location']].head())
\ No newline at end of file
+    if jobs:
+        print(df[['title', 'location']].head())
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from embedding_store import EmbeddingStore
+
+
+def encode(texts):
+    # Deterministic 4-d vectors that differ per text
+    return np.array([[len(text), sum(map(ord, text)) % 97 + 1, 1.0, i + 1.0] for i, text in enumerate(texts)],
+                    dtype=np.float32)
+
+
+def text_encode(texts):
+    # Depends on the text only, so any batching gives the same vectors
+    return np.array([[len(text), sum(map(ord, text)) % 97 + 1, 1.0, sum(map(ord, text)) % 13 + 1.0]
+                     for text in texts], dtype=np.float32)
+
+
+def failing_encode(texts):
+    raise ImportError("sentence-transformers is not installed")
+
+
+def lock_is_free(store):
+    """Try the store's lock from another process, without waiting"""
+    code = ("import fcntl, os, sys\n"
+            "fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT)\n"
+            "try:\n"
+            "    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+            "except BlockingIOError:\n"
+            "    sys.exit(1)\n")
+    return subprocess.run([sys.executable, '-c', code, os.path.join(store.dir, 'lock')]).returncode == 0
+
+
+def test_failed_encode_leaves_store_and_lock_untouched(tmp_path):
+    store = EmbeddingStore(str(tmp_path), 'test')
+    store.upsert([('a', 'alpha'), ('b', 'beta')], encode)
+    before = (dict(store.keys), dict(store.rows), list(store.free), store.count)
+
+    with pytest.raises(ImportError):
+        store.upsert([('a', 'alpha changed'), ('c', 'gamma')], failing_encode)
+
+    assert (dict(store.keys), dict(store.rows), list(store.free), store.count) == before
+    assert lock_is_free(store)
+    # The store still works afterwards
+    assert store.upsert([('c', 'gamma')], encode) == 1
+    assert sorted(EmbeddingStore(str(tmp_path), 'test').keys) == ['a', 'b', 'c']
+
+
+def test_unsaved_changes_hold_the_lock_until_save(tmp_path):
+    store = EmbeddingStore(str(tmp_path), 'test')
+    store.upsert([('a', 'alpha')], encode, save=False)
+    assert not lock_is_free(store)
+    store.save()
+    assert lock_is_free(store)
+
+
+def test_crash_before_save_keeps_the_last_saved_state_and_resumes(tmp_path):
+    # A writer saves two postings, then crashes with unsaved changes: one posting
+    # changed (its old row is pending reuse) and one added
+    code = ("import sys, os\n"
+            "sys.path[:0] = sys.argv[2:]\n"
+            "from test_embedding_store import text_encode\n"
+            "from embedding_store import EmbeddingStore\n"
+            "store = EmbeddingStore(sys.argv[1], 'test')\n"
+            "store.upsert([('a', 'alpha'), ('b', 'beta')], text_encode)\n"
+            "store.upsert([('a', 'alpha changed'), ('c', 'gamma')], text_encode, save=False)\n"
+            "store.upsert([('d', 'delta')], text_encode, save=False)\n"
+            "os._exit(1)\n")
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    crashed = subprocess.run([sys.executable, '-c', code, str(tmp_path), tests_dir, os.path.dirname(tests_dir)],
+                             capture_output=True, text=True)
+    assert crashed.returncode == 1 and not crashed.stderr
+
+    store = EmbeddingStore(str(tmp_path), 'test')
+    assert sorted(store.keys) == ['a', 'b']
+    saved = EmbeddingStore(str(tmp_path / 'expected'), 'test')
+    saved.upsert([('a', 'alpha'), ('b', 'beta')], text_encode)
+    np.testing.assert_array_equal(store.vectors(['a', 'b']), saved.vectors(['a', 'b']))
+    assert lock_is_free(store)
+
+    # Resuming encodes only what the crash lost
+    items = [('a', 'alpha changed'), ('b', 'beta'), ('c', 'gamma'), ('d', 'delta')]
+    assert store.sync(items, text_encode) == 3
+    expected = EmbeddingStore(str(tmp_path / 'fresh'), 'test')
+    expected.sync(items, text_encode)
+    keys = [key for key, _ in items]
+    np.testing.assert_array_equal(EmbeddingStore(str(tmp_path), 'test').vectors(keys), expected.vectors(keys))
+    assert store.sync(items, text_encode) == 0
@@ -0,0 +1,22 @@
+import os
+
+from file_lock import FileLock
+
+
+def test_forked_child_reopens_lock_without_leaking(tmp_path):
+    lock = FileLock(str(tmp_path / 'lock'))
+    with lock:
+        pass
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            before = len(os.listdir('/proc/self/fd'))
+            with lock:
+                # The inherited descriptor is replaced, not kept alongside the new one
+                code = 0 if len(os.listdir('/proc/self/fd')) == before else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
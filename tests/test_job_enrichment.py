@@ -0,0 +1,36 @@
+from entity_extractor import CITIES, SCAM_INDICATORS, EntityExtractor
+from job_categories import JOB_CATEGORIES
+from job_enrichment import JobEnricher
+
+
+class RuleClassifier:
+    def __init__(self, scam_indicators=SCAM_INDICATORS):
+        self.extractor = EntityExtractor(JOB_CATEGORIES, CITIES, scam_indicators)
+        self.rules_version = self.extractor.rules_version
+        self.calls = 0
+
+    def analyze_job(self, text):
+        self.calls += 1
+        entities = self.extractor.extract(text)
+        return {'location': entities['location'], 'is_suspicious': entities['is_suspicious']}
+
+
+JOB = {'id': 1, 'description': 'Helper needed in Pune, pay a joining deposit first'}
+
+
+def test_unchanged_rules_reuse_the_stored_analysis():
+    job = JobEnricher(RuleClassifier()).enrich_job(JOB)
+    classifier = RuleClassifier()
+    assert JobEnricher(classifier).enrich_job(job) is job
+    assert classifier.calls == 0
+
+
+def test_changed_rules_analyze_again():
+    job = JobEnricher(RuleClassifier()).enrich_job(JOB)
+    assert job['analysis']['is_suspicious'] is False
+
+    classifier = RuleClassifier(SCAM_INDICATORS + ['joining deposit'])
+    updated = JobEnricher(classifier).enrich_job(job)
+    assert classifier.calls == 1
+    assert updated['analysis']['is_suspicious'] is True
+    assert updated['analysis_hash'] != job['analysis_hash']
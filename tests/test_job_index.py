@@ -0,0 +1,101 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import job_api
+from job_index import JobIndex, decode_cursor, encode_cursor, resume_position
+from job_store import JobSnapshot
+
+CITIES = ['Mumbai', 'Pune', 'Mumbai Suburbs', 'Delhi']
+
+
+def make_jobs(count):
+    return [{'id': job_id, 'title': f'Job {job_id}', 'location': CITIES[job_id % len(CITIES)],
+             'category': 'plumber' if job_id % 2 else 'driver'}
+            for job_id in range(1, count + 1)]
+
+
+def page_through(jobs, page_size, **filters):
+    index = JobIndex(jobs)
+    ids, after = [], None
+    while True:
+        positions, after = index.search(limit=page_size, after=after, **filters)
+        ids.extend(jobs[position]['id'] for position in positions)
+        if after is None:
+            return ids
+
+
+@pytest.mark.parametrize('page_size', [1, 3, 7, 100])
+def test_pages_cover_every_match_once(page_size):
+    jobs = make_jobs(40)
+    expected = [job['id'] for job in jobs if job['location'] == 'Pune' and job['category'] == 'plumber']
+    assert page_through(jobs, page_size, location='pune', category='plumber') == expected
+    assert page_through(jobs, page_size) == [job['id'] for job in jobs]
+
+
+def test_cursor_round_trip_and_malformed_cursors():
+    assert decode_cursor(encode_cursor(5, 42)) == (5, 42)
+    for cursor in ['', 'not base64!', encode_cursor(-1, 1)]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_cursor_follows_its_job_after_a_reload():
+    jobs = make_jobs(10)
+    position = 6
+    job_id = jobs[position]['id']
+    reloaded = [job for job in jobs if job['id'] not in (2, 3)] + make_jobs(12)[10:]
+
+    assert resume_position(jobs, position, job_id) == position
+    assert reloaded[resume_position(reloaded, position, job_id)]['id'] == job_id
+    with pytest.raises(ValueError):
+        resume_position([job for job in jobs if job['id'] != job_id], position, job_id)
+
+
+class FixedStore:
+    def __init__(self, jobs):
+        self.current = JobSnapshot(jobs, version=1)
+
+    def snapshot(self):
+        return self.current
+
+
+def test_jobs_endpoint_pages_across_reloads_and_rejects_stale_cursors(monkeypatch):
+    jobs = make_jobs(12)
+    store = FixedStore(jobs)
+    monkeypatch.setattr(job_api, 'job_store', store)
+    client = TestClient(job_api.app)
+
+    first = client.get('/jobs', params={'limit': 5}).json()
+    assert [job['id'] for job in first['jobs']] == [1, 2, 3, 4, 5]
+
+    # Jobs before the cursor disappear and new ones arrive between pages
+    store.current = JobSnapshot([job for job in jobs if job['id'] not in (1, 2)] + make_jobs(14)[12:], 2)
+    second = client.get('/jobs', params={'limit': 5, 'cursor': first['next_cursor']}).json()
+    assert [job['id'] for job in second['jobs']] == [6, 7, 8, 9, 10]
+
+    store.current = JobSnapshot([job for job in jobs if job['id'] != 10], 3)
+    response = client.get('/jobs', params={'limit': 5, 'cursor': second['next_cursor']})
+    assert response.status_code == 400
+    assert client.get('/jobs', params={'cursor': 'garbage'}).status_code == 400
+
+
+def test_partial_location_matches_any_location_containing_it():
+    jobs = make_jobs(12)
+    index = JobIndex(jobs)
+    mumbai = [job['id'] for job in jobs if 'Mumbai' in job['location']]
+
+    positions, _ = index.search(location='mumbai', limit=100, partial_location=True)
+    assert [jobs[position]['id'] for position in positions] == mumbai
+    assert index.count(location='MUMBAI', partial_location=True) == len(mumbai)
+    assert index.count(location='mumbai') == len(mumbai) - 3
+
+
+def test_match_jobs_keeps_substring_locations(monkeypatch):
+    jobs = [dict(job, description='plumber needed for pipe fitting', analysis={})
+            for job in make_jobs(8)]
+    monkeypatch.setattr(job_api, 'job_store', FixedStore(jobs))
+
+    response = TestClient(job_api.app).post('/match-jobs', json={
+        'skills': 'plumber pipe fitting', 'experience': '', 'preferred_location': 'Mumbai'})
+    locations = {match['job']['location'] for match in response.json()['matched_jobs']}
+    assert locations == {'Mumbai', 'Mumbai Suburbs'}
@@ -0,0 +1,34 @@
+from job_log import JobLog
+
+
+def posting(title, description, url=None):
+    job = {'title': title, 'description': description, 'location': 'Pune', 'source': 'Skill India Digital'}
+    if url:
+        job['detail_url'] = url
+    return job
+
+
+def test_only_new_or_changed_postings_are_written(tmp_path):
+    log = JobLog(str(tmp_path / 'jobs.jsonl'))
+    first = [posting('Plumber', 'Fix pipes', '/job/1'), posting('Driver', 'Drive a van', '/job/2')]
+    assert log.write_jobs(first) == 2
+    # Rescraped with new scrape times and ids, plus a repeat within the batch
+    assert log.write_jobs([dict(job, id=99, scraped_at='later') for job in first] + [first[0]]) == 0
+
+    changed = posting('Plumber', 'Fix pipes and taps', '/job/1')
+    assert log.write_jobs([changed, posting('Cook', 'Cook lunch')]) == 2
+    state, _ = log.replay()
+    jobs = {job['title']: job for _, job in state.values()}
+    assert (jobs['Plumber']['description'], jobs['Plumber']['id']) == ('Fix pipes and taps', 1)
+    assert jobs['Cook']['id'] == 3
+
+
+def test_writers_sharing_a_log_never_duplicate(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    api, dashboard = JobLog(path), JobLog(path)
+    assert api.write_jobs([posting('Plumber', 'Fix pipes', '/job/1')]) == 1
+    assert dashboard.write_jobs([posting('Plumber', 'Fix pipes', '/job/1'),
+                                 posting('Driver', 'Drive a van', '/job/2')]) == 1
+    assert api.write_jobs([posting('Driver', 'Drive a van', '/job/2')]) == 0
+    state, _ = JobLog(path).replay()
+    assert sorted(job['id'] for _, job in state.values()) == [1, 2]
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+from benchmark_keyword_matcher import loop_match
+from entity_extractor import CITIES, SCAM_INDICATORS
+from job_categories import JOB_CATEGORIES
+from keyword_matcher import JobKeywordMatcher, KeywordMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRICKY = [
+    'Teacher needed for a coaching centre',              # 'ac' inside 'teacher' and 'coaching'
+    'Delivery driver with own vehicle, delivery daily',  # one keyword, two categories, repeated
+    'AC technician for HVAC and air conditioning repair',
+    'Registration fee of Rs 500 and advance payment required. Earn lakhs!',
+    'WAREHOUSE PACKING AND LOADING STAFF',
+    '',
+]
+
+
+def postings():
+    with open(os.path.join(ROOT, 'scraped_jobs.json'), encoding='utf-8') as f:
+        jobs = json.load(f)
+    return [job['title'] + ' ' + job['description'] for job in jobs] + TRICKY
+
+
+@pytest.mark.parametrize('text', postings())
+def test_matches_the_per_keyword_substring_loop(text):
+    matcher = JobKeywordMatcher(JOB_CATEGORIES, CITIES, SCAM_INDICATORS)
+    result = matcher.match(text)
+    category_scores, location, is_suspicious = loop_match(text, JOB_CATEGORIES, CITIES, SCAM_INDICATORS)
+
+    assert result['category_counts'] == category_scores
+    assert bool(result['scam_flags']) == is_suspicious
+    # The loop took the first city in list order; the matcher the first one in the text
+    cities_in_text = [city for city in CITIES if city in text.lower()]
+    if len(cities_in_text) <= 1:
+        assert result['location'] == location
+
+
+def test_location_is_the_first_city_mentioned():
+    matcher = JobKeywordMatcher({}, CITIES, [])
+    assert matcher.match('Work in Pune, relocating to Mumbai later')['location'] == 'Pune'
+
+
+def test_overlapping_keywords_and_spans():
+    matcher = KeywordMatcher()
+    for keyword in ['he', 'she', 'his', 'hers']:
+        matcher.add(keyword, 'word')
+    result = matcher.scan('USHERS')
+    assert [(start, end, keyword) for start, end, keyword, _ in result['spans']] == [
+        (1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+    assert result['counts'] == {'word': 3}
+
+
+def test_lowered_text_is_not_lowercased_again():
+    matcher = JobKeywordMatcher(JOB_CATEGORIES, CITIES, SCAM_INDICATORS)
+    text = 'Plumber needed in MUMBAI, registration fee applies'
+    assert matcher.match(text.lower(), lowered=True) == matcher.match(text)
+    # Taken as given: uppercase text passed as lowered finds nothing
+    assert matcher.match(text.upper(), lowered=True)['category_counts'] == {}
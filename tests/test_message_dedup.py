@@ -0,0 +1,36 @@
+import time
+
+from message_dedup import MessageDeduplicator
+
+
+def test_redelivered_ids_are_dropped_until_forgotten():
+    seen = MessageDeduplicator(ttl=60, max_size=100)
+    assert seen.mark_new('wamid.1')
+    assert not seen.mark_new('wamid.1')
+    assert seen.mark_new('wamid.2')
+    # Messages without an id can't be deduplicated, so they always pass
+    assert seen.mark_new(None) and seen.mark_new(None)
+
+    seen.forget('wamid.1')
+    assert seen.mark_new('wamid.1')
+    assert seen.stats()['hits'] == 1
+
+
+def test_ids_are_shared_through_the_database(tmp_path):
+    db_path = str(tmp_path / 'dedup.db')
+    worker_a = MessageDeduplicator(ttl=60, max_size=100, db_path=db_path)
+    worker_b = MessageDeduplicator(ttl=60, max_size=100, db_path=db_path)
+    assert worker_a.mark_new('wamid.1')
+    assert not worker_b.mark_new('wamid.1')
+
+    # A restarted process still remembers it
+    assert not MessageDeduplicator(ttl=60, db_path=db_path).mark_new('wamid.1')
+    worker_a.forget('wamid.1')
+    assert MessageDeduplicator(ttl=60, db_path=db_path).mark_new('wamid.1')
+
+
+def test_expired_ids_are_accepted_again(tmp_path):
+    seen = MessageDeduplicator(ttl=0.01, max_size=100, db_path=str(tmp_path / 'dedup.db'))
+    assert seen.mark_new('wamid.1')
+    time.sleep(0.05)
+    assert seen.mark_new('wamid.1')
@@ -0,0 +1,63 @@
+import threading
+
+from message_queue import MessageQueue
+
+
+class Handler:
+    """Records messages; blocks until ``release`` is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.handled = []
+
+    def __call__(self, message):
+        self.release.wait(5)
+        if message.get('fail'):
+            raise RuntimeError('handler failed')
+        self.handled.append(message['n'])
+
+
+def test_stop_drains_every_queued_message():
+    handler = Handler()
+    messages = MessageQueue(handler, max_size=100, workers=2)
+    for n in range(20):
+        assert messages.put({'n': n})
+    messages.put({'n': 20, 'fail': True})
+    handler.release.set()
+    messages.stop(drain=True)
+
+    assert sorted(handler.handled) == list(range(20))
+    stats = messages.stats()
+    assert (stats['processed'], stats['failed'], stats['queued']) == (20, 1, 0)
+    # Refused once stopped
+    assert not messages.put({'n': 21})
+
+
+def test_full_queue_refuses_instead_of_blocking():
+    handler = Handler()
+    messages = MessageQueue(handler, max_size=2, workers=1)
+    accepted = [messages.put({'n': n}) for n in range(5)]
+    # One message is with the blocked worker, two wait, the rest are refused
+    assert accepted.count(True) in (2, 3) and accepted[:2] == [True, True]
+    assert messages.stats()['rejected'] == accepted.count(False)
+    handler.release.set()
+    messages.stop()
+
+
+def test_undrained_persisted_messages_are_recovered_on_restart(tmp_path):
+    db_path = str(tmp_path / 'queue.db')
+    handler = Handler()
+    first = MessageQueue(handler, max_size=100, workers=1, db_path=db_path)
+    for n in range(5):
+        first.put({'n': n})
+    # The worker finishes the message it holds; the queued ones stay in the database
+    handler.release.set()
+    first.stop(drain=False)
+
+    recovered = Handler()
+    recovered.release.set()
+    second = MessageQueue(recovered, max_size=100, workers=1, db_path=db_path)
+    second.start()
+    second.stop(drain=True)
+    assert sorted(handler.handled + recovered.handled) == list(range(5))
+    assert second.stats()['recovered'] == len(recovered.handled)
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from enhanced_job_classifier import build_once, weights_signature
+
+
+def write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_export_is_rebuilt_only_when_the_weights_change(tmp_path):
+    write(tmp_path / 'model.safetensors', 'v1')
+    target = str(tmp_path / 'model.onnx')
+    builds = []
+
+    def build(path):
+        builds.append(path)
+        write(path, 'export of ' + (tmp_path / 'model.safetensors').read_text())
+
+    build_once(target, weights_signature(tmp_path), build)
+    build_once(target, weights_signature(tmp_path), build)
+    assert len(builds) == 1
+
+    write(tmp_path / 'model.safetensors', 'v2 weights')
+    build_once(target, weights_signature(tmp_path), build)
+    assert len(builds) == 2
+    assert open(target).read() == 'export of v2 weights'
+
+
+def test_failed_export_leaves_nothing_behind(tmp_path):
+    write(tmp_path / 'model.safetensors', 'v1')
+    target = str(tmp_path / 'model.onnx')
+
+    def crash(path):
+        write(path, 'half an export')
+        raise RuntimeError('export failed')
+
+    with pytest.raises(RuntimeError):
+        build_once(target, weights_signature(tmp_path), crash)
+    assert sorted(os.listdir(tmp_path)) == ['model.safetensors']
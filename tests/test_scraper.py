@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from skill_india_scraper import AsyncSkillIndiaScraper, ConditionalRequestCache
+
+PAGES = {
+    1: [('Electrician', 'Mumbai'), ('Plumber', 'Pune')],
+    2: [('Driver', 'Delhi')],
+    3: [('Cook', 'Chennai')],
+}
+
+
+def listing_html(pages, page):
+    cards = ''.join(
+        f'<div class="job-card"><h3 class="job-title">{title}</h3>'
+        f'<p class="job-desc">{title} needed</p><span>{city}</span>'
+        f'<a href="/job/{page}-{number}">View</a></div>'
+        for number, (title, city) in enumerate(pages[page]))
+    return f'<html><body>{cards}</body></html>'
+
+
+def make_app(requests, pages):
+    async def listing(request):
+        page = int(request.query.get('page', 1))
+        requests.append(request.path_qs)
+        etag = f'"listing-{page}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        return web.Response(text=listing_html(pages, page), content_type='text/html', headers={'ETag': etag})
+
+    async def detail(request):
+        requests.append(request.path)
+        return web.Response(text=f'<div class="job-detail">Full description of {request.match_info["id"]}</div>',
+                            content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/content/list-jobs', listing)
+    app.router.add_get('/job/{id}', detail)
+    return app
+
+
+async def scrape(requests, http_cache=None, port=0, pages=PAGES):
+    """Scrape a local stand-in site; pass the previous scraper's port to revisit the same URLs"""
+    runner = web.AppRunner(make_app(requests, pages))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        scraper = AsyncSkillIndiaScraper(f'http://127.0.0.1:{port}', requests_per_second=1000,
+                                         http_cache=http_cache)
+        scraper.port = port
+        await scraper.scrape_jobs_async(max_pages=3)
+        return scraper
+    finally:
+        await runner.cleanup()
+
+
+class Log:
+    path = 'memory'
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.jobs = []
+
+    def write_jobs(self, jobs, enricher=None):
+        if self.fail:
+            raise OSError('disk full')
+        self.jobs.extend(jobs)
+        return len(jobs)
+
+
+def test_scrapes_listing_and_detail_pages_in_order():
+    requests = []
+    scraper = asyncio.run(scrape(requests))
+
+    assert not scraper.used_sample_jobs
+    assert [(job['id'], job['title'], job['location']) for job in scraper.jobs] == [
+        (1, 'Electrician', 'Mumbai'), (2, 'Plumber', 'Pune'), (3, 'Driver', 'Delhi'), (4, 'Cook', 'Chennai')]
+    assert [job['description'] for job in scraper.jobs] == [
+        'Full description of 1-0', 'Full description of 1-1', 'Full description of 2-0', 'Full description of 3-0']
+    assert sorted(path for path in requests if path.startswith('/job/')) == ['/job/1-0', '/job/1-1', '/job/2-0',
+                                                                            '/job/3-0']
+
+
+def test_unchanged_pages_are_skipped_once_their_jobs_are_logged(tmp_path):
+    cache_path = str(tmp_path / 'http_cache.json')
+    first = asyncio.run(scrape([], ConditionalRequestCache(cache_path)))
+    first.save_jobs_to_log(Log())
+    assert sorted(json.load(open(cache_path))) == [first.jobs[0]['url'], first.jobs[2]['url'],
+                                                   first.jobs[3]['url']]
+
+    requests = []
+    second = asyncio.run(scrape(requests, ConditionalRequestCache(cache_path), first.port))
+    assert second.jobs == [] and second.unchanged_pages == 3
+    assert not second.used_sample_jobs
+    assert not [path for path in requests if path.startswith('/job/')]
+
+
+def test_validators_are_not_kept_when_the_log_write_fails(tmp_path):
+    cache_path = str(tmp_path / 'http_cache.json')
+    scraper = asyncio.run(scrape([], ConditionalRequestCache(cache_path)))
+    try:
+        scraper.save_jobs_to_log(Log(fail=True))
+    except OSError:
+        pass
+    assert not (tmp_path / 'http_cache.json').exists()
+
+    # The next scrape downloads everything again
+    again = asyncio.run(scrape([], ConditionalRequestCache(cache_path), scraper.port))
+    assert len(again.jobs) == 4 and again.unchanged_pages == 0
+
+
+def test_sample_fallback_never_caches_the_pages(tmp_path):
+    # The listing answers with an ETag but holds no postings, so samples are used
+    cache = ConditionalRequestCache(str(tmp_path / 'http_cache.json'))
+    scraper = asyncio.run(scrape([], cache, pages={page: [] for page in PAGES}))
+    assert scraper.used_sample_jobs and scraper.jobs
+    scraper.save_jobs_to_log(Log())
+    assert not (tmp_path / 'http_cache.json').exists()
@@ -0,0 +1,33 @@
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_full_cache_drops_expired_entries_before_live_ones():
+    clock = Clock()
+    cache = TTLCache(max_size=3, ttl=10, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    clock.now = 5
+    cache.put('c', 3)
+    clock.now = 12
+
+    cache.put('d', 4)
+    assert [key for key in ('a', 'b', 'c', 'd') if key in cache] == ['c', 'd']
+    assert cache.cache_info()['expired'] == 2
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
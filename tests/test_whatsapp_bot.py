@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+import whatsapp_bot
+from model_holder import LazyModel
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    """The bot app as a WSGI server would import it: prepare_model never called"""
+    release = threading.Event()
+
+    def load():
+        release.wait(5)
+        return object()
+
+    monkeypatch.setattr(whatsapp_bot, 'classifier', LazyModel(load))
+    monkeypatch.setattr(whatsapp_bot, 'model_prepared', False)
+    yield whatsapp_bot, release
+    release.set()
+
+
+def test_background_warmup_starts_on_first_request(bot, monkeypatch):
+    module, release = bot
+    monkeypatch.setattr(module, 'MODEL_LOADING', 'background')
+    client = module.app.test_client()
+
+    assert client.get('/ready').status_code == 503
+    release.set()
+    assert module.classifier.wait(5)
+    assert client.get('/ready').status_code == 200
+
+
+def test_lazy_mode_is_ready_before_the_model_loads(bot, monkeypatch):
+    module, _ = bot
+    monkeypatch.setattr(module, 'MODEL_LOADING', 'lazy')
+
+    response = module.app.test_client().get('/ready')
+    assert response.status_code == 200
+    assert response.get_json()['loaded'] is False
+    assert not module.classifier.status()['loading']
@@ -0,0 +1,79 @@
+import heapq
+import math
+import re
+from array import array
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercase word tokens; whole words only, so 'ac' does not match 'contact'"""
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """Tokenized inverted index over job title and description, ranked with BM25
+
+    Built once per job snapshot. A query only touches the posting lists of its
+    own terms, so its cost depends on how common those terms are rather than on
+    the size of the corpus.
+    """
+
+    def __init__(self, jobs, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(jobs)
+        self.doc_lengths = array('i')
+        self.postings = {}
+
+        for position, job in enumerate(jobs):
+            tokens = tokenize(f"{job.get('title', '')} {job.get('description', '')}")
+            self.doc_lengths.append(len(tokens))
+            term_counts = {}
+            for token in tokens:
+                term_counts[token] = term_counts.get(token, 0) + 1
+            for term, count in term_counts.items():
+                positions, frequencies = self.postings.setdefault(term, (array('i'), array('i')))
+                positions.append(position)
+                frequencies.append(count)
+
+        self.avg_doc_length = (sum(self.doc_lengths) / self.size) if self.size else 0.0
+
+    def idf(self, term):
+        postings = self.postings.get(term)
+        doc_freq = len(postings[0]) if postings else 0
+        return math.log(1 + (self.size - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def score(self, query, accept=None):
+        """Return ``{position: bm25}`` for documents containing any query term
+
+        ``accept`` is an optional ``position -> bool`` filter applied before scoring.
+        """
+        scores = {}
+        if not self.size:
+            return scores
+        k1, b = self.k1, self.b
+        norm = k1 / self.avg_doc_length if self.avg_doc_length else 0.0
+        doc_lengths = self.doc_lengths
+        rejected = set()
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for position, frequency in zip(*postings):
+                if position in rejected:
+                    continue
+                if accept is not None and position not in scores and not accept(position):
+                    rejected.add(position)
+                    continue
+                length_norm = k1 * (1 - b) + norm * b * doc_lengths[position]
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (k1 + 1) / (frequency + length_norm)
+        return scores
+
+    def search(self, query, top_k=10, accept=None):
+        """Return ``(top, total)``: the ``top_k`` ``(position, score)`` pairs and the match count"""
+        scores = self.score(query, accept)
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return top, len(scores)
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored
+
+    ``max_size`` bounds the number of entries (least recently used go first);
+    ``ttl=None`` keeps entries until they are evicted. Expired entries are
+    dropped when they are looked up, or when the cache is full and they are
+    next in line for eviction, so a put costs O(1) however full the cache is.
+    Hits, misses and expiries are counted for ``cache_info``.
+    """
+
+    def __init__(self, max_size=4096, ttl=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key, default=None, count=True):
+        """Cached value of ``key``, or ``default`` if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self.clock() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, restarting its time to live"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._entries[key] = (value, self.clock())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._drop_expired_head()
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _drop_expired_head(self):
+        """Drop expired entries from the least recently used end, up to the first live one
+
+        Each entry is dropped at most once, so this is O(1) per put amortized;
+        expired entries further in are left for ``get`` or a later eviction.
+        """
+        if self.ttl is None:
+            return
+        now = self.clock()
+        while self._entries:
+            _, stored = next(iter(self._entries.values()))
+            if now - stored <= self.ttl:
+                break
+            self._entries.popitem(last=False)
+            self.expired += 1
+
+    def add(self, key, value=True):
+        """Store ``value`` only if ``key`` is absent or expired; returns True if stored
+
+        Counts a hit when the key was already present, a miss otherwise, so
+        concurrent callers can use it as an atomic check-and-set.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or self.clock() - entry[1] <= self.ttl):
+                self.hits += 1
+                return False
+            if entry is not None:
+                self.expired += 1
+            self.misses += 1
+            self._store(key, value)
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def cache_info(self):
+        """Hit/miss/expiry counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expired = 0
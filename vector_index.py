@@ -0,0 +1,542 @@
+import heapq
+import math
+
+import numpy as np
+
+# Query rows scored against the whole matrix at once by ExactIndex.search
+EXACT_QUERY_CHUNK = 256
+
+# Rows assigned to centroids at once while training/filling an IVF index
+IVF_ASSIGN_CHUNK = 65536
+
+# Storage precisions of ExactIndex/IVFIndex vectors
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Rows of a reduced-precision matrix widened to float32 at once while scoring;
+# small enough for the widened block to stay in cache
+DECODE_CHUNK = 1024
+
+# A filtered HNSW search scores the allowed rows exactly when they are at most
+# this share of the index; walking the graph past mostly rejected nodes costs more
+HNSW_FILTER_EXACT_RATIO = 0.2
+
+
+def normalize(vectors):
+    """Float32 copy of ``vectors`` with unit-length rows, so dot product is cosine"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    """Positions of the ``k`` largest scores, best first, without a full sort"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def allowed_mask(allowed, size):
+    """Boolean mask over ids ``0..size-1`` from a mask or an array of allowed ids"""
+    allowed = np.asarray(allowed)
+    if allowed.dtype == bool:
+        if len(allowed) != size:
+            raise ValueError(f"Filter mask has {len(allowed)} entries for {size} vectors")
+        return allowed
+    mask = np.zeros(size, dtype=bool)
+    mask[allowed.astype(np.int64)] = True
+    return mask
+
+
+def _pad(rows, k):
+    """Stack per-query (scores, ids) results into (n, k) arrays padded with -inf/-1"""
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(rows), k), -1, dtype=np.int64)
+    for i, (row_scores, row_ids) in enumerate(rows):
+        scores[i, :len(row_scores)] = row_scores
+        ids[i, :len(row_ids)] = row_ids
+    return scores, ids
+
+
+class QuantizedMatrix:
+    """Row vectors stored as float32, float16 or int8, always scored in float32
+
+    ``int8`` is symmetric per-dimension scalar quantization: each dimension is
+    scaled so its largest absolute value maps to 127, and the query is
+    multiplied by the scales instead of the rows. Reduced-precision rows are
+    widened to float32 ``DECODE_CHUNK`` at a time, so a full float32 copy of
+    the matrix never exists.
+    """
+
+    def __init__(self, data, precision='float32', scale=None):
+        self.data = data
+        self.precision = precision
+        self.scale = scale
+
+    @classmethod
+    def encode(cls, vectors, precision='float32', scale=None):
+        """Quantize float vectors; ``scale`` reuses int8 scales from an earlier encode"""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}; choose from {list(PRECISIONS)}")
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if precision == 'float32':
+            return cls(vectors, precision)
+        if precision == 'float16':
+            return cls(vectors.astype(np.float16), precision)
+        if scale is None:
+            peak = np.abs(vectors).max(axis=0) if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+            scale = np.where(peak > 0, peak / 127, 1).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+        return cls(codes, precision, scale)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def take(self, rows):
+        """The given rows (an index array or slice) as a new matrix"""
+        return QuantizedMatrix(self.data[rows], self.precision, self.scale)
+
+    def append(self, vectors):
+        """This matrix with ``vectors`` encoded (with the same scales) after it"""
+        if not len(self.data):
+            return QuantizedMatrix.encode(vectors, self.precision)
+        added = QuantizedMatrix.encode(vectors, self.precision, self.scale)
+        return QuantizedMatrix(np.vstack([self.data, added.data]), self.precision, self.scale)
+
+    def decode(self, rows=slice(None)):
+        """Float32 approximation of the given rows"""
+        data = self.data[rows].astype(np.float32)
+        return data * self.scale if self.scale is not None else data
+
+    def scores(self, queries, rows=slice(None)):
+        """Inner products ``queries @ matrix[rows].T`` (``queries`` may be one vector)"""
+        data = self.data[rows]
+        if self.precision == 'float32':
+            return queries @ data.T
+        if self.scale is not None:
+            queries = queries * self.scale
+        out = np.empty(queries.shape[:-1] + (len(data),), dtype=np.float32)
+        block = np.empty((min(DECODE_CHUNK, len(data)), data.shape[1]), dtype=np.float32)
+        for start in range(0, len(data), DECODE_CHUNK):
+            chunk = data[start:start + DECODE_CHUNK]
+            widened = block[:len(chunk)]
+            np.copyto(widened, chunk, casting='unsafe')
+            out[..., start:start + len(chunk)] = queries @ widened.T
+        return out
+
+
+def _exact_search(vectors, queries, k, ids=None):
+    """Top ``k`` rows of ``vectors`` (an array or QuantizedMatrix) for each query,
+    reported as ``ids[row]`` if given"""
+    if not len(vectors):
+        return _pad([((), ())] * len(queries), k)
+    if not isinstance(vectors, QuantizedMatrix):
+        vectors = QuantizedMatrix(vectors)
+    kept = min(k, len(vectors))
+    all_scores, all_rows = [], []
+    for start in range(0, len(queries), EXACT_QUERY_CHUNK):
+        scores = vectors.scores(queries[start:start + EXACT_QUERY_CHUNK])
+        if kept < len(vectors):
+            rows = np.argpartition(-scores, kept - 1, axis=1)[:, :kept]
+        else:
+            rows = np.broadcast_to(np.arange(len(vectors)), scores.shape)
+        top_scores = np.take_along_axis(scores, rows, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        all_scores.append(np.take_along_axis(top_scores, order, axis=1))
+        all_rows.append(np.take_along_axis(rows, order, axis=1))
+    scores, rows = np.vstack(all_scores), np.vstack(all_rows).astype(np.int64)
+    if ids is not None:
+        rows = np.asarray(ids, dtype=np.int64)[rows]
+    if kept < k:
+        return _pad(list(zip(scores, rows)), k)
+    return scores, rows
+
+
+class ExactIndex:
+    """Brute-force inner product over normalized vectors
+
+    The reference for the approximate indexes: every query is scored against
+    every vector and the top ``k`` taken with ``argpartition``. ``precision``
+    (``float32``, ``float16`` or ``int8``) sets how the vectors are stored;
+    see QuantizedMatrix.
+    """
+
+    def __init__(self, precision='float32'):
+        self.precision = precision
+        self.vectors = QuantizedMatrix.encode(np.empty((0, 0), dtype=np.float32), precision)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def nbytes(self):
+        """Memory held by the stored vectors"""
+        return self.vectors.nbytes
+
+    def build(self, vectors):
+        """Index ``vectors`` (ids are their row positions); returns self"""
+        vectors = normalize(vectors) if len(vectors) else np.empty((0, 0), dtype=np.float32)
+        self.vectors = QuantizedMatrix.encode(vectors, self.precision)
+        return self
+
+    def add(self, vectors):
+        """Append vectors; they get the next ids"""
+        self.vectors = self.vectors.append(normalize(vectors))
+
+    def search(self, queries, k=5, allowed=None):
+        """Return ``(scores, ids)``, each ``(n_queries, k)``, best first
+
+        ``allowed`` (a boolean mask over ids, or an array of ids) restricts the
+        search to those vectors; only they are scored.
+        """
+        queries = normalize(queries)
+        if allowed is None:
+            return _exact_search(self.vectors, queries, k)
+        rows = np.flatnonzero(allowed_mask(allowed, len(self)))
+        return _exact_search(self.vectors.take(rows), queries, k, rows)
+
+
+class IVFIndex:
+    """Inverted-file index: vectors grouped under k-means centroids
+
+    A query scores the centroids, then only the vectors in the ``n_probe`` best
+    lists. More lists make each probe cheaper; more probes raise recall. Vectors
+    are stored grouped by list so each probe is one contiguous matrix product,
+    in the given ``precision`` (see QuantizedMatrix); centroids stay float32.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, train_iters=10, train_size=None, seed=0,
+                 precision='float32'):
+        self.precision = precision
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iters = train_iters
+        self.train_size = train_size
+        self.seed = seed
+        self.centroids = None
+        self._vectors = QuantizedMatrix.encode(np.empty((0, 0), dtype=np.float32), precision)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lists = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def nbytes(self):
+        """Memory held by the stored vectors, centroids and id arrays"""
+        centroids = self.centroids.nbytes if self.centroids is not None else 0
+        return self._vectors.nbytes + centroids + self._ids.nbytes + self._lists.nbytes + self._offsets.nbytes
+
+    def _assign(self, vectors):
+        """Nearest centroid of each vector"""
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), IVF_ASSIGN_CHUNK):
+            chunk = vectors[start:start + IVF_ASSIGN_CHUNK]
+            assignment[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignment
+
+    def train(self, vectors):
+        """Spherical k-means over (a sample of) ``vectors``"""
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.n_lists or max(1, int(math.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        train_size = self.train_size or max(n_lists * 64, 10000)
+        sample = vectors
+        if len(vectors) > train_size:
+            sample = vectors[rng.choice(len(vectors), train_size, replace=False)]
+
+        self.centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.train_iters):
+            assignment = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=n_lists)
+            empty = counts == 0
+            # Restart empty lists from random points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = normalize(sums)
+        self.n_lists = n_lists
+        return self
+
+    def _store(self, vectors, ids, lists):
+        order = np.argsort(lists, kind='stable')
+        self._vectors = vectors.take(order)
+        self._ids = ids[order]
+        self._lists = lists[order]
+        self._offsets = np.searchsorted(self._lists, np.arange(self.n_lists + 1))
+
+    def build(self, vectors):
+        """Train the centroids and index ``vectors`` (ids are their row positions)"""
+        vectors = normalize(vectors)
+        self.train(vectors)
+        self._store(QuantizedMatrix.encode(vectors, self.precision), np.arange(len(vectors)),
+                    self._assign(vectors))
+        return self
+
+    def add(self, vectors):
+        """Append vectors under the existing centroids; they get the next ids"""
+        if self.centroids is None:
+            self.build(vectors)
+            return
+        vectors = normalize(vectors)
+        ids = np.arange(len(self), len(self) + len(vectors))
+        self._store(self._vectors.append(vectors), np.concatenate([self._ids, ids]),
+                    np.concatenate([self._lists, self._assign(vectors)]))
+
+    def search(self, queries, k=5, n_probe=None, allowed=None):
+        """Return ``(scores, ids)``, each ``(n_queries, k)``, best first
+
+        With ``allowed`` (a boolean mask over ids, or an array of ids) only those
+        vectors are scored, and probing continues past ``n_probe`` lists until
+        ``k`` of them have been seen. When fewer vectors pass than the probes
+        would scan, they are all scored exactly instead.
+        """
+        queries = normalize(queries)
+        n_probe = min(n_probe or self.n_probe, self.n_lists or 0)
+        passing = None
+        if allowed is not None and len(self):
+            # Filter in storage order, so each list's passing rows are a slice
+            passing = allowed_mask(allowed, len(self))[self._ids]
+            passing_rows = np.flatnonzero(passing)
+            if len(passing_rows) <= len(self) * n_probe / self.n_lists:
+                return _exact_search(self._vectors.take(passing_rows), queries, k, self._ids[passing_rows])
+        rows = []
+        for query in queries:
+            if not len(self):
+                rows.append(((), ()))
+                continue
+            centroid_scores = self.centroids @ query
+            if passing is None:
+                probes = top_k(centroid_scores, n_probe)
+            else:
+                probes = top_k(centroid_scores, self.n_lists)
+            scores, ids = [], []
+            found = 0
+            for i, probe in enumerate(probes):
+                if passing is not None and i >= n_probe and found >= k:
+                    break
+                start, end = self._offsets[probe], self._offsets[probe + 1]
+                if start == end:
+                    continue
+                if passing is None:
+                    scores.append(self._vectors.scores(query, slice(start, end)))
+                    ids.append(self._ids[start:end])
+                else:
+                    kept = start + np.flatnonzero(passing[start:end])
+                    scores.append(self._vectors.scores(query, kept))
+                    ids.append(self._ids[kept])
+                    found += len(kept)
+            if not scores:
+                rows.append(((), ()))
+                continue
+            scores, ids = np.concatenate(scores), np.concatenate(ids)
+            top = top_k(scores, k)
+            rows.append((scores[top], ids[top]))
+        return _pad(rows, k)
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph over normalized vectors
+
+    Each vector is linked to about ``m`` neighbours per layer (``2 * m`` on the
+    bottom one), chosen with the usual diversity heuristic. Searches descend
+    greedily through the sparse upper layers and then keep ``ef_search``
+    candidates on the bottom layer: raise it for recall, lower it for speed.
+    ``ef_construction`` is the same trade-off at build time.
+    """
+
+    def __init__(self, m=16, ef_construction=100, ef_search=50, seed=0):
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / math.log(max(m, 2))
+        self._rng = np.random.default_rng(seed)
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._count = 0
+        self._links = []
+        self._entry = None
+        self._max_level = -1
+
+    def __len__(self):
+        return self._count
+
+    def build(self, vectors):
+        """Insert ``vectors`` one by one (ids are their row positions); returns self"""
+        self.add(vectors)
+        return self
+
+    def add(self, vectors):
+        """Insert vectors; they get the next ids"""
+        vectors = normalize(vectors)
+        if not len(vectors):
+            return
+        needed = self._count + len(vectors)
+        if needed > len(self._vectors):
+            grown = np.empty((max(needed, 2 * len(self._vectors)), vectors.shape[1]), dtype=np.float32)
+            if self._count:
+                grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+        for vector in vectors:
+            self._insert(vector)
+
+    def _search_layer(self, query, entries, ef, level, allowed=None):
+        """Best-first search of one layer; returns up to ``ef`` ``(score, node)`` pairs
+
+        With ``allowed`` the walk still passes through every node, but only
+        allowed ones are kept as results.
+        """
+        links = self._links[level]
+        vectors = self._vectors
+        heappush, heappop = heapq.heappush, heapq.heappop
+        visited = set(entries)
+        scores = (self._vectors[entries] @ query).tolist()
+        candidates = [(-score, node) for score, node in zip(scores, entries)]
+        heapq.heapify(candidates)
+        results = [(score, node) for score, node in zip(scores, entries)
+                   if allowed is None or allowed[node]]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative, node = heappop(candidates)
+            if len(results) >= ef and -negative < results[0][0]:
+                break
+            neighbours = [n for n in links[node] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for score, neighbour in zip((vectors[neighbours] @ query).tolist(), neighbours):
+                if len(results) < ef or score > results[0][0]:
+                    heappush(candidates, (-score, neighbour))
+                    if allowed is None or allowed[neighbour]:
+                        heappush(results, (score, neighbour))
+                        if len(results) > ef:
+                            heappop(results)
+        return results
+
+    def _select_neighbours(self, found, m):
+        """Keep candidates closer to the new node than to any neighbour already kept"""
+        found = sorted(found, reverse=True)
+        nodes = [node for _, node in found]
+        candidates = self._vectors[nodes]
+        similarity = candidates @ candidates.T
+        # Highest similarity of each candidate to any neighbour kept so far
+        closest_kept = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected, skipped = [], []
+        for i, (score, _) in enumerate(found):
+            if len(selected) >= m:
+                break
+            if closest_kept[i] > score:
+                skipped.append(i)
+            else:
+                selected.append(i)
+                np.maximum(closest_kept, similarity[i], out=closest_kept)
+        # Top up with the closest skipped candidates so sparse regions stay connected
+        return [nodes[i] for i in selected + skipped[:m - len(selected)]]
+
+    def _insert(self, vector):
+        node = self._count
+        self._vectors[node] = vector
+        self._count += 1
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        while len(self._links) <= level:
+            self._links.append({})
+        for lvl in range(level + 1):
+            self._links[lvl][node] = []
+
+        if self._entry is None:
+            self._entry, self._max_level = node, level
+            return
+
+        entries = [self._entry]
+        for lvl in range(self._max_level, level, -1):
+            entries = [max(self._search_layer(vector, entries, 1, lvl))[1]]
+
+        for lvl in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(vector, entries, self.ef_construction, lvl)
+            neighbours = self._select_neighbours(found, self.m)
+            self._links[lvl][node] = neighbours
+            max_links = self.m0 if lvl == 0 else self.m
+            for neighbour in neighbours:
+                links = self._links[lvl][neighbour]
+                links.append(node)
+                if len(links) > max_links:
+                    # Re-select with the same heuristic, which keeps the long links
+                    # that connect clusters instead of only the nearest neighbours
+                    scores = (self._vectors[links] @ self._vectors[neighbour]).tolist()
+                    self._links[lvl][neighbour] = self._select_neighbours(list(zip(scores, links)), max_links)
+            entries = [n for _, n in found]
+
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+
+    def search(self, queries, k=5, ef_search=None, allowed=None):
+        """Return ``(scores, ids)``, each ``(n_queries, k)``, best first
+
+        With ``allowed`` (a boolean mask over ids, or an array of ids) only those
+        vectors are returned: the bottom layer is walked keeping ``ef_search``
+        allowed results, or, when at most HNSW_FILTER_EXACT_RATIO of the index
+        passes, the allowed vectors are scored exactly.
+        """
+        queries = normalize(queries)
+        ef = max(ef_search or self.ef_search, k)
+        if allowed is not None and self._count:
+            allowed = allowed_mask(allowed, self._count)
+            rows = np.flatnonzero(allowed)
+            if len(rows) <= max(ef, self._count * HNSW_FILTER_EXACT_RATIO):
+                return _exact_search(self._vectors[rows], queries, k, rows)
+        rows = []
+        for query in queries:
+            if self._entry is None:
+                rows.append(((), ()))
+                continue
+            entries = [self._entry]
+            for lvl in range(self._max_level, 0, -1):
+                entries = [max(self._search_layer(query, entries, 1, lvl))[1]]
+            found = self._search_layer(query, entries, ef, 0, allowed)
+            best = sorted(found, reverse=True)[:k]
+            rows.append(([score for score, _ in best], [node for _, node in best]))
+        return _pad(rows, k)
+
+
+def rescore(queries, ids, fetch, k):
+    """Re-rank shortlists by exact float32 scores
+
+    ``ids`` is an ``(n_queries, m)`` shortlist (padded with -1) from a search;
+    ``fetch(ids)`` returns the full-precision vectors of the given ids, e.g.
+    rows of an on-disk matrix. Each distinct id is fetched once. Returns the
+    best ``k`` of each shortlist as ``(scores, ids)``.
+    """
+    queries = normalize(queries)
+    unique = np.unique(ids[ids >= 0])
+    if not len(unique):
+        return _pad([((), ())] * len(queries), k)
+    vectors = normalize(fetch(unique))
+    rows = []
+    for query, row_ids in zip(queries, ids):
+        row_ids = row_ids[row_ids >= 0]
+        scores = vectors[np.searchsorted(unique, row_ids)] @ query
+        top = top_k(scores, k)
+        rows.append((scores[top], row_ids[top]))
+    return _pad(rows, k)
+
+
+INDEX_TYPES = {'exact': ExactIndex, 'ivf': IVFIndex, 'hnsw': HNSWIndex}
+
+
+def make_index(kind='exact', **params):
+    """Create an empty index by name (``exact``, ``ivf`` or ``hnsw``) with its tuning parameters"""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index {kind!r}; choose from {sorted(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](**params)
@@ -1,49 +1,175 @@
 from flask import Flask, request
-from enhanced_job_classifier import EnhancedJobClassifier
-import json
+from model_holder import LazyModel
+from message_queue import MessageQueue
+from message_dedup import MessageDeduplicator
+from ttl_cache import TTLCache
+from job_search import JobSearch, parse_command
+import os
 
 app = Flask(__name__)
-classifier = EnhancedJobClassifier()
+
+MODEL_PATH = os.environ.get('JOB_CLASSIFIER_MODEL', './your-finetuned-model')
+
+# How the classifier is loaded:
+#   background - bind immediately and warm the model up on a thread (default)
+#   lazy       - load on the first message that needs it
+#   eager      - load before serving, as the bot used to at import time
+MODEL_LOADING = os.environ.get('BOT_MODEL_LOADING', 'background')
+
+# 1 to answer confident messages from the rules / RandomForest tiers before the transformer
+CLASSIFIER_CASCADE = os.environ.get('BOT_CLASSIFIER_CASCADE', '0') == '1'
+
+def load_classifier():
+    # Importing here keeps torch/transformers out of the module import
+    from enhanced_job_classifier import EnhancedJobClassifier
+    return EnhancedJobClassifier(MODEL_PATH, cascade=CLASSIFIER_CASCADE)
+
+classifier = LazyModel(load_classifier)
+
+# Searches run against the API's job store (same log, enrichment, indexes and
+# category list); BOT_SEARCH_SESSIONS conversations keep their ranked results
+# for BOT_SEARCH_SESSION_TTL seconds of inactivity
+SEARCH_SESSIONS = int(os.environ.get('BOT_SEARCH_SESSIONS', '10000'))
+SEARCH_SESSION_TTL = float(os.environ.get('BOT_SEARCH_SESSION_TTL', '1800'))
+
+def load_job_search():
+    import job_api
+    return JobSearch(job_api.job_store, job_api.classifier, SEARCH_SESSIONS, SEARCH_SESSION_TTL)
+
+job_search = LazyModel(load_job_search)
+
+# Inbound messages are acknowledged at once and handled by a worker pool:
+#   BOT_QUEUE_SIZE     - messages waiting before the webhook answers 503
+#   BOT_QUEUE_WORKERS  - handler threads per process
+#   BOT_QUEUE_DB       - SQLite file keeping queued messages across restarts (off if unset)
+#   BOT_DRAIN_ON_EXIT  - 1 to handle every queued message before exiting, 0 to leave them
+QUEUE_SIZE = int(os.environ.get('BOT_QUEUE_SIZE', '1000'))
+QUEUE_WORKERS = int(os.environ.get('BOT_QUEUE_WORKERS', '2'))
+QUEUE_DB = os.environ.get('BOT_QUEUE_DB') or None
+DRAIN_ON_EXIT = os.environ.get('BOT_DRAIN_ON_EXIT', '1') == '1'
+
+# Seconds a provider is asked to wait before redelivering a refused webhook
+RETRY_AFTER_SECONDS = 5
+
+# Redelivered webhooks are recognised by message id:
+#   BOT_DEDUP_TTL   - seconds an id is remembered
+#   BOT_DEDUP_SIZE  - ids kept in memory
+#   BOT_DEDUP_DB    - SQLite file shared by all workers and restarts (off if unset)
+DEDUP_TTL = float(os.environ.get('BOT_DEDUP_TTL', str(24 * 3600)))
+DEDUP_SIZE = int(os.environ.get('BOT_DEDUP_SIZE', '100000'))
+DEDUP_DB = os.environ.get('BOT_DEDUP_DB') or None
+
+# The same text from the same number within this many seconds gets the previous
+# answer without running the classifier again
+RESPONSE_CACHE_TTL = float(os.environ.get('BOT_RESPONSE_CACHE_TTL', '600'))
+RESPONSE_CACHE_SIZE = int(os.environ.get('BOT_RESPONSE_CACHE_SIZE', '10000'))
+
+seen_messages = MessageDeduplicator(DEDUP_TTL, DEDUP_SIZE, DEDUP_DB)
+response_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+def handle_message(message):
+    """Answer one queued text message (runs on a queue worker)"""
+    user_message = message['body']
+    
+    # "next" / "details 2" page through the sender's last search
+    command = parse_command(user_message)
+    if command is not None:
+        send_whatsapp_message(message['from'], job_search.get().handle_command(message['from'], command))
+    
+    # Process job search request
+    elif 'job' in user_message.lower():
+        if is_search_query(user_message):
+            # Every search starts a new session, so it is never answered from the cache
+            response = process_job_query(user_message, message['from'])
+        else:
+            key = (message['from'], ' '.join(user_message.lower().split()))
+            response = response_cache.get(key)
+            if response is None:
+                response = process_job_query(user_message)
+                response_cache.put(key, response)
+        send_whatsapp_message(message['from'], response)
+
+message_queue = MessageQueue(handle_message, QUEUE_SIZE, QUEUE_WORKERS, QUEUE_DB)
 
 @app.route('/webhook', methods=['POST'])
 def whatsapp_webhook():
-    """Handle WhatsApp messages"""
-    data = request.get_json()
+    """Handle WhatsApp messages
+    
+    Messages are queued and acknowledged straight away; inference happens on
+    the queue's workers. If the queue is full the provider gets a 503 with
+    Retry-After and redelivers the webhook later. Message ids already seen
+    (redeliveries) are acknowledged without being handled again.
+    """
+    data = request.get_json(silent=True) or {}
     
     # Extract message (simplified - actual implementation depends on WhatsApp API)
-    if 'messages' in data:
-        for message in data['messages']:
-            if message['type'] == 'text':
-                user_message = message['text']['body']
-                phone_number = message['from']
-                
-                # Process job search request
-                if 'job' in user_message.lower():
-                    response = process_job_query(user_message)
-                    send_whatsapp_message(phone_number, response)
+    refused = 0
+    for message in data.get('messages', []):
+        if message.get('type') == 'text':
+            message_id = message.get('id')
+            if not seen_messages.mark_new(message_id):
+                continue
+            queued = message_queue.put({
+                'id': message_id,
+                'from': message['from'],
+                'body': message['text']['body']
+            })
+            if not queued:
+                # Not accepted, so the provider's redelivery must not count as a duplicate
+                seen_messages.forget(message_id)
+                refused += 1
     
+    if refused:
+        return 'Busy', 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
     return 'OK', 200
 
-def process_job_query(message):
-    """Process job-related queries"""
-    if 'search' in message.lower() or 'find' in message.lower():
-        # Extract job type from message
-        job_types = ['electrician', 'driver', 'plumber', 'sweeper']
-        found_type = None
-        
-        for job_type in job_types:
-            if job_type in message.lower():
-                found_type = job_type
-                break
-        
-        if found_type:
-            return f"🔍 Found jobs for {found_type}:\n\n1. {found_type.title()} needed in Mumbai - ₹15,000-20,000\n2. Experienced {found_type} required in Delhi - ₹18,000-25,000\n\nReply with job number for details!"
-        else:
-            return "Please specify job type: electrician, driver, plumber, or sweeper"
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Queue depth, refusals and delays, for spotting backpressure, and cache hit rates"""
+    metrics = {
+        'queue': message_queue.stats(),
+        'dedup': seen_messages.stats(),
+        'response_cache': response_cache.cache_info(),
+        'pid': os.getpid()
+    }
+    if job_search.ready():
+        metrics['search'] = job_search.get().stats()
+    return metrics, 200
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Liveness probe: the process is up and serving"""
+    return {'status': 'ok', 'pid': os.getpid()}, 200
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once the classifier is loaded, 503 while it is loading
+    
+    In lazy mode the model only loads for a message that needs it, so the bot
+    is always ready and the load state is just reported as ``loaded``.
+    """
+    status = classifier.status()
+    status['loaded'] = status['ready']
+    status['mode'] = MODEL_LOADING
+    if MODEL_LOADING == 'lazy':
+        status['ready'] = True
+    return status, 200 if status['ready'] else 503
+
+def is_search_query(message):
+    return 'search' in message.lower() or 'find' in message.lower()
+
+def process_job_query(message, phone_number=None):
+    """Process job-related queries
+    
+    Searches are answered from the job store and start a paged session for
+    ``phone_number``; anything else is analyzed as a job description.
+    """
+    if is_search_query(message):
+        return job_search.get().search(phone_number, message)
     
     else:
         # Analyze job description
-        result = classifier.analyze_job(message)
+        result = classifier.get().analyze_job(message)
         response = f"📝 Job Analysis:\n"
         response += f"Category: {result['category']}\n"
         response += f"Confidence: {result['confidence']:.1%}\n"
@@ -64,5 +190,107 @@ def send_whatsapp_message(phone_number, message):
     # This would integrate with actual WhatsApp Business API
     print(f"Sending to {phone_number}: {message}")
 
+model_prepared = False
+
+def prepare_model(mode=None):
+    """Apply the loading mode before the server starts"""
+    global model_prepared
+    mode = mode or MODEL_LOADING
+    if mode == 'eager':
+        classifier.get()
+    elif mode == 'background':
+        classifier.start_warmup()
+    elif mode != 'lazy':
+        raise ValueError(f"Unknown model loading mode {mode!r}; use background, lazy or eager")
+    model_prepared = True
+
+@app.before_request
+def prepare_model_on_first_request():
+    """Under gunicorn or ``flask run`` nothing calls prepare_model, so the first request does
+    
+    Doing it here rather than at import keeps the warmup thread out of a
+    parent process that forks its workers afterwards.
+    """
+    if not model_prepared:
+        prepare_model()
+
+def worker_queue_db(index):
+    """SQLite file of forked worker ``index``, so each recovers only its own messages"""
+    return f"{QUEUE_DB}.{index}" if QUEUE_DB else None
+
+def serve_workers(host='0.0.0.0', port=5000, workers=2):
+    """Preload the model once, then fork workers that share it copy-on-write
+    
+    The parent binds the socket and loads the classifier and the job store
+    before forking, so the children start serving straight away and their model
+    pages stay shared until written to. SIGTERM/SIGINT on the parent is forwarded to every worker, which
+    stops accepting requests and then stops its message queue (draining it if
+    BOT_DRAIN_ON_EXIT is set).
+    """
+    import gc
+    import signal
+    import socket
+    import threading
+    from werkzeug.serving import make_server
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    
+    classifier.get()
+    job_search.get()
+    # Move everything allocated so far out of the collector's reach, so gc passes
+    # in the workers do not touch (and un-share) the preloaded objects
+    gc.freeze()
+    
+    children = []
+    for index in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+            # serve_forever returns once shutdown() is called from another thread
+            shutdown = lambda signum, frame: threading.Thread(target=server.shutdown).start()
+            signal.signal(signal.SIGTERM, shutdown)
+            signal.signal(signal.SIGINT, shutdown)
+            message_queue.db_path = worker_queue_db(index)
+            message_queue.start()
+            print(f"Worker {os.getpid()} serving on {host}:{port}")
+            try:
+                server.serve_forever()
+                message_queue.stop(drain=DRAIN_ON_EXIT)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    sock.close()
+    
+    def stop(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    for child in children:
+        os.waitpid(child, 0)
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="WhatsApp job bot")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="More than one preloads the model and forks workers that share it")
+    args = parser.parse_args()
+    
+    if args.workers > 1:
+        serve_workers(args.host, args.port, args.workers)
+    else:
+        prepare_model()
+        message_queue.start()
+        try:
+            app.run(debug=True, host=args.host, port=args.port, use_reloader=False)
+        finally:
+            message_queue.stop(drain=DRAIN_ON_EXIT)